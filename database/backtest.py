@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+전략 백테스트 엔진
+portfolio_composition 비중과 리밸런싱 주기(일간/주간/월간/분기/반기/연간)로 최근 1/2/3년을 모의 운용해
+strategy_learning_analysis 의 backtest_1year/2year/3year JSON (자산곡선 요약, CAGR, MDD, 회전율) 생성
+
+전략마다 보유 종목만 (전략, 보유 종목, 거래일) 배열로 모아 모든 리밸런싱 구간을 한 번에 계산
+구간 안에서는 구간 시작 시 목표 비중으로 산 수량을 그대로 들고 가고(비중 변동), 다음 구간 첫날 목표 비중으로 되돌림
+전략 수백 개 × 3년도 1초 안에 계산 (날짜/구간별 파이썬 루프 없음, 주기별로만 묶음)
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from price_history import TRADING_DAYS_PER_YEAR
+from price_store import DEFAULT_STORE, PriceStore
+from reference_data import REBALANCING_FREQUENCIES
+from sql_writer import format_value
+
+# 백테스트 기간 (년) → strategy_learning_analysis 컬럼
+BACKTEST_COLUMNS = {
+    1: 'backtest_1year',
+    2: 'backtest_2year',
+    3: 'backtest_3year',
+}
+
+# JSON 에 남기는 자산곡선 점 수
+EQUITY_POINTS = 60
+
+# 메모리 사용량을 묶어 두기 위해 한 번에 계산하는 전략 수
+STRATEGY_CHUNK = 256
+
+
+def period_keys(dates, frequency):
+    """거래일별 리밸런싱 구간 번호 (값이 바뀌는 날이 리밸런싱일)"""
+    if frequency not in REBALANCING_FREQUENCIES:
+        raise ValueError(f"알 수 없는 리밸런싱 주기입니다: {frequency}")
+    days = dates.astype('datetime64[D]').astype(np.int64)
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    return {
+        '일간': np.arange(len(days)),
+        '주간': (days + 3) // 7,            # 1970-01-01 은 목요일 → 월요일 시작 주
+        '월간': months,
+        '분기': months // 3,
+        '반기': months // 6,
+        '연간': months // 12,
+    }[frequency]
+
+
+def holdings(weights):
+    """비중 행렬 (전략, 종목) → 보유 종목만 모은 (종목 번호, 비중) (전략, 최대 보유 종목 수) 배열"""
+    width = max(int((weights > 0).sum(axis=1).max(initial=0)), 1)
+    index = np.argsort(weights <= 0, axis=1, kind='stable')[:, :width]
+    return index, np.take_along_axis(weights, index, axis=1)
+
+
+def simulate(index, weights, growth, keys):
+    """같은 리밸런싱 주기의 전략 묶음 모의 운용
+
+    index, weights - holdings() 결과 (전략, K)
+    growth         - 종목별 누적 자산 (종목, 거래일 + 1), 첫 열은 시작 전일 = 1
+    keys           - period_keys() 결과 (거래일)
+    반환: (자산곡선 (전략, 거래일), 누적 회전율 (전략), 리밸런싱 횟수)
+    """
+    days = len(keys)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    period = np.cumsum(np.r_[True, keys[1:] != keys[:-1]]) - 1
+    ends = np.r_[starts[1:], days] - 1
+
+    held = growth[index]                                          # (전략, K, 거래일 + 1)
+    relative = held[:, :, 1:] / held[:, :, starts[period]]        # 구간 시작 대비 종목 자산
+    path = np.einsum('sk,skd->sd', weights, relative)             # 구간 시작 자산 1 기준 포트폴리오 자산
+
+    # 구간 끝 자산을 누적해 다음 구간의 시작 자산으로
+    level = np.ones((len(weights), len(starts)))
+    np.cumprod(path[:, ends[:-1]], axis=1, out=level[:, 1:])
+    equity = path * level[:, period]
+
+    # 리밸런싱일 직전 비중 (구간 동안 변동한 비중) 과 목표 비중의 차이 절반 = 편도 회전율
+    drifted = weights[:, :, None] * relative[:, :, ends[:-1]] / path[:, None, ends[:-1]]
+    turnover = np.abs(weights[:, :, None] - drifted).sum(axis=(1, 2)) / 2
+    return equity, turnover, len(starts) - 1
+
+
+def run(weights, returns, dates, frequencies):
+    """전략별 비중 (전략, 종목), 종목 수익률 (종목, 거래일), 전략별 리밸런싱 주기로 모의 운용
+
+    반환: {'equity': (전략, 거래일) 자산곡선 (시작 = 1), 'turnover': 누적 편도 회전율, 'rebalances': 리밸런싱 횟수}
+    """
+    strategies = len(weights)
+    frequencies = np.asarray(frequencies if not isinstance(frequencies, str) else [frequencies] * strategies)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights, dtype=np.float64), where=totals > 0)
+
+    growth = np.ones((returns.shape[0], returns.shape[1] + 1))
+    np.cumprod(1 + np.nan_to_num(returns), axis=1, out=growth[:, 1:])
+
+    equity = np.ones((strategies, returns.shape[1]))
+    turnover = np.zeros(strategies)
+    rebalances = np.zeros(strategies, dtype=np.int64)
+    for frequency in np.unique(frequencies).tolist():
+        keys = period_keys(dates, frequency)
+        rows = np.flatnonzero(frequencies == frequency)
+        for first in range(0, len(rows), STRATEGY_CHUNK):
+            chunk = rows[first:first + STRATEGY_CHUNK]
+            index, chunk_weights = holdings(weights[chunk])
+            equity[chunk], turnover[chunk], rebalances[chunk] = simulate(index, chunk_weights, growth, keys)
+    return {'equity': equity, 'turnover': turnover, 'rebalances': rebalances}
+
+
+def summaries(result, dates, frequencies, points=EQUITY_POINTS):
+    """모의 운용 결과 → 전략별 JSON 요약 dict 목록 (수익률/낙폭/회전율은 %)"""
+    equity = result['equity']
+    strategies, days = equity.shape
+    frequencies = [frequencies] * strategies if isinstance(frequencies, str) else list(frequencies)
+    years = days / TRADING_DAYS_PER_YEAR
+
+    final = equity[:, -1]
+    cagr = np.sign(final) * np.abs(final) ** (1 / years) - 1
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1)
+    drawdown = (1 - equity / peak).max(axis=1)
+    daily = np.diff(equity, axis=1, prepend=1) / np.concatenate([np.ones((strategies, 1)), equity[:, :-1]], axis=1)
+    volatility = daily.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) if days > 1 else np.zeros(strategies)
+
+    sample = np.unique(np.linspace(0, days - 1, min(points, days)).astype(int))
+    labels = [text.replace('-', '') for text in np.datetime_as_string(dates[sample], unit='D')]
+    curves = np.round(equity[:, sample] * 100, 2).tolist()
+    start = str(np.datetime_as_string(dates[0], unit='D')).replace('-', '')
+    return [{
+        'start': start,
+        'end': labels[-1],
+        'frequency': frequencies[i],
+        'total_return': round(float(final[i] - 1) * 100, 2),
+        'cagr': round(float(cagr[i]) * 100, 2),
+        'mdd': round(float(drawdown[i]) * 100, 2),
+        'volatility': round(float(volatility[i]) * 100, 2),
+        'turnover': round(float(result['turnover'][i]) / years * 100, 2),
+        'rebalances': int(result['rebalances'][i]),
+        'equity': [[label, value] for label, value in zip(labels, curves[i])],
+    } for i in range(strategies)]
+
+
+def backtest_columns(weights, returns, dates, frequencies, periods=BACKTEST_COLUMNS):
+    """기간별 백테스트 JSON 문자열 {컬럼명: [전략별 JSON 또는 None]} (저장소 기간이 모자라면 None)"""
+    columns = {}
+    for years, column in periods.items():
+        days = years * TRADING_DAYS_PER_YEAR
+        if days > returns.shape[1]:
+            columns[column] = [None] * len(weights)
+            continue
+        result = run(weights, returns[:, -days:], dates[-days:], frequencies)
+        columns[column] = [json.dumps(summary, ensure_ascii=False, separators=(',', ':'))
+                           for summary in summaries(result, dates[-days:], frequencies)]
+    return columns
+
+
+def update_statements(codes, columns):
+    """strategy_learning_analysis 백테스트 컬럼 UPDATE 구문"""
+    names = list(columns)
+    for i, code in enumerate(codes):
+        assignments = ', '.join(f"{name} = {format_value(columns[name][i])}" for name in names)
+        yield f"UPDATE strategy_learning_analysis SET {assignments} WHERE strategy_code = {format_value(code)};\n"
+
+
+if __name__ == "__main__":
+    from risk_metrics import composition_weights, load_learning_strategies
+
+    parser = argparse.ArgumentParser(description='전략 백테스트 후 strategy_learning_analysis 백테스트 컬럼 UPDATE 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--learning-dump', required=True, help='strategy_learning_master 가 들어 있는 SQL 덤프')
+    parser.add_argument('--frequency', choices=REBALANCING_FREQUENCIES, default='월간', help='리밸런싱 주기')
+    parser.add_argument('--output', default='update_backtest.sql', help='출력 SQL 파일')
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    learning = load_learning_strategies(args.learning_dump)
+    weights, _, missing = composition_weights(store, [composition for _, composition in learning])
+    if missing:
+        print(f"⚠️  저장소에 없는 종목 {len(set(missing))}개는 제외하고 비중을 다시 맞춤")
+    held = weights.sum(axis=1) > 0
+    codes = [code for (code, _), keep in zip(learning, held) if keep]
+
+    started = time.perf_counter()
+    columns = backtest_columns(weights[held], store.returns(), store.dates, args.frequency)
+    elapsed = time.perf_counter() - started
+    print(f"📈 전략 {len(codes):,}개 백테스트 ({args.frequency} 리밸런싱, {elapsed:.2f}초)")
+    for code, summary in zip(codes, columns['backtest_1year']):
+        if summary:
+            summary = json.loads(summary)
+            print(f"   {code}: 1년 CAGR {summary['cagr']:.2f}%, MDD {summary['mdd']:.2f}%, "
+                  f"회전율 {summary['turnover']:.2f}%")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write("-- 전략 백테스트 결과 (backtest.py)\nUSE kpsdb;\n\n")
+        f.writelines(update_statements(codes, columns))
+    print(f"📁 파일: {args.output}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+데이터 생성 백엔드 속도 비교 스크립트
+기준은 기존 매매내역 생성 스크립트의 행 단위 루프 (generate_final_trades.generate_trading_data,
+generate_bulk_stocks.generate_trading_history) 이며, 목표는 numpy 백엔드 trading_history 가
+더 빠른 기존 루프보다 TARGET_SPEEDUP 배 이상 빠른 것
+참고로 계좌별 테이블마다 스펙 엔진 python 백엔드(행 단위 random 루프 + format_row)와도 비교
+파일 기록 시간은 제외하고 생성 + VALUES 행 문자열 변환까지만 측정
+"""
+
+import argparse
+import time
+
+import generate_bulk_stocks
+import generate_final_trades
+from dataset_spec import DEFAULT_SPEC, DatasetGenerator, vector_generator
+from sql_writer import format_row
+
+# 기존 행 단위 루프 대비 목표 배율
+TARGET_SPEEDUP = 20
+
+# 기준으로 삼는 기존 매매내역 생성 루프
+LEGACY_LOOPS = {
+    'generate_final_trades.generate_trading_data': generate_final_trades.generate_trading_data,
+    'generate_bulk_stocks.generate_trading_history': generate_bulk_stocks.generate_trading_history,
+}
+
+
+def measure(rows):
+    """이터러블을 끝까지 소비하며 (행 수, 소요시간) 반환"""
+    started = time.perf_counter()
+    count = 0
+    for batch in rows:
+        count += batch
+    return count, time.perf_counter() - started
+
+
+def python_rows(generator, table):
+    for values in generator.rows(table):
+        format_row(values)
+        yield 1
+
+
+def numpy_rows(vector, table):
+    for lines, _ in vector.lines(table):
+        yield len(lines)
+
+
+def legacy_rows(loop, repeat):
+    # 기존 매매내역 생성 스크립트의 행 단위 루프
+    for _ in range(repeat):
+        for values in loop():
+            format_row(values)
+            yield 1
+
+
+def benchmark(scale, seed):
+    """numpy 백엔드 trading_history 와 기존 루프의 초당 행 수를 비교하고 더 빠른 기존 루프 대비 배율 반환"""
+    generator = DatasetGenerator(DEFAULT_SPEC, scale, seed)
+    generator.prepare_shared()
+    vector = vector_generator(generator)
+
+    print(f"📊 생성 속도 비교 (scale={scale:,}, 계좌 {len(generator.accounts):,}개)")
+    print("   [참고] 스펙 엔진 python 백엔드 대비")
+    rates = {}
+    for table in generator.order:
+        if not generator.is_account_table(table):
+            continue
+        count, python_time = measure(python_rows(generator, table))
+        _, numpy_time = measure(numpy_rows(vector, table))
+        rates[table] = count / numpy_time
+        print(f"   {table}: {count:,}건 | python {count / python_time:,.0f}건/초 | "
+              f"numpy {count / numpy_time:,.0f}건/초 | {python_time / numpy_time:.1f}배")
+
+    numpy_rate = rates['trading_history']
+    print(f"\n   기존 매매내역 루프 대비 (numpy trading_history {numpy_rate:,.0f}건/초)")
+    legacy = {}
+    for name, loop in LEGACY_LOOPS.items():
+        count, elapsed = measure(legacy_rows(loop, max(1, scale // 10)))
+        legacy[name] = count / elapsed
+        print(f"   {name}: {legacy[name]:,.0f}건/초 → {numpy_rate / legacy[name]:.1f}배")
+
+    baseline = max(legacy, key=legacy.get)
+    speedup = numpy_rate / legacy[baseline]
+    print(f"\n🚀 trading_history: 가장 빠른 기존 루프 ({baseline}) {legacy[baseline]:,.0f}건/초 → "
+          f"numpy {numpy_rate:,.0f}건/초 ({speedup:.1f}배)")
+    if speedup >= TARGET_SPEEDUP:
+        print(f"✅ 목표 {TARGET_SPEEDUP}배 달성")
+    else:
+        print(f"⚠️  목표 {TARGET_SPEEDUP}배 미달 ({speedup:.1f}배)")
+    return speedup
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='기존 매매내역 루프 / python 백엔드 vs numpy 백엔드 생성 속도 비교')
+    parser.add_argument('--scale', type=int, default=100, help='계좌 수 배율')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args()
+
+    benchmark(args.scale, args.seed)
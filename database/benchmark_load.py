@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+INSERT 구문 적재 vs LOAD DATA(TSV) 적재 시간 비교 스크립트
+같은 seed 로 두 형식의 데이터셋을 만들고, 테이블을 비운 뒤 mysql 클라이언트로 각각 적재해 시간 측정
+비밀번호는 MYSQL_PWD 환경변수로 전달 (예: MYSQL_PWD=... python benchmark_load.py --scale 100)
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from dataset_spec import DEFAULT_SPEC, DatasetGenerator, generate
+
+
+def run_mysql(args, sql_path):
+    """mysql 클라이언트로 SQL 파일 실행 후 소요시간(초) 반환"""
+    command = ['mysql', '--local-infile=1', '-h', args.host, '-P', str(args.port), '-u', args.user, args.database]
+    started = time.perf_counter()
+    with open(sql_path, 'r', encoding='utf-8') as f:
+        subprocess.run(command, stdin=f, check=True)
+    return time.perf_counter() - started
+
+
+def write_cleanup(path, tables):
+    """적재 대상 테이블을 참조 역순으로 비우는 SQL 작성"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("SET FOREIGN_KEY_CHECKS = 0;\n")
+        for table in reversed(tables):
+            f.write(f"DELETE FROM {table};\n")
+        f.write("SET FOREIGN_KEY_CHECKS = 1;\n")
+
+
+def benchmark(args):
+    """두 적재 방식을 번갈아 repeat 회 실행하고 평균 시간 비교"""
+    tables = DatasetGenerator(DEFAULT_SPEC, args.scale, args.seed).order
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_load_') as directory:
+        insert_path = os.path.join(directory, 'insert_dataset.sql')
+        tsv_directory = os.path.join(directory, 'dataset_tsv')
+        cleanup_path = os.path.join(directory, 'cleanup.sql')
+
+        generate(insert_path, scale=args.scale, seed=args.seed, workers=args.workers)
+        generate(tsv_directory, scale=args.scale, seed=args.seed, workers=args.workers, output_format='tsv')
+        write_cleanup(cleanup_path, tables)
+
+        results = {'INSERT': [], 'LOAD DATA': []}
+        for i in range(args.repeat):
+            for name, path in (('INSERT', insert_path), ('LOAD DATA', os.path.join(tsv_directory, 'load_data.sql'))):
+                run_mysql(args, cleanup_path)
+                elapsed = run_mysql(args, path)
+                results[name].append(elapsed)
+                print(f"   ⏱️  {i + 1}회차 {name}: {elapsed:.2f}초")
+
+        run_mysql(args, cleanup_path)
+
+    insert_time = sum(results['INSERT']) / len(results['INSERT'])
+    load_time = sum(results['LOAD DATA']) / len(results['LOAD DATA'])
+    print(f"\n📊 적재 시간 비교 (scale={args.scale:,}, {args.repeat}회 평균)")
+    print(f"   INSERT 구문 : {insert_time:.2f}초")
+    print(f"   LOAD DATA   : {load_time:.2f}초")
+    if load_time > 0:
+        print(f"   🚀 LOAD DATA 가 {insert_time / load_time:.1f}배 빠름")
+    return insert_time, load_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='INSERT vs LOAD DATA 적재 시간 비교 (테이블 데이터를 삭제하므로 테스트 DB 에서만 실행)')
+    parser.add_argument('--scale', type=int, default=10, help='계좌 수 배율')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    parser.add_argument('--workers', type=int, default=1, help='데이터 생성 병렬 작업 프로세스 수')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 측정 횟수')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='rebalance')
+    parser.add_argument('--database', default='kpsdb')
+    args = parser.parse_args()
+
+    benchmark(args)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+매매내역 기반 취득원가 계산 엔진
+trading_history 를 (계좌, 종목) 별로 매매일자/주문번호/체결번호 순서로 재생해
+보유수량과 매수금액(잔여 취득원가)을 선입선출(FIFO) 또는 이동평균법으로 계산하고
+customer_balance 행으로 출력하거나 덤프에 들어 있는 customer_balance 와 비교
+
+행마다 dict 를 갱신하는 루프 대신 전체 매매를 (계좌, 종목, 일자, 주문, 체결) 로 정렬한 배열에서
+그룹별 누적합/누적최소 연산으로 한 번에 계산하므로 수천만 건도 numpy 연산 몇 번으로 처리
+보유수량보다 많이 매도한 주문은 보유수량만큼만 매도한 것으로 보고 (공매도 없음) 초과 매도 건수를 따로 집계
+"""
+
+import argparse
+import sys
+from decimal import Decimal
+
+import numpy as np
+
+from dataset_spec import parse_schema
+from reference_data import TRADE_COLUMNS, company_names
+from sql_reader import read_rows
+from tsv_writer import WRITERS
+
+METHODS = ('fifo', 'average')
+
+BALANCE_COLUMNS = ['account_number', 'stock_code', 'stock_name', 'quantity', 'purchase_amount']
+
+# 기존 고객잔고 비교에 꼭 필요한 컬럼 (구버전 덤프는 purchase_amount/stock_name 이 없을 수 있음)
+REQUIRED_BALANCE_COLUMNS = ['account_number', 'stock_code', 'quantity']
+
+# 구버전 덤프(insert_bulk_data_final.sql 등)의 매매내역 컬럼명
+LEGACY_TRADE_COLUMNS = {
+    'buy_sell_code': 'trade_type',
+    'order_quantity': 'quantity',
+    'order_amount': 'amount',
+}
+
+# 매수로 보는 구분 값 (현행 1:매수, 구버전 BUY)
+BUY_CODES = ('1', 'BUY')
+
+# 덤프를 읽을 때 파이썬 리스트에 모았다가 배열로 바꾸는 단위 (행 수)
+LOAD_BATCH = 1000000
+
+MAX_EXAMPLES = 10
+
+def to_cents(value):
+    """DECIMAL 금액을 정수 원 단위 × 100 으로 변환 (부동소수 오차 없이)"""
+    return int(round(value * 100))
+
+
+def from_cents(cents):
+    """to_cents() 의 역변환 (DECIMAL(15,2) 값)"""
+    return Decimal(cents).scaleb(-2)
+
+
+def _text_array(values):
+    """문자열 목록을 UTF-8 바이트 배열로 변환 (유니코드 배열의 1/4 메모리, 바이트 순서 = 문자 순서)"""
+    try:
+        return np.array(values, dtype=bytes)
+    except UnicodeEncodeError:
+        return np.char.encode(np.array(values, dtype=str), 'utf-8')
+
+
+def make_trades(account, date, order, execution, stock, buy, quantity, cents):
+    """컬럼별 값 목록으로 replay() 입력 만들기 (계좌/종목은 고유값 표 + 정수 코드로 변환)"""
+    accounts, account_codes = np.unique(np.asarray(account, dtype=str), return_inverse=True)
+    stocks, stock_codes = np.unique(np.asarray(stock, dtype=str), return_inverse=True)
+    return {
+        'accounts': accounts,
+        'account': account_codes.astype(np.int64),
+        'stocks': stocks,
+        'stock': stock_codes.astype(np.int64),
+        'date': np.asarray(date, dtype=np.int64),
+        'order': _text_array(order),
+        'execution': _text_array(execution),
+        'buy': np.asarray(buy, dtype=bool),
+        'quantity': np.asarray(quantity, dtype=np.int64),
+        'cents': np.asarray(cents, dtype=np.int64),
+    }
+
+
+def load_dump(path, schema=None):
+    """덤프에서 매매내역(replay() 입력)과 기존 고객잔고 {(계좌, 종목): (수량, 금액 원×100, 종목명)} 를 함께 읽음
+
+    계좌/종목은 읽으면서 등장 순서대로 정수 코드를 붙이고, 나머지 컬럼은 LOAD_BATCH 행마다 배열로 변환
+    고객잔고에 매수금액/종목명 컬럼이 없으면 해당 값은 None
+    """
+    schema = parse_schema() if schema is None else schema
+    account_codes = {}
+    stock_codes = {}
+    columns_by_name = {name: [] for name in ('account', 'date', 'order', 'execution', 'stock', 'buy', 'quantity',
+                                             'cents')}
+    batch = [[] for _ in TRADE_COLUMNS]
+    balances = {}
+    last_columns = None
+
+    def flush():
+        for (name, parts), values, dtype in zip(columns_by_name.items(), batch,
+                                                (np.int64, np.int64, None, None, np.int64, bool, np.int64, np.int64)):
+            parts.append(_text_array(values) if dtype is None else np.array(values, dtype=dtype))
+            values.clear()
+
+    for table, columns, values in read_rows(path, ['trading_history', 'customer_balance'], schema):
+        if columns is not last_columns:
+            position = {column: columns.index(column) for column in columns}
+            if table == 'trading_history':
+                for column, legacy in LEGACY_TRADE_COLUMNS.items():
+                    if column not in position and legacy in position:
+                        position[column] = position[legacy]
+            required = TRADE_COLUMNS if table == 'trading_history' else REQUIRED_BALANCE_COLUMNS
+            missing = [column for column in required if column not in position]
+            if missing:
+                raise ValueError(f"{path}: {table} INSERT 에 {', '.join(missing)} 컬럼이 없습니다")
+            last_columns = columns
+        if table == 'customer_balance':
+            key = (values[position['account_number']], values[position['stock_code']])
+            purchase = values[position['purchase_amount']] if 'purchase_amount' in position else None
+            name = values[position['stock_name']] if 'stock_name' in position else None
+            balances[key] = (values[position['quantity']], None if purchase is None else to_cents(purchase), name)
+            continue
+
+        batch[0].append(account_codes.setdefault(values[position['account_number']], len(account_codes)))
+        batch[1].append(int(values[position['trading_date']]))
+        batch[2].append(values[position['order_number']])
+        batch[3].append(values[position['execution_number']])
+        batch[4].append(stock_codes.setdefault(values[position['stock_code']], len(stock_codes)))
+        batch[5].append(str(values[position['buy_sell_code']]) in BUY_CODES)
+        batch[6].append(values[position['order_quantity']])
+        batch[7].append(to_cents(values[position['order_amount']]))
+        if len(batch[0]) >= LOAD_BATCH:
+            flush()
+    flush()
+
+    trades = {name: np.concatenate(parts) for name, parts in columns_by_name.items()}
+    trades['accounts'] = np.array(list(account_codes), dtype=str)
+    trades['stocks'] = np.array(list(stock_codes), dtype=str)
+    return trades, balances
+
+
+def sort_trades(trades):
+    """(계좌, 종목, 매매일자, 주문번호, 체결번호) 순 정렬 인덱스
+
+    문자열 다중 키 정렬 대신 (계좌, 종목, 일자) 를 정수 하나로 합쳐 한 번 정렬하고,
+    같은 날 같은 종목을 여러 번 매매한 행들만 주문번호/체결번호로 다시 정렬
+    """
+    pair = trades['account'] * max(len(trades['stocks']), 1) + trades['stock']
+    day = trades['date'] - trades['date'].min(initial=0)
+    key = pair * (int(day.max(initial=0)) + 1) + day
+    index = np.argsort(key, kind='stable')
+    key = key[index]
+
+    same = key[1:] == key[:-1]
+    tie = np.zeros(len(key), dtype=bool)
+    tie[1:] |= same
+    tie[:-1] |= same
+    if tie.any():
+        rows = np.flatnonzero(tie)
+        tied = index[rows]
+        index[rows] = tied[np.lexsort((trades['execution'][tied], trades['order'][tied], key[rows]))]
+    return index
+
+
+def _group_starts(*keys):
+    """정렬된 키 배열들에서 그룹 시작 위치와 행별 그룹 번호"""
+    count = len(keys[0])
+    change = np.zeros(count, dtype=bool)
+    if count:
+        change[0] = True
+        for key in keys:
+            change[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(change)
+    return starts, np.cumsum(change) - 1
+
+
+def grouped_cumsum(values, starts, group):
+    """그룹마다 처음부터 다시 시작하는 누적합"""
+    total = np.cumsum(values)
+    return total - (total - values)[starts][group]
+
+
+def replay(trades, method='fifo'):
+    """매매내역 배열을 재생해 (계좌, 종목) 별 최종 보유수량과 잔여 매수금액 계산
+
+    trades 는 load_dump() 또는 make_trades() 결과
+    반환: {'account', 'stock', 'quantity', 'cents', 'oversold'} - (계좌, 종목) 그룹별 배열 (계좌 코드 순)
+          oversold 는 보유수량을 넘는 매도로 일부 또는 전부가 무시된 매매 건수
+    """
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 원가 계산 방식입니다: {method}")
+
+    index = sort_trades(trades)
+    account, stock = trades['account'][index], trades['stock'][index]
+    buy = trades['buy'][index]
+    quantity = trades['quantity'][index]
+    cents = trades['cents'][index]
+
+    starts, group = _group_starts(account, stock)
+    ends = np.append(starts[1:], len(group)) - 1
+    rows = np.arange(len(group))
+
+    # 보유수량: 부호 있는 누적합 S 를 0 아래로 내려가지 않게 반사 (pos = S - min(0, 그룹 내 누적최소 S))
+    signed = np.where(buy, quantity, -quantity)
+    running = grouped_cumsum(signed, starts, group)
+    # 그룹마다 충분히 큰 값을 빼서 이전 그룹 값이 누적최소에 섞이지 않게 함
+    offset = group * (2 * int(np.abs(running).max(initial=0)) + 1)
+    floor = np.minimum(np.minimum.accumulate(running - offset) + offset, 0)
+    position = running - floor
+    previous = np.where(rows == starts[group], 0, np.roll(position, 1))
+    oversold = np.bincount(group[~buy & (previous - position < quantity)], minlength=len(starts))
+
+    held = position[ends]
+    if method == 'fifo':
+        # 선입선출: 그룹의 총 매도분(총 매수 - 최종 보유)만큼 앞쪽 매수분부터 소진
+        bought = grouped_cumsum(np.where(buy, quantity, 0), starts, group)
+        consumed = (bought[ends] - held)[group]
+        remaining = np.where(buy, np.clip(bought - consumed, 0, quantity), 0)
+        lot = np.where(remaining == quantity, cents,
+                       (cents * remaining * 2 + np.maximum(quantity, 1)) // (2 * np.maximum(quantity, 1)))
+        purchase = np.add.reduceat(np.where(buy, lot, 0), starts) if len(starts) else lot[:0]
+    else:
+        # 이동평균: 매도 시 원가가 (매도 후 수량 / 매도 전 수량) 배로 줄어드므로
+        # 마지막 전량 매도 이후의 매수금액 × (이후 매도 비율들의 곱) 의 합 (곱은 로그 누적합으로 계산)
+        ratio = np.ones(len(group))
+        partial = ~buy & (position > 0) & (previous > 0)
+        ratio[partial] = position[partial] / previous[partial]
+        log_ratio = grouped_cumsum(np.log(ratio), starts, group)
+        last_zero = np.maximum.reduceat(np.where(position == 0, rows, -1), starts) if len(starts) else starts
+        counted = buy & (rows > last_zero[group])
+        weights = np.where(counted, cents * np.exp(log_ratio[ends][group] - log_ratio), 0.0)
+        purchase = np.bincount(group, weights=weights, minlength=len(starts)).round()
+
+    return {
+        'account': trades['accounts'][account[starts]],
+        'stock': trades['stocks'][stock[starts]],
+        'quantity': held,
+        'cents': purchase.astype(np.int64),
+        'oversold': oversold,
+    }
+
+
+def stock_names(balances=None):
+    """종목명 조회 함수 (기존 고객잔고에 있는 이름 우선, 없으면 dataset_spec 과 같은 규칙의 생성 종목명)"""
+    known = {stock: name for (_, stock), (_, _, name) in (balances or {}).items() if name is not None}
+    names = company_names()
+
+    def lookup(stock_code):
+        if stock_code in known:
+            return known[stock_code]
+        if stock_code.isdigit():
+            return names[(int(stock_code) - 1) % len(names)]
+        return stock_code
+
+    return lookup
+
+
+def balance_rows(result, names, include_empty=False):
+    """replay() 결과를 customer_balance 행 튜플로 yield (보유수량 0 인 종목은 기본 제외)"""
+    for account, stock, quantity, cents in zip(result['account'].tolist(), result['stock'].tolist(),
+                                               result['quantity'].tolist(), result['cents'].tolist()):
+        if quantity or include_empty:
+            yield account, stock, names(stock), quantity, from_cents(cents)
+
+
+def diff_balances(result, balances):
+    """계산한 잔고와 기존 고객잔고 비교 → {구분: [(계좌, 종목, 계산값, 기존값)]}"""
+    derived = {(account, stock): (quantity, cents)
+               for account, stock, quantity, cents in zip(result['account'].tolist(), result['stock'].tolist(),
+                                                          result['quantity'].tolist(), result['cents'].tolist())
+               if quantity}
+    existing = {key: (quantity, cents) for key, (quantity, cents, _) in balances.items()}
+    differences = {'수량 불일치': [], '매수금액 불일치': [], '기존 잔고에 없음': [], '매매내역에 없음': []}
+    for key, value in derived.items():
+        other = existing.get(key)
+        if other is None:
+            differences['기존 잔고에 없음'].append((*key, value, None))
+        elif other[0] != value[0]:
+            differences['수량 불일치'].append((*key, value, other))
+        elif other[1] is not None and other[1] != value[1]:
+            differences['매수금액 불일치'].append((*key, value, other))
+    for key, value in existing.items():
+        if key not in derived:
+            differences['매매내역에 없음'].append((*key, None, value))
+    return differences
+
+
+def _describe(value):
+    if value is None:
+        return '-'
+    quantity, cents = value
+    if cents is None:
+        return f"{quantity:,}주"
+    return f"{quantity:,}주 / {from_cents(cents):,}원"
+
+
+def report_diff(differences, max_examples=MAX_EXAMPLES):
+    """비교 결과 출력 후 차이 건수 반환"""
+    total = sum(len(items) for items in differences.values())
+    if not total:
+        print("✅ 매매내역으로 계산한 잔고와 고객잔고가 일치")
+        return 0
+    print(f"❌ 잔고 불일치 {total:,}건")
+    for kind, items in differences.items():
+        if not items:
+            continue
+        print(f"\n   [{kind}] {len(items):,}건")
+        for account, stock, derived, existing in items[:max_examples]:
+            print(f"      - {account} {stock}: 계산 {_describe(derived)}, 기존 {_describe(existing)}")
+        if len(items) > max_examples:
+            print(f"      ... (처음 {max_examples}건만 표시)")
+    return total
+
+
+def write_balances(path, result, names, output_format='sql'):
+    """계산한 잔고를 customer_balance INSERT 파일(또는 TSV 디렉터리)로 기록하고 행 수 반환"""
+    with WRITERS[output_format](path) as writer:
+        writer.write("-- 매매내역 기반 고객잔고 (cost_basis.py)\nUSE kpsdb;\n\n")
+        if output_format == 'sql':
+            writer.write("DELETE FROM customer_balance;\n\n")
+        return writer.insert('customer_balance', BALANCE_COLUMNS, balance_rows(result, names))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='매매내역으로 고객잔고(보유수량/매수금액) 계산')
+    parser.add_argument('dump', help='trading_history INSERT 가 들어 있는 SQL 덤프 (.sql/.sql.gz)')
+    parser.add_argument('--method', choices=METHODS, default='fifo', help='취득원가 계산 방식 (선입선출/이동평균)')
+    parser.add_argument('--output', help='계산한 customer_balance 를 기록할 파일 (tsv 형식이면 디렉터리)')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--diff', action='store_true', help='덤프의 customer_balance 와 비교')
+    args = parser.parse_args()
+
+    print(f"🔍 {args.dump} 매매내역 읽는 중...")
+    trades, balances = load_dump(args.dump)
+    print(f"📊 매매내역 {len(trades['account']):,}건, 기존 고객잔고 {len(balances):,}건")
+
+    result = replay(trades, args.method)
+    held = int(np.count_nonzero(result['quantity']))
+    oversold = int(result['oversold'].sum())
+    print(f"✅ {args.method} 계산 완료: (계좌, 종목) {len(result['account']):,}개 중 보유 {held:,}개")
+    if oversold:
+        print(f"⚠️  보유수량을 넘는 매도 {oversold:,}건은 보유수량까지만 반영")
+
+    if args.output:
+        count = write_balances(args.output, result, stock_names(balances), args.format)
+        print(f"📁 customer_balance {count:,}건: {args.output}")
+    if args.diff:
+        sys.exit(1 if report_diff(diff_balances(result, balances)) else 0)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+종목 공분산 캐시 (Ledoit-Wolf 수축 / 업종 요인모형)
+시세 저장소(price_store) 의 최근 window 거래일 수익률로 (종목, 종목) 공분산을 한 번 계산해
+.npy 파일로 저장하고, 최적화/VaR/베타 계산에서는 메모리 매핑으로 열어 다시 계산하지 않음
+
+캐시에는 구간의 원시 적률 합 (Σr, Σrrᵀ, Σr²rᵀ, Σr²r²ᵀ) 을 함께 보관
+표본 공분산과 Ledoit-Wolf 수축 강도가 모두 이 합으로 정해지므로, 거래일이 추가되면
+새 거래일 몫을 더하고 구간에서 빠지는 거래일 몫을 빼는 것만으로 갱신 (종목² × 바뀐 거래일 수)
+캐시한 거래일의 수익률 해시가 저장소와 다르면 (과거 시세 수정, 저장소 재생성) 전체를 다시 계산
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from price_history import TRADING_DAYS_PER_YEAR
+from price_store import DEFAULT_STORE, PriceStore, cache_directory, codes_hash, day_hashes
+
+CACHE_FORMAT = 1
+
+# 캐시 디렉터리 = 저장소 디렉터리 + CACHE_SUFFIX
+CACHE_SUFFIX = '_covariance'
+
+# 추정 구간 (거래일, 기본 최근 2년)
+DEFAULT_WINDOW = TRADING_DAYS_PER_YEAR * 2
+
+# 적률 합을 계산할 때 한 번에 읽는 거래일 수
+DAY_BLOCK = 250
+
+# 캐시 파일 이름
+META_FILE = 'meta.json'
+DATES_FILE = 'dates.npy'
+HASHES_FILE = 'day_hashes.npy'
+MOMENT_FILES = {
+    'sum': 'sum.npy',            # Σ r          (종목)
+    'cross': 'cross.npy',        # Σ r rᵀ       (종목, 종목)
+    'skew': 'skew.npy',          # Σ r² rᵀ      (종목, 종목)
+    'fourth': 'fourth.npy',      # Σ r² (r²)ᵀ   (종목, 종목)
+}
+ESTIMATE_FILES = {
+    'sample': 'sample.npy',
+    'ledoit_wolf': 'ledoit_wolf.npy',
+    'sector': 'sector.npy',
+}
+
+# 업종 요인모형에서 종목 고유분산 하한 (총분산 대비)
+MIN_SPECIFIC = 0.05
+
+
+def moments(returns, block=DAY_BLOCK):
+    """수익률 (종목, 거래일) 의 원시 적률 합 (NaN 은 0)"""
+    stocks = returns.shape[0]
+    result = {'days': 0, 'sum': np.zeros(stocks)}
+    for name in ('cross', 'skew', 'fourth'):
+        result[name] = np.zeros((stocks, stocks))
+    for first in range(0, returns.shape[1], block):
+        part = np.nan_to_num(np.asarray(returns[:, first:first + block], dtype=np.float64))
+        square = part * part
+        result['days'] += part.shape[1]
+        result['sum'] += part.sum(axis=1)
+        result['cross'] += part @ part.T
+        result['skew'] += square @ part.T
+        result['fourth'] += square @ square.T
+    return result
+
+
+def combine(total, part, sign=1):
+    """적률 합에 part 를 더하거나 (sign=1) 뺌 (sign=-1), total 을 바꿔서 반환"""
+    total['days'] += sign * part['days']
+    for name in MOMENT_FILES:
+        total[name] += sign * part[name]
+    return total
+
+
+def sample_covariance(total):
+    """적률 합 → (평균, 표본 공분산 (1/T 정규화))"""
+    days = total['days']
+    mean = total['sum'] / days
+    return mean, total['cross'] / days - np.outer(mean, mean)
+
+
+def ledoit_wolf(total):
+    """적률 합 → (Ledoit-Wolf 수축 공분산, 수축 강도)
+
+    목표는 평균 분산 × 단위행렬, 수축 강도 = min(β², δ²) / δ²
+    δ² = ‖S - μI‖² / N, β² = (Σₜ ‖xₜxₜᵀ‖² / T - ‖S‖²) / (N T)  (xₜ 는 평균을 뺀 수익률)
+    Σₜ ‖xₜxₜᵀ‖² = Σᵢⱼ Σₜ xᵢ² xⱼ² 는 원시 적률 합으로 전개해 계산
+    """
+    days = total['days']
+    mean, sample = sample_covariance(total)
+    stocks = len(mean)
+    squares = np.diag(total['cross'])
+    mean_square = mean @ mean
+    centered_fourth = (total['fourth'].sum() - 4 * (total['skew'] @ mean).sum() + 2 * mean_square * squares.sum()
+                       + 4 * mean @ total['cross'] @ mean - 3 * days * mean_square ** 2)
+    norm = (sample * sample).sum()
+    target = np.trace(sample) / stocks
+    beta = (centered_fourth / days - norm) / (stocks * days)
+    delta = (norm - 2 * target * np.trace(sample) + stocks * target ** 2) / stocks
+    shrinkage = 0.0 if delta <= 0 else float(min(max(beta, 0), delta) / delta)
+    shrunk = (1 - shrinkage) * sample
+    shrunk[np.diag_indices(stocks)] += shrinkage * target
+    return shrunk, shrinkage
+
+
+def sector_model(sample, sectors):
+    """표본 공분산 → 업종 요인모형 공분산 B F Bᵀ + D
+
+    업종 요인은 업종 내 동일가중 수익률, 종목 베타 = cov(종목, 업종) / var(업종), D 는 남는 고유분산
+    """
+    names, sector = np.unique(np.asarray(sectors), return_inverse=True)
+    membership = np.zeros((len(sector), len(names)))
+    membership[np.arange(len(sector)), sector] = 1
+    membership /= membership.sum(axis=0)
+    exposure = sample @ membership                                   # cov(종목, 업종 요인)
+    factor = membership.T @ exposure                                 # 업종 요인 공분산
+    variance = np.maximum(np.diag(factor), 1e-18)
+    beta = exposure[np.arange(len(sector)), sector] / variance[sector]
+    loadings = np.zeros_like(membership)
+    loadings[np.arange(len(sector)), sector] = beta
+    model = loadings @ factor @ loadings.T
+    total = np.diag(sample)
+    specific = np.maximum(total - np.diag(model), MIN_SPECIFIC * total)
+    model[np.diag_indices(len(sector))] += specific
+    return model
+
+
+class CovarianceStore:
+    """price_store 공분산 캐시
+
+    사용 예:
+        covariance = CovarianceStore(PriceStore('price_store'))
+        covariance.refresh()                          # 필요하면 계산/갱신 ('hit', 'append', 'rebuild')
+        matrix = covariance.matrix('ledoit_wolf')     # (종목, 종목) 메모리 매핑 배열
+        sub = covariance.matrix('sector', ['000001', '000002'])
+
+    window    - 추정 구간 (최근 거래일 수, None 이면 전 기간)
+    directory - 캐시 디렉터리 (기본: 저장소 디렉터리 + '_covariance')
+    """
+
+    def __init__(self, store, window=DEFAULT_WINDOW, directory=None):
+        self.store = store
+        self.window = window
+        self.directory = directory or cache_directory(store.directory, CACHE_SUFFIX)
+        self.meta = self._read_meta()
+
+    def _read_meta(self):
+        path = os.path.join(self.directory, META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _window(self):
+        """저장소 기준 현재 추정 구간 (slice)"""
+        days = self.store.shape[1]
+        return slice(0 if self.window is None else max(days - self.window, 0), days)
+
+    def status(self):
+        """캐시 상태: 'hit' (최신), 'append' (거래일 추가만 반영하면 됨), 'rebuild' (전체 재계산)"""
+        meta = self.meta
+        if (meta is None or meta.get('format') != CACHE_FORMAT or meta.get('window') != self.window
+                or meta.get('codes') != codes_hash(self.store.codes)):
+            return 'rebuild'
+        dates = np.load(os.path.join(self.directory, DATES_FILE))
+        first = int(np.searchsorted(self.store.dates, dates[0]))
+        cached = slice(first, first + len(dates))
+        if cached.stop > len(self.store.dates) or not np.array_equal(self.store.dates[cached], dates):
+            return 'rebuild'
+        hashes = np.load(os.path.join(self.directory, HASHES_FILE))
+        if not np.array_equal(day_hashes(self.store._returns[:, cached]), hashes):
+            return 'rebuild'
+        current = self._window()
+        if cached == current:
+            return 'hit'
+        # 추가된 거래일이 구간보다 길면 겹치는 날이 없어 다시 계산하는 편이 빠름
+        return 'append' if current.start < cached.stop else 'rebuild'
+
+    def refresh(self):
+        """캐시를 저장소에 맞춤, 수행한 작업 ('hit', 'append', 'rebuild') 반환"""
+        status = self.status()
+        if status == 'hit':
+            return status
+        returns = self.store._returns
+        current = self._window()
+        if status == 'rebuild':
+            total = moments(returns[:, current])
+        else:
+            dates = np.load(os.path.join(self.directory, DATES_FILE))
+            first = int(np.searchsorted(self.store.dates, dates[0]))
+            total = self._load_moments()
+            combine(total, moments(returns[:, first + len(dates):current.stop]))
+            if current.start > first:
+                combine(total, moments(returns[:, first:current.start]), sign=-1)
+        self._write(total, current)
+        return status
+
+    def _load_moments(self):
+        total = {'days': self.meta['days']}
+        for name, filename in MOMENT_FILES.items():
+            total[name] = np.load(os.path.join(self.directory, filename))
+        return total
+
+    def _write(self, total, current):
+        """적률 합과 추정 공분산을 임시 디렉터리에 쓴 뒤 교체"""
+        mean, sample = sample_covariance(total)
+        shrunk, shrinkage = ledoit_wolf(total)
+        estimates = {'sample': sample, 'ledoit_wolf': shrunk}
+        if self.store.sectors:
+            estimates['sector'] = sector_model(sample, self.store.sectors)
+
+        parent = os.path.dirname(os.path.abspath(self.directory))
+        os.makedirs(parent, exist_ok=True)
+        temp = tempfile.mkdtemp(prefix='.covariance_', dir=parent)
+        try:
+            for name, filename in MOMENT_FILES.items():
+                np.save(os.path.join(temp, filename), total[name])
+            for name, matrix in estimates.items():
+                np.save(os.path.join(temp, ESTIMATE_FILES[name]), matrix)
+            np.save(os.path.join(temp, DATES_FILE), self.store.dates[current])
+            np.save(os.path.join(temp, HASHES_FILE), day_hashes(self.store._returns[:, current]))
+            meta = {
+                'format': CACHE_FORMAT,
+                'window': self.window,
+                'codes': codes_hash(self.store.codes),
+                'days': int(total['days']),
+                'start': str(self.store.dates[current][0]),
+                'end': str(self.store.dates[current][-1]),
+                'shrinkage': shrinkage,
+                'estimates': sorted(estimates),
+            }
+            with open(os.path.join(temp, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory)
+            os.replace(temp, self.directory)
+        finally:
+            if os.path.isdir(temp):
+                shutil.rmtree(temp)
+        self.meta = meta
+
+    def matrix(self, method='ledoit_wolf', codes=None):
+        """공분산 (종목, 종목) - 전체는 메모리 매핑 (복사 없음), codes 를 주면 해당 종목만 배열로
+
+        캐시가 없거나 저장소와 맞지 않으면 먼저 refresh() 해야 함
+        """
+        if self.meta is None:
+            raise ValueError(f"{self.directory}: 공분산 캐시가 없습니다 (refresh() 먼저 실행)")
+        if method not in self.meta['estimates']:
+            raise ValueError(f"캐시에 없는 공분산 추정입니다: {method} (있는 것: {', '.join(self.meta['estimates'])})")
+        matrix = np.load(os.path.join(self.directory, ESTIMATE_FILES[method]), mmap_mode='r')
+        if codes is None:
+            return matrix
+        index = self.store.stock_index(codes)
+        return matrix[np.ix_(index, index)]
+
+    def mean(self):
+        """추정 구간의 종목별 평균 일간 수익률 (종목)"""
+        if self.meta is None:
+            raise ValueError(f"{self.directory}: 공분산 캐시가 없습니다 (refresh() 먼저 실행)")
+        return np.load(os.path.join(self.directory, MOMENT_FILES['sum'])) / self.meta['days']
+
+    @property
+    def shrinkage(self):
+        return None if self.meta is None else self.meta['shrinkage']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='시세 저장소 공분산 (Ledoit-Wolf / 업종 요인모형) 캐시 생성/갱신')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--cache', help='캐시 디렉터리 (기본: 저장소 + _covariance)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='추정 구간 (거래일, 0 이면 전 기간)')
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    covariance = CovarianceStore(store, args.window or None, args.cache)
+    started = time.perf_counter()
+    status = covariance.refresh()
+    elapsed = time.perf_counter() - started
+    labels = {'hit': '최신 상태 (재사용)', 'append': '추가 거래일 반영', 'rebuild': '전체 계산'}
+    meta = covariance.meta
+    print(f"🧮 {covariance.directory}: {labels[status]} ({elapsed:.2f}초)")
+    print(f"   종목 {len(store):,}개, 구간 {meta['start']} ~ {meta['end']} ({meta['days']:,}일), "
+          f"Ledoit-Wolf 수축 강도 {meta['shrinkage']:.4f}, 추정: {', '.join(meta['estimates'])}")
@@ -0,0 +1,17 @@
+-- 종목일별시세 테이블 생성 스크립트
+-- 데이터는 price_history.py 로 생성 (python price_history.py --output insert_price_history.sql)
+
+USE kpsdb;
+
+CREATE TABLE IF NOT EXISTS stock_price_history (
+    stock_code VARCHAR(10) NOT NULL COMMENT '종목코드',
+    trading_date CHAR(8) NOT NULL COMMENT '거래일자 (YYYYMMDD)',
+    close_price DECIMAL(15,2) NOT NULL DEFAULT 0 COMMENT '종가',
+    change_rate DECIMAL(7,2) NOT NULL DEFAULT 0 COMMENT '등락률 (%)',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '생성일시',
+    PRIMARY KEY (stock_code, trading_date),
+    INDEX idx_stock_price_history_date (trading_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='종목일별시세';
+
+-- 테이블 생성 확인
+DESCRIBE stock_price_history;
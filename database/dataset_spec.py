@@ -0,0 +1,897 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+선언형 Mock 데이터셋 생성 엔진
+테이블별 행 수, 컬럼 값 분포, 참조 관계를 스펙(dict)으로 선언하면
+sql/create_tables_final.sql 스키마와 대조한 뒤 참조 순서대로 INSERT 구문을 스트리밍 생성
+계좌 수를 배율(scale)로 늘려 1배 ~ 10,000배 규모의 부하 테스트용 데이터셋 생성 가능
+"""
+
+import argparse
+import copy
+import os
+import re
+import time
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from generation_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE, GenerationCache, cache_key, code_version
+from reference_data import (ACCOUNT_NUMBER, BUY_SELL_CODES, HOLDING_QUANTITIES, STRATEGIES, STRATEGY_COLUMNS,
+                            company_names)
+from sql_writer import DEFAULT_MAX_BYTES, SqlWriter, amount
+from tsv_writer import WRITERS
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sql', 'create_tables_final.sql')
+
+MAX_SCALE = 10000
+
+# 계좌별 테이블 생성 백엔드 (python: 행 단위 random 루프, numpy: vector_backend 컬럼 단위 벡터화)
+BACKENDS = ('python', 'numpy')
+
+# 구간별 행 파일을 병합할 때 한 번에 읽는 줄 수
+MERGE_BATCH = 100000
+
+# 기본 데이터셋 스펙 (scale=1 기준, 기존 생성 스크립트와 같은 규모)
+#
+# 테이블 항목:
+#   rows      - 전체 행 수 (계좌와 무관한 공용 테이블)
+#   per       - 'account' 이면 계좌마다 rows 행, 테이블명이면 해당 테이블 행마다 1행
+#   sizes     - ('power_law', 지수, 최대 행 수): 계좌별 행 수를 rows ~ 최대 행 수 멱법칙으로 (skew_sampling.py,
+#               계좌별 테이블만, 다른 테이블이 참조할 수 없고 sample 규칙과 함께 쓸 수 없음)
+#   values    - 고정 행 목록 (columns 와 같은 순서의 튜플)
+#   columns   - 컬럼명 → 값 생성 규칙 (아래 컬럼 규칙 참고)
+#   positions - 포지션 추적 매매 흐름 (trade_stream.py, 계좌별 테이블만, numpy 필요)
+#                 stock_code / quantity: 계좌별 보유 테이블의 종목코드 / 최종 보유수량 컬럼 ('table.column')
+#                 price: 현재가 컬럼 ('table.column', 같은 테이블의 같은 이름 종목코드 컬럼으로 조회)
+#                 start / days: 매매 기간 (기준일 YYYYMMDD, 달력일 수, 그 안의 KRX 영업일에만 매매)
+#                 holding_days: 평균 보유기간 (거래일, 선택)
+#               매도는 항상 보유수량 이내이고, 마지막 보유수량이 보유 테이블 수량과 같음
+#
+# 컬럼 규칙:
+#   ('account',)                 계좌번호
+#   ('sequence', fmt)            행 번호(1부터)를 fmt 로 포맷 (계좌별 테이블은 계좌마다 1부터)
+#   ('randint', lo, hi)          정수 균등분포
+#   ('amount', lo, hi)           금액 (정수 균등분포 → DECIMAL(15,2))
+#   ('uniform', lo, hi, digits)  실수 균등분포 (소수점 digits 자리 반올림)
+#   ('choice', values)           값 목록 중 임의 선택
+#   ('items', values)            값 목록을 행 순서대로 순환
+#   ('const', value)             고정값
+#   ('weight', total, digits)    계좌 안 행들의 합이 정확히 total 이 되는 임의 비중 (소수점 digits 자리, 계좌별 테이블)
+#   ('date', 'YYYYMMDD', days)   기준일 + 0~days 일 (YYYYMMDD 문자열)
+#   ('business_day', 'YYYYMMDD', days)
+#                                기준일 ~ 기준일 + days 일 중 KRX 영업일 (trading_calendar.py, numpy 필요)
+#   ('ref', 'table.column')      참조 테이블 값 중 임의 선택
+#   ('sample', 'table.column')   참조 테이블 값 중 계좌 안에서 중복 없이 선택
+#                                ref/sample 은 세 번째 항목 ('zipf', 지수) 를 주면 참조 값 목록 앞쪽일수록
+#                                자주 선택 (skew_sampling.py 별칭 표)
+#   ('cycle', 'table.column')    같은 계좌의 참조 테이블 값을 행 순서대로 순환
+#   ('parent', 'column')         per 로 지정한 부모 행의 컬럼 값
+#   ('stock_name', 'column')     같은 행의 종목코드 컬럼에 해당하는 종목명
+#   ('position', field)          positions 매매 흐름의 값 (date, stock_code, buy_sell_code, quantity, amount)
+DEFAULT_SPEC = {
+    'accounts': 1,
+    'first_account': ACCOUNT_NUMBER,
+    'tables': {
+        'stock_current_price': {
+            'rows': 2500,
+            'columns': {
+                'stock_code': ('sequence', '{:06d}'),
+                'current_price': ('amount', 1000, 900000),
+            },
+        },
+        'rebalancing_master': {
+            'values': STRATEGIES,
+            'columns': STRATEGY_COLUMNS,
+        },
+        'rebalancing_analysis': {
+            'per': 'rebalancing_master',
+            'columns': {
+                'rebalancing_strategy_code': ('parent', 'rebalancing_strategy_code'),
+                'expected_return': ('uniform', 3.5, 18.5, 2),
+                'volatility': ('uniform', 5.0, 25.0, 2),
+                'max_drawdown': ('uniform', 3.0, 35.0, 2),
+                'investor_preference': ('randint', 1, 5),
+            },
+        },
+        'customer_deposit': {
+            'per': 'account',
+            'rows': 1,
+            'columns': {
+                'account_number': ('account',),
+                'deposit_amount': ('amount', 1000000, 100000000),
+            },
+        },
+        'customer_balance': {
+            'per': 'account',
+            'rows': 20,
+            'columns': {
+                'account_number': ('account',),
+                'stock_code': ('sample', 'stock_current_price.stock_code'),
+                'stock_name': ('stock_name', 'stock_code'),
+                'quantity': ('items', HOLDING_QUANTITIES),
+                'purchase_amount': ('amount', 1000000, 80000000),
+                'rebalancing_target_weight': ('weight', 100, 2),
+            },
+        },
+        'trading_history': {
+            'per': 'account',
+            'rows': 930,
+            'positions': {
+                'stock_code': 'customer_balance.stock_code',
+                'quantity': 'customer_balance.quantity',
+                'price': 'stock_current_price.current_price',
+                'start': '20240101',
+                'days': 300,
+            },
+            'columns': {
+                'account_number': ('account',),
+                'trading_date': ('position', 'date'),
+                'order_number': ('sequence', 'ORD{:06d}'),
+                'execution_number': ('sequence', 'EXE{:06d}'),
+                'stock_code': ('position', 'stock_code'),
+                'buy_sell_code': ('position', 'buy_sell_code'),
+                'order_quantity': ('position', 'quantity'),
+                'order_amount': ('position', 'amount'),
+            },
+        },
+        'customer_strategy': {
+            'per': 'account',
+            'rows': 1,
+            'columns': {
+                'account_number': ('account',),
+                'rebalancing_strategy_code': ('ref', 'rebalancing_master.rebalancing_strategy_code'),
+                'rebalancing_cycle': ('choice', [7, 30, 90, 180]),
+                'allowed_deviation': ('uniform', 3.0, 10.0, 2),
+                'rebalancing_yn': ('choice', ['Y', 'N']),
+            },
+        },
+    },
+}
+
+_REFERENCE_KINDS = ('ref', 'sample', 'cycle')
+
+# ('position', field) 규칙으로 꺼낼 수 있는 매매 흐름 값
+POSITION_FIELDS = ('date', 'stock_code', 'buy_sell_code', 'quantity', 'amount')
+
+# positions 에서 'table.column' 으로 참조하는 항목
+_POSITION_TARGETS = ('stock_code', 'quantity', 'price')
+
+# skewed_spec() 기본값: 종목 인기도 Zipf 지수, 계좌별 매매 건수 멱법칙 지수, 최대 매매 건수 배수
+SKEW_ZIPF = 1.1
+SKEW_POWER_LAW = 2.0
+SKEW_MAX_MULTIPLE = 100
+
+
+def parse_schema(path=SCHEMA_PATH):
+    """CREATE TABLE 구문에서 테이블별 컬럼, PK, UNIQUE KEY, FOREIGN KEY 추출"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    schema = {}
+    for match in re.finditer(r"CREATE TABLE `(\w+)` \((.*?)\n\) ENGINE", content, re.DOTALL):
+        table, body = match.group(1), match.group(2)
+        columns = {}
+        primary_key = []
+        unique_keys = {}
+        foreign_keys = []
+
+        for line in body.split('\n'):
+            line = line.strip().rstrip(',')
+            column = re.match(r"`(\w+)` (\w+)(?:\((.*?)\))?(.*)", line)
+            if column:
+                name, col_type, args, rest = column.groups()
+                columns[name] = {
+                    'type': col_type.lower(),
+                    'enum': re.findall(r"'([^']*)'", args) if col_type.lower() == 'enum' else None,
+                    'nullable': 'NOT NULL' not in rest,
+                    'has_default': 'DEFAULT' in rest or 'AUTO_INCREMENT' in rest,
+                }
+            elif line.startswith('PRIMARY KEY'):
+                primary_key = re.findall(r"`(\w+)`", line)
+            elif line.startswith('UNIQUE KEY'):
+                names = re.findall(r"`(\w+)`", line)
+                unique_keys[names[0]] = names[1:]
+            elif 'FOREIGN KEY' in line:
+                fk = re.search(r"FOREIGN KEY \(`(\w+)`\) REFERENCES `(\w+)` \(`(\w+)`\)", line)
+                foreign_keys.append(fk.groups())
+
+        schema[table] = {
+            'columns': columns,
+            'primary_key': primary_key,
+            'unique_keys': unique_keys,
+            'foreign_keys': foreign_keys,
+        }
+
+    return schema
+
+
+def column_names(table_spec):
+    """스펙에 선언된 컬럼명 목록"""
+    return list(table_spec['columns'])
+
+
+def dependencies(table, table_spec, schema):
+    """테이블이 먼저 입력되어야 하는 참조 테이블 집합 (스키마 FK + 스펙 참조 규칙)"""
+    parents = set()
+    for _, ref_table, _ in schema.get(table, {}).get('foreign_keys', []):
+        parents.add(ref_table)
+    per = table_spec.get('per')
+    if per and per != 'account':
+        parents.add(per)
+    if isinstance(table_spec['columns'], dict):
+        for rule in table_spec['columns'].values():
+            if rule[0] in _REFERENCE_KINDS:
+                parents.add(rule[1].split('.')[0])
+    positions = table_spec.get('positions', {})
+    for name in _POSITION_TARGETS:
+        if name in positions:
+            parents.add(positions[name].split('.')[0])
+    parents.discard(table)
+    return parents
+
+
+def table_order(spec, schema):
+    """참조 관계를 위상 정렬해 입력 순서 결정 (동순위는 스펙 선언 순서 유지)"""
+    tables = list(spec['tables'])
+    parents = {table: dependencies(table, spec['tables'][table], schema) & set(tables) for table in tables}
+
+    order = []
+    ready = [table for table in tables if not parents[table]]
+    while ready:
+        table = ready.pop(0)
+        order.append(table)
+        for child in tables:
+            if table in parents[child]:
+                parents[child].discard(table)
+                if not parents[child] and child not in order and child not in ready:
+                    ready.append(child)
+        ready.sort(key=tables.index)
+
+    if len(order) != len(tables):
+        remaining = [table for table in tables if table not in order]
+        raise ValueError(f"테이블 참조 관계에 순환이 있습니다: {', '.join(remaining)}")
+    return order
+
+
+def validate_spec(spec, schema):
+    """스펙의 테이블/컬럼/참조/ENUM 값이 스키마와 맞는지 검사"""
+    for table, table_spec in spec['tables'].items():
+        if table not in schema:
+            raise ValueError(f"스키마에 없는 테이블입니다: {table}")
+        schema_columns = schema[table]['columns']
+        names = column_names(table_spec)
+
+        for name in names:
+            if name not in schema_columns:
+                raise ValueError(f"{table}: 스키마에 없는 컬럼입니다: {name}")
+
+        for name, info in schema_columns.items():
+            if name not in names and not info['nullable'] and not info['has_default']:
+                raise ValueError(f"{table}: 필수 컬럼이 스펙에 없습니다: {name}")
+
+        per = table_spec.get('per')
+        if per and per != 'account' and per not in spec['tables']:
+            raise ValueError(f"{table}: per 로 지정한 테이블이 스펙에 없습니다: {per}")
+
+        if 'values' in table_spec:
+            for row in table_spec['values']:
+                if len(row) != len(names):
+                    raise ValueError(f"{table}: 고정 행의 컬럼 수가 맞지 않습니다: {row}")
+                for name, value in zip(names, row):
+                    check_enum(table, name, schema_columns[name], [value])
+            continue
+
+        for name, rule in table_spec['columns'].items():
+            kind = rule[0]
+            if kind in _REFERENCE_KINDS:
+                ref_table, ref_column = rule[1].split('.')
+                if ref_table not in spec['tables'] or ref_column not in column_names(spec['tables'][ref_table]):
+                    raise ValueError(f"{table}.{name}: 참조 대상이 스펙에 없습니다: {rule[1]}")
+                if kind == 'cycle' and spec['tables'][ref_table].get('per') != 'account':
+                    raise ValueError(f"{table}.{name}: cycle 은 계좌별 테이블만 참조할 수 있습니다: {rule[1]}")
+                if 'sizes' in spec['tables'][ref_table]:
+                    raise ValueError(f"{table}.{name}: sizes 가 있는 테이블은 참조할 수 없습니다: {rule[1]}")
+                if len(rule) > 2 and (kind == 'cycle' or rule[2][0] != 'zipf'):
+                    raise ValueError(f"{table}.{name}: 가중 선택은 ref/sample 의 ('zipf', 지수) 만 지원합니다: {rule}")
+                if kind == 'sample' and 'sizes' in table_spec:
+                    raise ValueError(f"{table}.{name}: sizes 가 있는 테이블에서는 sample 규칙을 쓸 수 없습니다")
+            elif kind in ('choice', 'items'):
+                check_enum(table, name, schema_columns[name], rule[1])
+            elif kind == 'const':
+                check_enum(table, name, schema_columns[name], [rule[1]])
+            elif kind == 'weight':
+                if per != 'account':
+                    raise ValueError(f"{table}.{name}: weight 규칙은 계좌별(per: account) 테이블에서만 쓸 수 있습니다")
+            elif kind == 'position':
+                if 'positions' not in table_spec:
+                    raise ValueError(f"{table}.{name}: position 규칙은 positions 가 선언된 테이블에서만 쓸 수 있습니다")
+                if rule[1] not in POSITION_FIELDS:
+                    raise ValueError(f"{table}.{name}: 알 수 없는 매매 흐름 값입니다: {rule[1]}")
+                if rule[1] == 'buy_sell_code':
+                    check_enum(table, name, schema_columns[name], BUY_SELL_CODES)
+
+        if 'positions' in table_spec:
+            validate_positions(spec, table, table_spec)
+        if 'sizes' in table_spec:
+            kind, _, maximum = table_spec['sizes']
+            if kind != 'power_law' or per != 'account' or maximum < table_spec['rows']:
+                raise ValueError(f"{table}: sizes 는 계좌별 테이블의 ('power_law', 지수, rows 이상 최대 행 수) 여야 합니다")
+
+
+def validate_positions(spec, table, table_spec):
+    """positions 매매 흐름의 보유/현재가 참조와 행 수 검사"""
+    if table_spec.get('per') != 'account':
+        raise ValueError(f"{table}: positions 는 계좌별(per: account) 테이블만 쓸 수 있습니다")
+    positions = table_spec['positions']
+    for name in _POSITION_TARGETS + ('start', 'days'):
+        if name not in positions:
+            raise ValueError(f"{table}: positions 에 {name} 항목이 없습니다")
+    targets = {}
+    for name in _POSITION_TARGETS:
+        ref_table, ref_column = positions[name].split('.')
+        if ref_table not in spec['tables'] or ref_column not in column_names(spec['tables'][ref_table]):
+            raise ValueError(f"{table}: positions.{name} 참조 대상이 스펙에 없습니다: {positions[name]}")
+        targets[name] = (ref_table, ref_column)
+
+    holdings = targets['stock_code'][0]
+    if (targets['quantity'][0] != holdings or spec['tables'][holdings].get('per') != 'account'
+            or 'sizes' in spec['tables'][holdings]):
+        raise ValueError(f"{table}: positions 의 stock_code/quantity 는 sizes 없는 같은 계좌별 테이블 컬럼이어야 합니다")
+    price_table = targets['price'][0]
+    if (spec['tables'][price_table].get('per') == 'account'
+            or targets['stock_code'][1] not in column_names(spec['tables'][price_table])):
+        raise ValueError(f"{table}: positions.price 는 종목코드 컬럼({targets['stock_code'][1]})이 있는 "
+                         f"공용 테이블이어야 합니다: {positions['price']}")
+    if table_spec['rows'] < spec['tables'][holdings]['rows']:
+        raise ValueError(f"{table}: 계좌별 매매 {table_spec['rows']}건이 보유 종목 수 "
+                         f"{spec['tables'][holdings]['rows']}개보다 적습니다 (종목마다 최소 1건 매수)")
+
+
+def check_enum(table, name, column, values):
+    """ENUM 컬럼에 허용되지 않는 값이 있는지 검사"""
+    if column['enum'] is None:
+        return
+    invalid = [value for value in values if value not in column['enum']]
+    if invalid:
+        raise ValueError(f"{table}.{name}: 허용되지 않는 ENUM 값입니다: {invalid}")
+
+
+def skewed_spec(spec=DEFAULT_SPEC, zipf=SKEW_ZIPF, power_law=SKEW_POWER_LAW, max_multiple=SKEW_MAX_MULTIPLE):
+    """쏠린 부하 스펙: 종목 선택 (ref/sample) 을 Zipf 인기도로, 매매내역 계좌별 건수를 멱법칙으로 바꾼 사본
+
+    소수 종목에 보유/매매가 몰려 idx_stock_code 의 뜨거운 키, 소수 큰 계좌가 계좌 조회의 긴 꼬리를 재현
+    """
+    skewed = copy.deepcopy(spec)
+    for table_spec in skewed['tables'].values():
+        if not isinstance(table_spec['columns'], dict):
+            continue
+        for name, rule in table_spec['columns'].items():
+            if rule[0] in ('ref', 'sample') and rule[1].endswith('.stock_code'):
+                table_spec['columns'][name] = (rule[0], rule[1], ('zipf', zipf))
+    trades = skewed['tables'].get('trading_history')
+    if trades and trades.get('per') == 'account':
+        trades['sizes'] = ('power_law', power_law, trades['rows'] * max_multiple)
+    return skewed
+
+
+def account_numbers(spec, scale):
+    """배율에 맞는 계좌번호 목록 (첫 계좌부터 1씩 증가)"""
+    first = int(spec['first_account'])
+    count = spec['accounts'] * scale
+    return [str(first + i) for i in range(count)]
+
+
+class DatasetGenerator:
+    """스펙 하나를 받아 참조 순서대로 행을 생성하는 생성기
+
+    난수는 (seed, 테이블, 계좌) 별 독립 스트림을 사용하므로
+    같은 seed 면 테이블/계좌를 어떤 순서로 생성해도 같은 행이 나옴
+    """
+
+    def __init__(self, spec=DEFAULT_SPEC, scale=1, seed=42, schema=None):
+        if not 1 <= scale <= MAX_SCALE:
+            raise ValueError(f"scale 은 1 ~ {MAX_SCALE:,} 사이여야 합니다: {scale}")
+        self.spec = spec
+        self.scale = scale
+        self.seed = seed
+        self.schema = schema if schema is not None else parse_schema()
+        validate_spec(spec, self.schema)
+        self.order = table_order(spec, self.schema)
+        self.accounts = account_numbers(spec, scale)
+
+        self._names = company_names()
+        self._shared_values = {}
+        self._last_account_rows = {}
+        self._sizes = {}
+        self._weights = {}
+
+    def rng(self, table, account=''):
+        """(seed, 테이블, 계좌) 별 독립 난수 스트림"""
+        return random.Random(f"{self.seed}/{table}/{account}")
+
+    def row_count(self, table):
+        """테이블의 생성 예정 행 수"""
+        table_spec = self.spec['tables'][table]
+        if 'values' in table_spec:
+            return len(table_spec['values'])
+        per = table_spec.get('per')
+        if per == 'account':
+            sizes = self.account_sizes(table)
+            return table_spec['rows'] * len(self.accounts) if sizes is None else int(sizes.sum())
+        if per:
+            return self.row_count(per)
+        return table_spec['rows']
+
+    def account_sizes(self, table):
+        """sizes 가 있는 계좌별 테이블의 계좌별 행 수 배열 (계좌 순서, 없으면 None, numpy 필요)"""
+        table_spec = self.spec['tables'][table]
+        if 'sizes' not in table_spec:
+            return None
+        if table not in self._sizes:
+            from skew_sampling import account_sizes
+
+            _, exponent, maximum = table_spec['sizes']
+            self._sizes[table] = account_sizes(self.seed, table, len(self.accounts), table_spec['rows'], maximum,
+                                               exponent)
+        return self._sizes[table]
+
+    def account_row_count(self, table, account):
+        """계좌 하나의 행 수"""
+        sizes = self.account_sizes(table)
+        if sizes is None:
+            return self.spec['tables'][table]['rows']
+        return int(sizes[int(account) - int(self.accounts[0])])
+
+    def weight_table(self, weighting, count):
+        """가중 규칙 ('zipf', 지수) 의 값 count 개 별칭 표 (같은 규칙/개수는 재사용, numpy 필요)"""
+        key = (tuple(weighting), count)
+        if key not in self._weights:
+            from skew_sampling import weighted_table
+
+            self._weights[key] = weighted_table(weighting, count)
+        return self._weights[key]
+
+    def is_account_table(self, table):
+        """계좌마다 행이 생성되는 테이블인지 여부"""
+        return self.spec['tables'][table].get('per') == 'account'
+
+    def prepare_shared(self):
+        """계좌별 테이블이 참조하는 공용 테이블 값만 미리 생성 (출력 없이, 병렬 작업 프로세스용)"""
+        for table in self.order:
+            if not self.is_account_table(table) and self._referenced_columns(table):
+                for _ in self.shared_rows(table):
+                    pass
+
+    def rows(self, table, start=0, stop=None):
+        """테이블 행을 튜플로 하나씩 yield (계좌별 테이블은 계좌 구간 [start, stop) 을 계좌 순서대로)"""
+        if self.is_account_table(table):
+            for account in self.accounts[start:stop]:
+                yield from self.account_rows(table, account)
+        else:
+            yield from self.shared_rows(table)
+
+    def shared_rows(self, table):
+        """계좌와 무관한 공용 테이블 행 생성 (다른 테이블이 참조할 컬럼 값은 보관)"""
+        table_spec = self.spec['tables'][table]
+        names = column_names(table_spec)
+        if 'values' in table_spec:
+            rows = table_spec['values']
+        else:
+            rows = self._generate(table, '', self._shared_parent_rows(table))
+
+        kept = {name: [] for name in self._referenced_columns(table)}
+        for values in rows:
+            for name in kept:
+                kept[name].append(values[names.index(name)])
+            yield tuple(values)
+        for name, values in kept.items():
+            self._shared_values[(table, name)] = values
+
+    def account_rows(self, table, account):
+        """계좌 하나의 행 목록 (직전 계좌 결과는 하위 테이블의 cycle 참조용으로 재사용)"""
+        cached = self._last_account_rows.get(table)
+        if cached and cached[0] == account:
+            return cached[1]
+        rows = list(self._generate(table, account, None))
+        self._last_account_rows[table] = (account, rows)
+        return rows
+
+    def _shared_parent_rows(self, table):
+        per = self.spec['tables'][table].get('per')
+        if not per:
+            return None
+        parent_spec = self.spec['tables'][per]
+        if 'values' in parent_spec:
+            return [dict(zip(column_names(parent_spec), row)) for row in parent_spec['values']]
+        raise ValueError(f"{table}: per 로 참조하는 공용 테이블은 values 로 선언해야 합니다: {per}")
+
+    def _referenced_columns(self, table):
+        referenced = set()
+        for table_spec in self.spec['tables'].values():
+            if isinstance(table_spec['columns'], dict):
+                for rule in table_spec['columns'].values():
+                    if rule[0] in ('ref', 'sample') and rule[1].split('.')[0] == table:
+                        referenced.add(rule[1].split('.')[1])
+            if 'positions' in table_spec and table_spec['positions']['price'].split('.')[0] == table:
+                # 현재가는 종목코드로 조회하므로 두 컬럼 모두 보관
+                referenced.add(table_spec['positions']['price'].split('.')[1])
+                referenced.add(table_spec['positions']['stock_code'].split('.')[1])
+        return referenced
+
+    def _reference_values(self, target, account):
+        ref_table, ref_column = target.split('.')
+        if (ref_table, ref_column) in self._shared_values:
+            return self._shared_values[(ref_table, ref_column)]
+        # 같은 계좌의 계좌별 테이블 값 (독립 난수 스트림이므로 다시 생성해도 동일)
+        names = column_names(self.spec['tables'][ref_table])
+        index = names.index(ref_column)
+        return [row[index] for row in self.account_rows(ref_table, account)]
+
+    def stock_name(self, stock_code):
+        """종목코드(000001~)에 대응하는 종목명 (앞 20개는 고객잔고 대표 종목명)"""
+        return self._names[(int(stock_code) - 1) % len(self._names)]
+
+    def _position_trades(self, table, account, count):
+        """positions 매매 흐름의 계좌 하나 매매 목록 (행마다 POSITION_FIELDS 값 dict, 일자순)"""
+        from trade_stream import HOLDING_DAYS, account_rng, account_trades
+        from trading_calendar import business_days
+
+        positions = self.spec['tables'][table]['positions']
+        stocks = self._reference_values(positions['stock_code'], account)
+        quantities = self._reference_values(positions['quantity'], account)
+        price_table, price_column = positions['price'].split('.')
+        prices = dict(zip(self._shared_values[(price_table, positions['stock_code'].split('.')[1])],
+                          self._shared_values[(price_table, price_column)]))
+        dates = business_days(positions['start'], positions['days'])
+
+        trades = account_trades(account_rng(self.seed, table, account), quantities,
+                                [float(prices[code]) for code in stocks], count, len(dates) - 1,
+                                positions.get('holding_days', HOLDING_DAYS))
+        return [{
+            'date': dates[day],
+            'stock_code': stocks[slot],
+            'buy_sell_code': code,
+            'quantity': quantity,
+            'amount': amount(won),
+        } for day, slot, code, quantity, won in trades]
+
+    def _generate(self, table, account, parent_rows):
+        table_spec = self.spec['tables'][table]
+        columns = table_spec['columns']
+        names = list(columns)
+        rng = self.rng(table, account)
+        if parent_rows is not None:
+            count = len(parent_rows)
+        else:
+            count = self.account_row_count(table, account) if account else table_spec['rows']
+
+        # 참조 값 목록과 계좌 내 비복원 추출 결과는 행 생성 전에 한 번만 준비
+        prepared = {}
+        weights = {}
+        for name, rule in columns.items():
+            kind = rule[0]
+            if kind in ('ref', 'cycle'):
+                prepared[name] = self._reference_values(rule[1], account)
+                if len(rule) > 2:
+                    weights[name] = self.weight_table(rule[2], len(prepared[name]))
+            elif kind == 'sample' and len(rule) > 2:
+                values = self._reference_values(rule[1], account)
+                picked = self.weight_table(rule[2], len(values)).draw_distinct(rng, count)
+                prepared[name] = sorted(values[i] for i in picked)
+            elif kind == 'sample':
+                prepared[name] = sorted(rng.sample(self._reference_values(rule[1], account), count))
+            elif kind == 'date':
+                prepared[name] = datetime.strptime(rule[1], '%Y%m%d')
+            elif kind == 'business_day':
+                from trading_calendar import business_days
+                prepared[name] = business_days(rule[1], rule[2])
+            elif kind == 'weight':
+                # [0, total] 을 임의의 count - 1 곳에서 잘라 나눈 조각 (합이 반올림 없이 total)
+                units = round(rule[1] * 10 ** rule[2])
+                cuts = sorted(rng.randint(0, units) for _ in range(count - 1)) + [units]
+                prepared[name] = [Decimal(high - low).scaleb(-rule[2]) for low, high in zip([0] + cuts, cuts)]
+        if 'positions' in table_spec:
+            trades = self._position_trades(table, account, count)
+
+        for i in range(count):
+            row = {}
+            for name, rule in columns.items():
+                kind = rule[0]
+                if kind == 'account':
+                    value = account
+                elif kind == 'sequence':
+                    value = rule[1].format(i + 1)
+                elif kind == 'randint':
+                    value = rng.randint(rule[1], rule[2])
+                elif kind == 'amount':
+                    value = amount(rng.randint(rule[1], rule[2]))
+                elif kind == 'uniform':
+                    value = round(rng.uniform(rule[1], rule[2]), rule[3])
+                elif kind == 'choice':
+                    value = rng.choice(rule[1])
+                elif kind == 'items':
+                    value = rule[1][i % len(rule[1])]
+                elif kind == 'const':
+                    value = rule[1]
+                elif kind == 'date':
+                    value = (prepared[name] + timedelta(days=rng.randint(0, rule[2]))).strftime('%Y%m%d')
+                elif kind == 'ref' and name in weights:
+                    value = prepared[name][weights[name].draw(rng)]
+                elif kind in ('ref', 'business_day'):
+                    value = rng.choice(prepared[name])
+                elif kind in ('sample', 'cycle'):
+                    value = prepared[name][i % len(prepared[name])]
+                elif kind == 'weight':
+                    value = prepared[name][i]
+                elif kind == 'parent':
+                    value = parent_rows[i][rule[1]]
+                elif kind == 'stock_name':
+                    value = self.stock_name(row[rule[1]])
+                elif kind == 'position':
+                    value = trades[i][rule[1]]
+                else:
+                    raise ValueError(f"{table}.{name}: 알 수 없는 컬럼 규칙입니다: {kind}")
+                row[name] = value
+            yield tuple(row[name] for name in names)
+
+
+def shard_ranges(count, shards):
+    """계좌 count 개를 shards 개의 연속 구간 [start, stop) 으로 분할"""
+    shards = max(1, min(shards, count))
+    size, extra = divmod(count, shards)
+    ranges = []
+    start = 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def vector_generator(generator, output_format='sql'):
+    """numpy 백엔드 생성기 (numpy 는 이 백엔드를 쓸 때만 필요하므로 여기서 import)"""
+    try:
+        from vector_backend import VectorGenerator
+    except ImportError as e:
+        raise ImportError("numpy 백엔드를 사용하려면 numpy 가 필요합니다 (pip install numpy)") from e
+    return VectorGenerator(generator, WRITERS[output_format].format_value, output_format)
+
+
+def generate_shard(spec, scale, seed, start, stop, directory, output_format='sql', backend='python', tables=None):
+    """계좌 구간 [start, stop) 의 계좌별 테이블 행을 테이블별 파일에 한 줄씩 기록 (프로세스 풀 작업 단위)
+
+    tables 를 주면 그 테이블만 생성 (캐시에 없는 테이블만 다시 만들 때)
+    """
+    format_row = WRITERS[output_format].format_row
+    generator = DatasetGenerator(spec, scale, seed)
+    # 계좌 목록은 자르지 않고 구간만 넘김 (skew 스펙의 계좌별 행 수, numpy 블록 난수 모두 전체 계좌 순번 기준)
+    vector = vector_generator(generator, output_format) if backend == 'numpy' else None
+    generator.prepare_shared()
+
+    paths = {}
+    for table in generator.order:
+        if not generator.is_account_table(table) or (tables is not None and table not in tables):
+            continue
+        path = os.path.join(directory, f"{table}.{start:08d}.rows")
+        with open(path, 'w', encoding='utf-8') as f:
+            if vector is not None:
+                for lines, _ in vector.lines(table, start, stop):
+                    if lines:
+                        f.write('\n'.join(lines))
+                        f.write('\n')
+            else:
+                for values in generator.rows(table, start, stop):
+                    # 문자열 안의 개행은 SQL/TSV 모두 이스케이프되므로 한 줄 = 한 행
+                    f.write(format_row(values))
+                    f.write('\n')
+        paths[table] = path
+    return paths
+
+
+def generate_shards(spec, scale, seed, workers, directory, output_format='sql', backend='python', tables=None):
+    """계좌를 구간별로 나눠 프로세스 풀에서 생성하고 구간 순서대로 테이블별 파일 목록 반환"""
+    accounts = spec['accounts'] * scale
+    ranges = shard_ranges(accounts, workers * 4)  # 작업량 편차를 줄이기 위해 작업자당 4개 구간
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_shard, spec, scale, seed, start, stop, directory, output_format, backend,
+                               tables)
+                   for start, stop in ranges]
+        results = [future.result() for future in futures]
+
+    shard_files = {}
+    for paths in results:
+        for table, path in paths.items():
+            shard_files.setdefault(table, []).append(path)
+    return shard_files
+
+
+def table_cache_keys(generator, output_format='sql', backend='python'):
+    """테이블별 생성 캐시 키 (생성기 버전, seed, 출력 형식, 테이블 스펙, 참조 테이블 키)
+
+    공용 테이블은 계좌 수와 무관하므로 scale 이 바뀌어도 키가 유지되고,
+    계좌별 테이블은 백엔드와 계좌 범위까지 키에 포함
+    """
+    version = code_version()
+    keys = {}
+    for table in generator.order:
+        table_spec = generator.spec['tables'][table]
+        parents = sorted((parent, keys[parent])
+                         for parent in dependencies(table, table_spec, generator.schema) if parent in keys)
+        parts = [version, generator.seed, output_format, table, table_spec, parents]
+        if generator.is_account_table(table):
+            parts += [backend, generator.accounts[0], len(generator.accounts)]
+        keys[table] = cache_key(*parts)
+    return keys
+
+
+def format_batches(rows, format_row, size=MERGE_BATCH):
+    """행 튜플 이터러블을 size 행씩 변환해 (행 문자열 목록, None) 으로 yield"""
+    rows = iter(rows)
+    while True:
+        lines = [format_row(values) for values in islice(rows, size)]
+        if not lines:
+            break
+        yield lines, None
+
+
+def generate(path, spec=DEFAULT_SPEC, scale=1, seed=42, workers=1, output_format='sql',
+             max_bytes=DEFAULT_MAX_BYTES, max_rows=None, commit_every=None, backend='python', cache=None):
+    """스펙대로 데이터셋 생성 후 테이블별 (행 수, 소요시간) 반환
+
+    output_format='sql' 이면 path 에 INSERT 구문 파일,
+    'tsv' 이면 path 디렉터리에 테이블별 TSV 파일과 참조 순서대로 적재하는 load_data.sql 생성
+    max_bytes/max_rows/commit_every 는 SQL 출력의 INSERT 분할/트랜잭션 묶음 설정 (SqlWriter 참고)
+
+    workers > 1 이면 계좌별 테이블을 프로세스 풀에서 계좌 구간 단위로 생성한 뒤 병합
+    계좌마다 독립 난수 스트림을 쓰므로 작업자 수와 관계없이 같은 seed 면 같은 파일이 생성됨
+
+    backend='numpy' 이면 계좌별 테이블을 vector_backend 로 블록 단위 벡터화 생성
+    (난수 생성기가 달라 python 백엔드와 값은 다르지만, 같은 seed 면 작업자 수와 관계없이 결과 동일)
+
+    cache 에 GenerationCache 를 주면 테이블별 행을 캐시에서 재사용하고 입력이 바뀐 테이블만 다시 생성
+    SQL 출력은 파일 전체도 캐시해 설정이 완전히 같으면 생성 없이 그대로 복사
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 생성 백엔드입니다: {backend}")
+    generator = DatasetGenerator(spec, scale, seed)
+    vector = vector_generator(generator, output_format) if backend == 'numpy' else None
+    format_row = WRITERS[output_format].format_row
+    stats = {}
+
+    print(f"🔄 데이터셋 생성 중... (scale={scale:,}, 계좌 {len(generator.accounts):,}개, seed={seed}, "
+          f"작업자 {workers}개, {backend} 백엔드)")
+    print(f"📋 입력 순서: {' → '.join(generator.order)}")
+
+    keys = table_cache_keys(generator, output_format, backend) if cache is not None else {}
+    cached = {table: cache.get(key) for table, key in keys.items()}
+    artifact_key = None
+    if cache is not None and output_format == 'sql' and path not in (None, '-'):
+        artifact_key = cache_key([keys[table] for table in generator.order], max_bytes, max_rows, commit_every)
+        artifact = cache.get(artifact_key, '.sql')
+        artifact_stats = cache.get_json(artifact_key)
+        if artifact is not None and artifact_stats is not None:
+            shutil.copyfile(artifact, path)
+            print(f"♻️  캐시 적중: 같은 설정의 생성 결과를 그대로 사용 ({artifact_key[:12]})")
+            return {table: tuple(value) for table, value in artifact_stats.items()}
+
+    missing = [table for table in generator.order if not cached.get(table)]
+    if cache is not None:
+        print(f"♻️  캐시 적중 {len(generator.order) - len(missing)}개 테이블, 생성 대상: {', '.join(missing) or '없음'}")
+    if cached and any(generator.is_account_table(table) for table in missing):
+        # 캐시에서 읽는 공용 테이블은 생성하지 않으므로, 계좌별 테이블이 참조할 값만 미리 준비
+        generator.prepare_shared()
+
+    with tempfile.TemporaryDirectory(prefix='dataset_shards_') as directory:
+        shard_files = {}
+        shard_time = 0.0
+        shard_tables = [table for table in missing if generator.is_account_table(table)]
+        if workers > 1 and shard_tables:
+            started = time.perf_counter()
+            shard_files = generate_shards(spec, scale, seed, workers, directory, output_format, backend, shard_tables)
+            shard_time = time.perf_counter() - started
+            print(f"   ⚙️  계좌별 테이블 병렬 생성: {shard_time:.2f}초")
+
+        usage = '-- 실행: mysql --local-infile=1 kpsdb < load_data.sql\n' if output_format == 'tsv' else ''
+        if output_format == 'sql':
+            writer = SqlWriter(path, max_bytes=max_bytes, max_rows=max_rows, commit_every=commit_every)
+        else:
+            writer = WRITERS[output_format](path)
+        with writer as sql:
+            sql.write(f"""-- 선언형 스펙 기반 Mock 데이터셋
+-- 생성일시: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+-- scale={scale}, seed={seed}, 계좌 {len(generator.accounts):,}개
+{usage}
+USE kpsdb;
+
+""")
+            for number, table in enumerate(generator.order, 1):
+                sql.write(f"-- {number}. {table} ({generator.row_count(table):,}건)\n")
+                columns = column_names(spec['tables'][table])
+                started = time.perf_counter()
+                if cached.get(table):
+                    batches = read_shard_lines([cached[table]])
+                elif table in shard_files:
+                    batches = read_shard_lines(shard_files[table])
+                elif vector is not None and generator.is_account_table(table):
+                    batches = vector.lines(table)
+                else:
+                    batches = format_batches(generator.rows(table), format_row)
+                if cache is not None and not cached.get(table):
+                    batches = cache.store_lines(keys[table], batches)
+                count = write_lines(sql, table, columns, batches)
+                elapsed = time.perf_counter() - started
+                stats[table] = (count, elapsed)
+                rate = count / elapsed if elapsed > 0 else 0
+                source = ' ♻️ 캐시' if cached.get(table) else ''
+                print(f"   ✅ {table}: {count:,}건 ({elapsed:.2f}초, {rate:,.0f}건/초){source}")
+
+    if artifact_key is not None:
+        cache.put_file(artifact_key, path, '.sql')
+        cache.put_json(artifact_key, stats)
+    if cache is not None:
+        removed = cache.evict()
+        if removed:
+            print(f"   🧹 캐시 용량 초과로 오래된 파일 {removed}개 삭제")
+
+    total_rows = sum(count for count, _ in stats.values())
+    total_time = shard_time + sum(elapsed for _, elapsed in stats.values())
+    print(f"📊 총 {total_rows:,}건, {total_time:.2f}초")
+    return stats
+
+
+def write_lines(sql, table, columns, batches):
+    """(행 문자열 목록, 바이트 수 목록) 묶음들을 INSERT 구문 하나로 기록하고 행 수 반환"""
+    before = sql.row_counts.get(table, 0)
+    sql.begin_insert(table, columns)
+    for lines, sizes in batches:
+        sql.formatted_rows(lines, sizes)
+    sql.end_insert()
+    return sql.row_counts.get(table, 0) - before
+
+
+def read_shard_lines(paths):
+    """구간별 행 파일을 순서대로 MERGE_BATCH 줄씩 읽어 (행 목록, None) 으로 yield"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            while True:
+                lines = [line[:-1] for line in islice(f, MERGE_BATCH)]
+                if not lines:
+                    break
+                yield lines, None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='선언형 스펙 기반 Mock 데이터셋 생성')
+    parser.add_argument('--scale', type=int, default=1, help=f'계좌 수 배율 (1 ~ {MAX_SCALE:,})')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    parser.add_argument('--output', default=None,
+                        help="출력 경로 (sql: 파일, '-' 이면 표준출력 / tsv: 디렉터리)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES, help='INSERT 구문당 최대 바이트 수')
+    parser.add_argument('--max-rows', type=int, default=None, help='INSERT 구문당 최대 행 수')
+    parser.add_argument('--commit-every', type=int, default=None, help='N 개 INSERT 구문마다 트랜잭션 COMMIT')
+    parser.add_argument('--workers', type=int, default=1, help=f'병렬 작업 프로세스 수 (CPU {os.cpu_count()}개)')
+    parser.add_argument('--backend', choices=BACKENDS, default='python',
+                        help='계좌별 테이블 생성 백엔드 (numpy: 컬럼 단위 벡터화, numpy 필요)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='생성 캐시 디렉터리')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE // 1024 // 1024,
+                        help='생성 캐시 최대 용량 (MB, 넘으면 오래 사용하지 않은 항목부터 삭제)')
+    parser.add_argument('--no-cache', action='store_true', help='생성 캐시를 사용하지 않음')
+    parser.add_argument('--skew', action='store_true',
+                        help='쏠린 부하 스펙 (종목 Zipf 인기도 + 계좌별 매매 건수 멱법칙, numpy 필요)')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = 'insert_dataset.sql' if args.format == 'sql' else 'dataset_tsv'
+
+    cache = None if args.no_cache else GenerationCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    spec = skewed_spec() if args.skew else DEFAULT_SPEC
+    generate(args.output, spec, scale=args.scale, seed=args.seed, workers=args.workers, output_format=args.format,
+             max_bytes=args.max_bytes, max_rows=args.max_rows, commit_every=args.commit_every, backend=args.backend,
+             cache=cache)
+    print(f"📁 파일: {args.output}")
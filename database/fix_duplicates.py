@@ -7,13 +7,16 @@
 
 import re
 import random
-from datetime import datetime, timedelta
+
+from reference_data import HOLDING_QUANTITIES
+from sql_writer import SqlWriter, amount
+from trading_calendar import business_days
 
 def create_clean_data():
     """중복 없는 깨끗한 데이터 생성"""
-    
+
     print("🔄 중복 없는 데이터 세트 생성 중...")
-    
+
     # 1. 고객잔고에 필요한 20개 종목 (우선순위 최고)
     customer_stocks = [
         ('005930', '삼성전자', 75000),
@@ -38,7 +41,7 @@ def create_clean_data():
         ('247540', '에코프로비엠', 28000)
     ]
     customer_stock_codes = set([stock[0] for stock in customer_stocks])
-    
+
     # 2. 기타 대형주 (고객잔고와 중복되지 않는 것들)
     major_stocks = []
     major_candidates = [
@@ -53,119 +56,121 @@ def create_clean_data():
         ('302440', 92000), ('326030', 85000), ('000720', 35000),
         ('009540', 38000), ('010140', 68000), ('064350', 125000)
     ]
-    
+
     for code, price in major_candidates:
         if code not in customer_stock_codes:
             major_stocks.append((code, price))
-    
+
     # 3. 2480개 추가 종목 생성 (중복 없이)
     additional_stocks = []
     used_codes = customer_stock_codes | set([stock[0] for stock in major_stocks])
-    
+
     # 패턴별로 생성
     for prefix in range(100000, 999999):
         if len(additional_stocks) >= 2480:
             break
-        
+
         code = f"{prefix:06d}"
         if code not in used_codes:
             price = random.randint(1000, 100000)
             additional_stocks.append((code, price))
             used_codes.add(code)
-    
-    # 4. 매매내역 생성 (930건, 중복 없는 PK)
-    trades = []
+
+    print(f"✅ 데이터 생성 완료:")
+    print(f"   📊 종목현재가: {len(customer_stocks) + len(major_stocks) + len(additional_stocks):,}개 (중복 없음)")
+
+    return customer_stocks, major_stocks, additional_stocks
+
+def generate_clean_trades(customer_stocks, major_stocks, additional_stocks):
+    """매매내역 생성 (930건, 중복 없는 PK) - 행 튜플을 하나씩 yield"""
+
     account_number = '99911122222'
     order_counter = 1
-    
+
+    # 2025년 8월 KRX 영업일 (주말/광복절 제외)
+    august = business_days('20250801', 30)
+
     # 고객잔고 형성을 위한 매수 (40건)
-    quantities = [500, 150, 80, 45, 25, 120, 200, 180, 220, 300, 
-                 85, 160, 90, 130, 75, 400, 110, 95, 60, 140]
-    
+    quantities = HOLDING_QUANTITIES
+
     for i, (stock_code, stock_name, _) in enumerate(customer_stocks):
         qty = quantities[i]
-        date = f"202508{random.randint(1, 31):02d}"
+        date = random.choice(august)
         price = random.randint(20000, 800000)
-        
+
         order_num = f"ORD{order_counter:08d}"
         exec_num = f"EXE{order_counter:08d}"
-        
-        trades.append(f"('{account_number}', '{date}', '{order_num}', '{exec_num}', '{stock_code}', '1', {qty}, {price}.00)")
+
+        yield (account_number, date, order_num, exec_num, stock_code, '1', qty, amount(price))
         order_counter += 1
-        
+
         # 분할 매수 (일부 종목)
         if i < 10:  # 처음 10개 종목만 분할 매수
             remaining_qty = int(qty * 0.3)
-            date2 = f"202508{random.randint(1, 31):02d}"
+            date2 = random.choice(august)
             price2 = price + random.randint(-5000, 10000)
-            
+
             order_num = f"ORD{order_counter:08d}"
             exec_num = f"EXE{order_counter:08d}"
-            
-            trades.append(f"('{account_number}', '{date2}', '{order_num}', '{exec_num}', '{stock_code}', '1', {remaining_qty}, {price2}.00)")
+
+            yield (account_number, date2, order_num, exec_num, stock_code, '1', remaining_qty, amount(price2))
             order_counter += 1
-    
+
     # 청산 완료 거래 (200건 = 100쌍)
     cleared_stocks = [stock[0] for stock in major_stocks[:50]]  # 대형주 중 50개
-    
+
     for stock_code in cleared_stocks:
         qty = random.randint(10, 200)
         buy_price = random.randint(5000, 100000)
         sell_price = buy_price + random.randint(-2000, 5000)
-        
+
         # 매수
-        buy_date = f"202508{random.randint(1, 28):02d}"
+        buy_day = random.randrange(len(august))
+        buy_date = august[buy_day]
         order_num = f"ORD{order_counter:08d}"
         exec_num = f"EXE{order_counter:08d}"
-        trades.append(f"('{account_number}', '{buy_date}', '{order_num}', '{exec_num}', '{stock_code}', '1', {qty}, {buy_price}.00)")
+        yield (account_number, buy_date, order_num, exec_num, stock_code, '1', qty, amount(buy_price))
         order_counter += 1
-        
+
         # 매도
-        sell_date_obj = datetime.strptime(buy_date, '%Y%m%d') + timedelta(days=random.randint(1, 3))
-        sell_date = sell_date_obj.strftime('%Y%m%d')
-        if sell_date > '20250831':
-            sell_date = '20250831'
-        
+        # 1~3 영업일 뒤 (8월 마지막 영업일을 넘지 않게)
+        sell_date = august[min(buy_day + random.randint(1, 3), len(august) - 1)]
+
         order_num = f"ORD{order_counter:08d}"
         exec_num = f"EXE{order_counter:08d}"
-        trades.append(f"('{account_number}', '{sell_date}', '{order_num}', '{exec_num}', '{stock_code}', '2', {qty}, {sell_price}.00)")
+        yield (account_number, sell_date, order_num, exec_num, stock_code, '2', qty, amount(sell_price))
         order_counter += 1
-    
+
     # 나머지 단타 매매 (680건 = 340쌍)
     remaining_stocks = [stock[0] for stock in additional_stocks[:340]]
-    
+
     for stock_code in remaining_stocks:
         qty = random.randint(5, 100)
         buy_price = random.randint(1000, 50000)
         sell_price = buy_price + random.randint(-500, 1000)
-        
+
         # 매수
-        buy_date = f"202508{random.randint(1, 30):02d}"
+        buy_date = random.choice(august)
         order_num = f"ORD{order_counter:08d}"
         exec_num = f"EXE{order_counter:08d}"
-        trades.append(f"('{account_number}', '{buy_date}', '{order_num}', '{exec_num}', '{stock_code}', '1', {qty}, {buy_price}.00)")
+        yield (account_number, buy_date, order_num, exec_num, stock_code, '1', qty, amount(buy_price))
         order_counter += 1
-        
+
         # 매도
-        sell_date = buy_date if random.random() > 0.3 else f"202508{random.randint(1, 31):02d}"
+        sell_date = buy_date if random.random() > 0.3 else random.choice(august)
         order_num = f"ORD{order_counter:08d}"
         exec_num = f"EXE{order_counter:08d}"
-        trades.append(f"('{account_number}', '{sell_date}', '{order_num}', '{exec_num}', '{stock_code}', '2', {qty}, {sell_price}.00)")
+        yield (account_number, sell_date, order_num, exec_num, stock_code, '2', qty, amount(sell_price))
         order_counter += 1
-    
-    print(f"✅ 데이터 생성 완료:")
-    print(f"   📊 종목현재가: {len(customer_stocks) + len(major_stocks) + len(additional_stocks):,}개 (중복 없음)")
-    print(f"   📈 매매내역: {len(trades):,}건")
-    
-    return customer_stocks, major_stocks, additional_stocks, trades
 
 def write_clean_sql():
     """깨끗한 SQL 파일 생성"""
-    
-    customer_stocks, major_stocks, additional_stocks, trades = create_clean_data()
-    
-    # SQL 생성
-    sql_content = """-- Mock 데이터 대량 생성 스크립트 (중복 제거 버전)
+
+    customer_stocks, major_stocks, additional_stocks = create_clean_data()
+
+    # SQL 생성 (행 단위로 바로 파일에 기록, INSERT 구문은 1000행씩 분할)
+    with SqlWriter('/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data_clean.sql', max_rows=1000) as sql:
+        sql.write("""-- Mock 데이터 대량 생성 스크립트 (중복 제거 버전)
 -- 포트폴리오 관리 시스템을 위한 완전한 테스트 데이터 세트
 -- PK 중복 없이 데이터 정합성을 보장하는 설계
 
@@ -174,7 +179,7 @@ USE kpsdb;
 -- 기존 데이터 삭제 (개발환경에서만 사용)
 SET FOREIGN_KEY_CHECKS = 0;
 DELETE FROM rebalancing_analysis;
-DELETE FROM customer_strategy; 
+DELETE FROM customer_strategy;
 DELETE FROM customer_balance;
 DELETE FROM trading_history;
 DELETE FROM rebalancing_master;
@@ -185,48 +190,40 @@ SET FOREIGN_KEY_CHECKS = 1;
 -- 1. 종목현재가 테이블 (2500개, 중복 없음)
 -- =================================================================
 
-INSERT INTO stock_current_price (stock_code, current_price) VALUES
--- 고객보유 종목 (20개)
-"""
-    
-    # 고객 보유 종목
-    customer_stock_lines = []
-    for code, name, price in customer_stocks:
-        customer_stock_lines.append(f"('{code}', {price})")
-    
-    sql_content += ',\n'.join(customer_stock_lines) + ',\n\n-- 기타 대형주\n'
-    
-    # 기타 대형주
-    major_stock_lines = []
-    for code, price in major_stocks:
-        major_stock_lines.append(f"('{code}', {price})")
-    
-    sql_content += ',\n'.join(major_stock_lines) + ',\n\n-- 추가 종목들\n'
-    
-    # 추가 종목들 (1000개씩 나누어서)
-    batch_size = 1000
-    for i in range(0, len(additional_stocks), batch_size):
-        batch = additional_stocks[i:i+batch_size]
-        batch_lines = [f"('{code}', {price})" for code, price in batch]
-        
-        if i + batch_size >= len(additional_stocks):  # 마지막 배치
-            sql_content += ',\n'.join(batch_lines) + ';\n\n'
-        else:
-            sql_content += ',\n'.join(batch_lines) + ',\n\n'
-    
-    # 나머지 테이블들
-    sql_content += """-- =================================================================
+""")
+
+        sql.begin_insert('stock_current_price', ['stock_code', 'current_price'])
+
+        # 고객 보유 종목
+        sql.comment('고객보유 종목 (20개)')
+        for code, name, price in customer_stocks:
+            sql.row((code, price))
+
+        # 기타 대형주
+        sql.comment('기타 대형주')
+        for code, price in major_stocks:
+            sql.row((code, price))
+
+        # 추가 종목들
+        sql.comment('추가 종목들')
+        for code, price in additional_stocks:
+            sql.row((code, price))
+
+        sql.end_insert()
+
+        # 나머지 테이블들
+        sql.write("""-- =================================================================
 -- 2. 리밸런싱마스터 테이블 (15건)
 -- =================================================================
 
 INSERT INTO rebalancing_master (
-    rebalancing_strategy_code, 
-    rebalancing_name, 
-    rebalancing_description, 
-    risk_level, 
-    investment_style, 
-    keyword1, 
-    keyword2, 
+    rebalancing_strategy_code,
+    rebalancing_name,
+    rebalancing_description,
+    risk_level,
+    investment_style,
+    keyword1,
+    keyword2,
     keyword3
 ) VALUES
 ('GROWTH_TECH_001', '기술성장형 포트폴리오', 'IT, 바이오, 반도체 등 기술주 중심의 고성장 추구 전략', '고위험', '성장투자', 'IT', '반도체', '바이오'),
@@ -276,41 +273,32 @@ INSERT INTO rebalancing_analysis (
 -- 4. 고객잔고 테이블 (20개 종목)
 -- =================================================================
 
-INSERT INTO customer_balance (
-    account_number,
-    stock_code,
-    stock_name,
-    quantity,
-    purchase_amount
-) VALUES
-"""
-    
-    # 고객잔고 데이터
-    balance_lines = []
-    quantities = [500, 150, 80, 45, 25, 120, 200, 180, 220, 300, 
-                  85, 160, 90, 130, 75, 400, 110, 95, 60, 140]
-    
-    for i, (code, name, _) in enumerate(customer_stocks):
-        purchase_price = random.randint(10000, 800000)
-        balance_lines.append(f"('99911122222', '{code}', '{name}', {quantities[i]}, {purchase_price}.00)")
-    
-    sql_content += ',\n'.join(balance_lines) + ';\n\n'
-    
-    # 매매내역
-    sql_content += """-- =================================================================
+""")
+
+        # 고객잔고 데이터
+        quantities = HOLDING_QUANTITIES
+
+        def balance_rows():
+            for i, (code, name, _) in enumerate(customer_stocks):
+                purchase_price = random.randint(10000, 800000)
+                yield ('99911122222', code, name, quantities[i], amount(purchase_price))
+
+        sql.insert('customer_balance', ['account_number', 'stock_code', 'stock_name', 'quantity', 'purchase_amount'], balance_rows())
+
+        # 매매내역
+        sql.write("""-- =================================================================
 -- 5. 매매내역 테이블 (930건)
 -- =================================================================
 
-INSERT INTO trading_history (
-    account_number, trading_date, order_number, execution_number, 
-    stock_code, buy_sell_code, order_quantity, order_amount
-) VALUES
-"""
-    
-    sql_content += ',\n'.join(trades) + ';\n\n'
-    
-    # 고객전략
-    sql_content += """-- =================================================================
+""")
+
+        trade_count = sql.insert('trading_history', [
+            'account_number', 'trading_date', 'order_number', 'execution_number',
+            'stock_code', 'buy_sell_code', 'order_quantity', 'order_amount'
+        ], generate_clean_trades(customer_stocks, major_stocks, additional_stocks))
+
+        # 고객전략
+        sql.write("""-- =================================================================
 -- 6. 고객전략 테이블 (1건)
 -- =================================================================
 
@@ -342,12 +330,9 @@ SELECT 'customer_strategy' as table_name, COUNT(*) as count FROM customer_strate
 
 -- ✅ 완료 메시지
 SELECT '🎉 모든 Mock 데이터가 성공적으로 생성되었습니다! (중복 제거 완료)' as result;
-"""
-    
-    # 파일 저장
-    with open('/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data_clean.sql', 'w', encoding='utf-8') as f:
-        f.write(sql_content)
-    
+""")
+
+    print(f"   📈 매매내역: {trade_count:,}건")
     print(f"✅ 깨끗한 SQL 파일 생성 완료!")
     print(f"📁 파일: insert_bulk_data_clean.sql")
     print(f"📊 총 데이터: 종목 2,500개 + 매매내역 930건 (중복 없음)")
@@ -7,12 +7,15 @@
 """
 
 import random
-from datetime import datetime, timedelta
+
+from reference_data import CUSTOMER_STOCK_CODES, HOLDING_QUANTITIES
+from skew_sampling import AliasTable, zipf_weights
+from sql_writer import SqlWriter, amount
+from trading_calendar import business_days
 
 def generate_remaining_stocks():
-    """나머지 2000개 종목 생성 (4XXXXX~9XXXXX)"""
-    stocks = []
-    
+    """나머지 2000개 종목 생성 (4XXXXX~9XXXXX) - 행 튜플을 하나씩 yield"""
+
     # 4XXXXX~9XXXXX 패턴으로 2000개 생성 (각 패턴별 333개씩)
     for prefix in ['4', '5', '6', '7', '8', '9']:
         for i in range(333):  # 각 패턴별 333개 (총 1998개)
@@ -30,61 +33,57 @@ def generate_remaining_stocks():
                 price = random.randint(25000, 55000)
             else:  # prefix == '9'
                 price = random.randint(30000, 65000)
-            
-            stocks.append(f"('{stock_code}', {price})")
-    
+
+            yield (stock_code, price)
+
     # 마지막 2개 추가해서 정확히 2000개
-    stocks.append("('999998', 98000)")
-    stocks.append("('999999', 99000)")
-    
-    return stocks
+    yield ('999998', 98000)
+    yield ('999999', 99000)
 
 def generate_trading_history():
-    """930건의 매매내역 생성"""
-    
+    """930건의 매매내역 생성 - 행 튜플을 하나씩 yield"""
+
     account_number = '99911122222'
-    
+
+    # 2025년 8월 KRX 영업일 (주말/광복절 제외), 상반월/하반월
+    august = business_days('20250801', 30)
+    first_half = [day for day in august if day <= '20250815']
+    second_half = [day for day in august if day > '20250815']
+
     # 고객잔고에 있는 20개 종목 (현재 보유)
-    balance_stocks = [
-        '005930', '000660', '035420', '051910', '207940',  # 5개
-        '005490', '000270', '035720', '105560', '055550',  # 5개
-        '096770', '017670', '066570', '009150', '036570',  # 5개
-        '323410', '086790', '068270', '373220', '247540'   # 5개
-    ]
-    
+    balance_stocks = CUSTOMER_STOCK_CODES
+
     # 매매내역 생성
-    trades = []
     order_counter = 1
-    
+
     # 1. 현재 잔고 형성을 위한 매수 거래 (50건)
-    quantities = [500, 150, 80, 45, 25, 120, 200, 180, 220, 300, 
-                 85, 160, 90, 130, 75, 400, 110, 95, 60, 140]
-    
+    quantities = HOLDING_QUANTITIES
+
     for i, stock_code in enumerate(balance_stocks):
         # 각 종목당 2-3번의 매수로 분할
         total_qty = quantities[i]
-        
+
         # 첫 번째 매수 (60%)
         qty1 = int(total_qty * 0.6)
-        date1 = f"202508{random.randint(1, 15):02d}"
+        date1 = random.choice(first_half)
         price1 = random.randint(20000, 200000)
-        
+
         order_num = f"ORD{date1}{order_counter:03d}"
         exec_num = f"EXE{date1}{order_counter:03d}"
-        trades.append(f"('{account_number}', '{date1}', '{order_num}', '{exec_num}', '{stock_code}', '1', {qty1}, {price1}.00)")
+        yield (account_number, date1, order_num, exec_num, stock_code, '1', qty1, amount(price1))
         order_counter += 1
-        
+
         # 두 번째 매수 (나머지)
         qty2 = total_qty - qty1
         if qty2 > 0:
-            date2 = f"202508{random.randint(16, 31):02d}"
+            date2 = random.choice(second_half)
             price2 = price1 + random.randint(-5000, 10000)
-            
+
             order_num = f"ORD{date2}{order_counter:03d}"
             exec_num = f"EXE{date2}{order_counter:03d}"
-            trades.append(f"('{account_number}', '{date2}', '{order_num}', '{exec_num}', '{stock_code}', '1', {qty2}, {price2}.00)")
+            yield (account_number, date2, order_num, exec_num, stock_code, '1', qty2, amount(price2))
             order_counter += 1
-    
+
     # 2. 청산된 종목들의 매수/매도 거래 (100건)
     other_stocks = ['100001', '100002', '100003', '100004', '100005',
                     '200001', '200002', '200003', '200004', '200005',
@@ -97,89 +96,83 @@ def generate_trading_history():
                     '900001', '900002', '900003', '900004', '900005',
                     '001040', '002790', '003230', '004370', '007310',
                     '026960', '005180', '003920', '005690', '002700']
-    
+
     for i, stock_code in enumerate(other_stocks):
         quantity = random.randint(10, 200)
         buy_price = random.randint(5000, 50000)
         sell_price = buy_price + random.randint(-1000, 3000)
-        
+
         # 매수
-        buy_date = f"202508{random.randint(1, 28):02d}"
+        buy_day = random.randrange(len(august))
+        buy_date = august[buy_day]
         order_num = f"ORD{buy_date}{order_counter:03d}"
         exec_num = f"EXE{buy_date}{order_counter:03d}"
-        trades.append(f"('{account_number}', '{buy_date}', '{order_num}', '{exec_num}', '{stock_code}', '1', {quantity}, {buy_price}.00)")
+        yield (account_number, buy_date, order_num, exec_num, stock_code, '1', quantity, amount(buy_price))
         order_counter += 1
-        
-        # 매도 (1-5일 후)
-        sell_date_obj = datetime.strptime(buy_date, '%Y%m%d') + timedelta(days=random.randint(1, 5))
-        sell_date = sell_date_obj.strftime('%Y%m%d')
-        if sell_date > '20250831':
-            sell_date = '20250831'
-        
+
+        # 매도 (1-5 영업일 후, 8월 마지막 영업일을 넘지 않게)
+        sell_date = august[min(buy_day + random.randint(1, 5), len(august) - 1)]
+
         order_num = f"ORD{sell_date}{order_counter:03d}"
         exec_num = f"EXE{sell_date}{order_counter:03d}"
-        trades.append(f"('{account_number}', '{sell_date}', '{order_num}', '{exec_num}', '{stock_code}', '2', {quantity}, {sell_price}.00)")
+        yield (account_number, sell_date, order_num, exec_num, stock_code, '2', quantity, amount(sell_price))
         order_counter += 1
-    
-    # 3. 나머지 780건의 단타 매매 (390쌍)
+
+    # 3. 나머지 780건의 단타 매매 (390쌍) - 종목은 목록 순서대로 Zipf 인기도 (앞쪽 보유 종목일수록 자주 매매)
     all_stocks = balance_stocks + other_stocks + [f'4{i:05d}' for i in range(100)] + [f'5{i:05d}' for i in range(100)]
-    
+    popularity = AliasTable(zipf_weights(len(all_stocks)))
+
     for i in range(390):
-        stock_code = random.choice(all_stocks)
+        stock_code = all_stocks[popularity.draw(random)]
         quantity = random.randint(5, 100)
         buy_price = random.randint(3000, 80000)
         sell_price = buy_price + random.randint(-500, 1500)
-        
+
         # 매수
-        buy_date = f"202508{random.randint(1, 30):02d}"
+        buy_day = random.randrange(len(august))
+        buy_date = august[buy_day]
         order_num = f"ORD{buy_date}{order_counter:03d}"
         exec_num = f"EXE{buy_date}{order_counter:03d}"
-        trades.append(f"('{account_number}', '{buy_date}', '{order_num}', '{exec_num}', '{stock_code}', '1', {quantity}, {buy_price}.00)")
+        yield (account_number, buy_date, order_num, exec_num, stock_code, '1', quantity, amount(buy_price))
         order_counter += 1
-        
-        # 매도 (같은 날 또는 다음 날)
-        if random.random() > 0.7:  # 30% 확률로 다음 날
-            sell_date_obj = datetime.strptime(buy_date, '%Y%m%d') + timedelta(days=1)
-            sell_date = sell_date_obj.strftime('%Y%m%d')
-            if sell_date > '20250831':
-                sell_date = '20250831'
+
+        # 매도 (같은 날 또는 다음 영업일)
+        if random.random() > 0.7:  # 30% 확률로 다음 영업일
+            sell_date = august[min(buy_day + 1, len(august) - 1)]
         else:
             sell_date = buy_date
-        
+
         order_num = f"ORD{sell_date}{order_counter:03d}"
         exec_num = f"EXE{sell_date}{order_counter:03d}"
-        trades.append(f"('{account_number}', '{sell_date}', '{order_num}', '{exec_num}', '{stock_code}', '2', {quantity}, {sell_price}.00)")
+        yield (account_number, sell_date, order_num, exec_num, stock_code, '2', quantity, amount(sell_price))
         order_counter += 1
-    
-    return trades
 
 def write_completion_sql():
-    """완성된 SQL 파일 작성"""
-    
-    print("🔄 대량 종목 데이터 생성 중...")
-    stocks = generate_remaining_stocks()
-    
-    print("🔄 매매내역 930건 생성 중...")
-    trades = generate_trading_history()
-    
-    # 기존 파일에 추가할 내용 작성
-    completion_sql = f"""
+    """완성된 SQL 파일 작성 (기존 insert_bulk_data.sql 에 행 단위로 이어서 기록)"""
+
+    with SqlWriter('/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data.sql', mode='a') as sql:
+        print("🔄 대량 종목 데이터 생성 중...")
+        sql.write("""
 -- 나머지 2000개 소형주 (4XXXXX~9XXXXX)
-{',\n'.join(stocks[:1000])},
-{',\n'.join(stocks[1000:])};
+""")
+        # 기존 파일에 열려 있는 종목현재가 INSERT 에 이어서 기록
+        sql.begin_insert('stock_current_price', ['stock_code', 'current_price'], continued=True)
+        for values in generate_remaining_stocks():
+            sql.row(values)
+        sql.end_insert()
 
--- =================================================================
+        sql.write("""-- =================================================================
 -- 2. 리밸런싱마스터 테이블 (15건)
 -- =================================================================
 
 INSERT INTO rebalancing_master (
-    rebalancing_strategy_code, 
-    rebalancing_name, 
-    rebalancing_description, 
-    risk_level, 
-    investment_style, 
-    keyword1, 
-    keyword2, 
+    rebalancing_strategy_code,
+    rebalancing_name,
+    rebalancing_description,
+    risk_level,
+    investment_style,
+    keyword1,
+    keyword2,
     keyword3
 ) VALUES
 ('GROWTH_TECH_001', '기술성장형 포트폴리오', 'IT, 바이오, 반도체 등 기술주 중심의 고성장 추구 전략', '고위험', '성장투자', 'IT', '반도체', '바이오'),
@@ -261,13 +254,15 @@ INSERT INTO customer_balance (
 -- 5. 매매내역 테이블 (930건)
 -- =================================================================
 
-INSERT INTO trading_history (
-    account_number, trading_date, order_number, execution_number, 
-    stock_code, buy_sell_code, order_quantity, order_amount
-) VALUES
-{',\n'.join(trades)};
+""")
 
--- =================================================================
+        print("🔄 매매내역 930건 생성 중...")
+        sql.insert('trading_history', [
+            'account_number', 'trading_date', 'order_number', 'execution_number',
+            'stock_code', 'buy_sell_code', 'order_quantity', 'order_amount'
+        ], generate_trading_history())
+
+        sql.write("""-- =================================================================
 -- 6. 고객전략 테이블 (1건)
 -- =================================================================
 
@@ -298,19 +293,19 @@ UNION ALL
 SELECT 'customer_strategy' as table_name, COUNT(*) as count FROM customer_strategy;
 
 -- 매매내역 매수/매도 건수 확인
-SELECT 
+SELECT
     buy_sell_code,
-    CASE 
+    CASE
         WHEN buy_sell_code = '1' THEN '매수'
         WHEN buy_sell_code = '2' THEN '매도'
     END as trade_type,
     COUNT(*) as count
-FROM trading_history 
+FROM trading_history
 WHERE account_number = '99911122222'
 GROUP BY buy_sell_code;
 
 -- 고객 포트폴리오 현황 확인
-SELECT 
+SELECT
     cb.stock_code,
     cb.stock_name,
     cb.quantity,
@@ -327,15 +322,11 @@ ORDER BY current_value DESC;
 -- ✅ 완료 메시지
 SELECT '🎉 모든 Mock 데이터가 성공적으로 생성되었습니다!' as result,
        '📊 종목현재가: ~2500개, 매매내역: 930건, 고객잔고: 20개 종목' as summary;
-"""
-    
-    # 파일에 추가
-    with open('/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data.sql', 'a', encoding='utf-8') as f:
-        f.write(completion_sql)
-    
+""")
+
     print(f"✅ 완료!")
-    print(f"📊 종목현재가: {len(stocks):,}개 추가 생성")
-    print(f"📈 매매내역: {len(trades):,}건 생성")
+    print(f"📊 종목현재가: {sql.row_counts['stock_current_price']:,}개 추가 생성")
+    print(f"📈 매매내역: {sql.row_counts['trading_history']:,}건 생성")
     print(f"📁 파일: insert_bulk_data.sql 업데이트 완료")
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+데이터셋 생성 결과 캐시 (내용 주소 방식)
+(생성기 코드 버전, seed, 파라미터) 해시를 키로 테이블별 행 파일과 최종 산출물을 디스크에 보관
+같은 설정으로 다시 실행하면 생성 없이 저장된 결과를 그대로 쓰고, 입력이 바뀐 테이블만 다시 생성
+저장 용량이 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU, 파일 수정시각 기준)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_CACHE_DIR = os.environ.get('DATASET_CACHE_DIR',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'kps_dataset'))
+
+# 캐시 전체 최대 용량 (기본 2GB)
+DEFAULT_CACHE_SIZE = 2 * 1024 * 1024 * 1024
+
+# 캐시 파일 형식 버전 (저장 방식이 바뀌면 올려서 기존 항목 무효화)
+CACHE_FORMAT = 1
+
+# 생성 결과에 영향을 주는 모듈 (내용이 바뀌면 키가 바뀌어 자동으로 다시 생성)
+CODE_FILES = ['dataset_spec.py', 'reference_data.py', 'skew_sampling.py', 'sql_writer.py', 'trade_stream.py', 'trading_calendar.py', 'tsv_writer.py', 'vector_backend.py']
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def code_version(files=CODE_FILES):
+    """생성기 모듈 소스의 해시 (생성기 버전)"""
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+    for name in files:
+        path = os.path.join(_HERE, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(name.encode())
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """파라미터 목록을 정규화(JSON)해 만든 SHA-256 키"""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """키별 파일을 보관하는 디스크 캐시
+
+    사용 예:
+        cache = GenerationCache()
+        path = cache.get(key)
+        if path is None:
+            for lines, sizes in cache.store_lines(key, batches):
+                ...
+        cache.evict()
+
+    directory  - 캐시 디렉터리 (기본: DATASET_CACHE_DIR 환경변수 또는 ~/.cache/kps_dataset)
+    max_bytes  - 캐시 전체 최대 용량 (넘으면 오래 사용하지 않은 파일부터 삭제)
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key, suffix='.rows'):
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def get(self, key, suffix='.rows'):
+        """캐시된 파일 경로 (없으면 None). 적중한 항목은 사용 시각을 갱신"""
+        path = self.path(key, suffix)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return path
+
+    def _temp(self, key):
+        directory = os.path.dirname(self.path(key))
+        os.makedirs(directory, exist_ok=True)
+        return tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    def store_lines(self, key, batches, suffix='.rows'):
+        """(행 목록, 바이트 수) 묶음을 그대로 흘려보내면서 한 줄 = 한 행으로 저장
+
+        끝까지 소비되어야 캐시에 등록됨 (중간에 실패하면 임시 파일 삭제)
+        """
+        fd, temp = self._temp(key)
+        completed = False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for lines, sizes in batches:
+                    if lines:
+                        f.write('\n'.join(lines))
+                        f.write('\n')
+                    yield lines, sizes
+            os.replace(temp, self.path(key, suffix))
+            completed = True
+        finally:
+            if not completed and os.path.exists(temp):
+                os.remove(temp)
+
+    def put_file(self, key, source, suffix):
+        """완성된 파일을 캐시에 복사해 등록"""
+        fd, temp = self._temp(key)
+        os.close(fd)
+        try:
+            shutil.copyfile(source, temp)
+            os.replace(temp, self.path(key, suffix))
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def get_json(self, key):
+        path = self.get(key, '.json')
+        if path is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put_json(self, key, value):
+        fd, temp = self._temp(key)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temp, self.path(key, '.json'))
+
+    def entries(self):
+        """캐시 파일 목록 [(마지막 사용 시각, 크기, 경로)] - 오래된 순"""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """용량 한도를 넘는 만큼 오래 사용하지 않은 파일부터 삭제하고 삭제한 파일 수 반환"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='데이터셋 생성 캐시 관리')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='캐시 디렉터리')
+    parser.add_argument('--evict', type=int, default=None, metavar='MB', help='캐시를 MB 이하로 줄임')
+    parser.add_argument('--clear', action='store_true', help='캐시 전체 삭제')
+    args = parser.parse_args()
+
+    cache = GenerationCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  캐시 삭제: {args.cache_dir}")
+    elif args.evict is not None:
+        removed = cache.evict(args.evict * 1024 * 1024)
+        print(f"🧹 {removed}개 파일 삭제")
+    entries = cache.entries()
+    print(f"📦 {args.cache_dir}: {len(entries)}개 파일, {sum(size for _, size, _ in entries) / 1024 / 1024:,.1f}MB")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PK/UNIQUE/FK 무결성 검사 엔진
+SQL 덤프를 sql_reader 로 한 번만 스트리밍하면서 테이블별 키를 64비트 해시 배열에 쌓고 (키당 8바이트, 행 번호 = 위치)
+끝에서 numpy 정렬로 중복 키와 참조 누락을 한 번에 찾음 (행마다 파이썬 객체를 보관하지 않아 1억 행 테이블도 최대 메모리 ~2GB)
+    - PK/UNIQUE: 정렬한 해시에서 같은 값이 이웃한 행이 중복 후보
+    - FK: 자식 값 해시를 (해시, 처음 나온 행, 건수) 로 주기적으로 압축해 두었다가 부모 해시 집합에 없는 값을 위반 후보로
+후보가 있으면 덤프를 한 번 더 읽어 후보 행의 실제 키 값을 비교 (해시 충돌 재확인, 위반 사례 표시용 값)
+재확인 없이 부모에 있다고 판정된 FK 값은 해시 충돌로 놓칠 확률이 (자식 고유값 수 × 부모 키 수 / 2^64)
+"""
+
+import sys
+from array import array
+from collections import Counter
+from operator import itemgetter
+
+import numpy as np
+
+from dataset_spec import parse_schema
+from sql_reader import read_records, read_rows
+
+# 스키마에 FOREIGN KEY 로 선언되지는 않았지만 애플리케이션이 전제하는 논리적 참조
+# (자식 테이블, 자식 컬럼, 부모 테이블, 부모 컬럼)
+LOGICAL_FOREIGN_KEYS = [
+    ('customer_balance', 'stock_code', 'stock_current_price', 'stock_code'),
+    ('trading_history', 'stock_code', 'stock_current_price', 'stock_code'),
+    ('stock_price_history', 'stock_code', 'stock_current_price', 'stock_code'),
+    ('rebalancing_analysis', 'rebalancing_strategy_code', 'rebalancing_master', 'rebalancing_strategy_code'),
+    ('customer_strategy', 'rebalancing_strategy_code', 'rebalancing_master', 'rebalancing_strategy_code'),
+]
+
+MAX_EXAMPLES = 10
+
+# FK 자식 값 해시 버퍼를 (해시, 처음 나온 행, 건수) 로 압축하는 주기 (버퍼 항목 수)
+COMPACT_EVERY = 1 << 20
+
+
+def key_of(record, columns):
+    """행에서 키 값 추출 (단일 컬럼은 값 그대로, 복합 키는 튜플)"""
+    if len(columns) == 1:
+        return record[columns[0]]
+    return tuple(record[column] for column in columns)
+
+
+def format_key(columns, key):
+    """위반 보고용 키 표기 (account_number=..., stock_code=...)"""
+    values = (key,) if len(columns) == 1 else key
+    return ', '.join(f"{column}={value!r}" for column, value in zip(columns, values))
+
+
+def _compact_counts(hashes, rows, counts):
+    """(해시, 행, 건수) 배열을 해시별 (해시, 처음 나온 행, 건수 합) 으로 압축 (해시 순)"""
+    order = np.lexsort((rows, hashes))
+    hashes, rows, counts = hashes[order], rows[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]]) if len(hashes) else np.zeros(0, dtype=np.int64)
+    return hashes[starts], rows[starts], np.add.reduceat(counts, starts) if len(starts) else counts[:0]
+
+
+class IntegrityChecker:
+    """행을 하나씩 받아 PK/UNIQUE 중복과 FK 누락을 검사하는 검사기
+
+    사용 예:
+        checker = IntegrityChecker()
+        for table, record in read_records('dump.sql'):
+            checker.add(table, record)
+        checker.finish(read_records('dump.sql'))
+        checker.report()
+
+    schema        - dataset_spec.parse_schema() 결과 (None 이면 create_tables_final.sql 사용)
+    foreign_keys  - 스키마 선언 FK 외에 추가로 검사할 논리적 참조 목록
+    max_examples  - 제약조건별로 보관하는 위반 사례 수 (건수는 전부 집계)
+    """
+
+    def __init__(self, schema=None, foreign_keys=LOGICAL_FOREIGN_KEYS, max_examples=MAX_EXAMPLES):
+        self.schema = parse_schema() if schema is None else schema
+        self.max_examples = max_examples
+        self.row_counts = Counter()
+        self.violation_counts = Counter()
+        self.violations = {}
+        self.skipped = set()
+        self.distinct = {}
+        self._unindexed = set()
+
+        # 테이블별 키 목록: (제약조건명, 종류, 컬럼 튜플) - 종류 PK/UNIQUE 는 중복 검사, REF 는 참조용 인덱스만
+        self.keys = {}
+        for table, info in self.schema.items():
+            keys = self.keys.setdefault(table, [])
+            if info['primary_key']:
+                keys.append(('PRIMARY', 'PK', tuple(info['primary_key'])))
+            for name, columns in info['unique_keys'].items():
+                keys.append((name, 'UNIQUE', tuple(columns)))
+
+        # 테이블별 FK 목록: (제약조건명, 자식 컬럼, 부모 테이블, 부모 컬럼 튜플)
+        self.foreign_keys = {}
+        declared = [(table, column, parent, parent_column)
+                    for table, info in self.schema.items()
+                    for column, parent, parent_column in info['foreign_keys']]
+        for table, column, parent, parent_column in declared + list(foreign_keys):
+            name = f"FK {table}.{column} → {parent}.{parent_column}"
+            fks = self.foreign_keys.setdefault(table, [])
+            if any(fk[0] == name for fk in fks):
+                continue
+            fks.append((name, column, parent, (parent_column,)))
+            parent_keys = self.keys.setdefault(parent, [])
+            if not any(columns == (parent_column,) for _, _, columns in parent_keys):
+                parent_keys.append((f"REF {parent}.{parent_column}", 'REF', (parent_column,)))
+
+        # (테이블, 컬럼 튜플) → 행마다 키 해시 하나 (행 번호 = 위치 + 1), 색인하지 않은 (NULL/컬럼 없음) 행 번호
+        self._hashes = {(table, columns): array('q') for table, keys in self.keys.items() for _, _, columns in keys}
+        self._excluded = {index: array('q') for index in self._hashes}
+
+        # FK 이름 → 자식 값 해시/행 버퍼와 압축 결과 (해시, 처음 나온 행, 건수)
+        self._references = {name: [array('q'), array('q'), None]
+                            for fks in self.foreign_keys.values() for name, _, _, _ in fks}
+
+        # (테이블, INSERT 컬럼 튜플) → 키 추출 계획 ([키별 추출 함수...], [FK 별 값 위치...])
+        self._plans = {}
+
+    def _violation(self, name, table, row, message):
+        self.violation_counts[name] += 1
+        examples = self.violations.setdefault(name, [])
+        if len(examples) < self.max_examples:
+            examples.append(f"{table} {row:,}번째 행: {message}")
+
+    def add(self, table, record):
+        """행 하나 ({컬럼명: 값}) 의 키 해시를 기록 (검사는 finish() 에서 한 번에)"""
+        self.add_row(table, tuple(record), tuple(record.values()))
+
+    def add_row(self, table, columns, values):
+        """add() 와 같지만 (컬럼 튜플, 값 튜플) 을 받음 (read_rows 결과를 dict 변환 없이 그대로)"""
+        plan = self._plans.get((table, columns))
+        if plan is None:
+            plan = self._plan(table, columns)
+        self.row_counts[table] += 1
+        row = self.row_counts[table]
+
+        for name, kind, key_columns, getter, hashes, excluded in plan[0]:
+            key = None if getter is None else getter(values)
+            if key is None or (len(key_columns) > 1 and None in key):
+                if getter is not None and kind == 'PK':
+                    self._violation(f"{table}.{name}", table, row, f"PK 에 NULL 값 ({format_key(key_columns, key)})")
+                hashes.append(0)
+                excluded.append(row)
+            else:
+                hashes.append(hash(key))
+
+        for name, position, reference in plan[1]:
+            value = values[position]
+            if value is None:
+                continue
+            reference[0].append(hash(value))
+            reference[1].append(row)
+            if len(reference[0]) >= COMPACT_EVERY:
+                self._compact(name)
+
+    def _plan(self, table, columns):
+        """(테이블, INSERT 컬럼 목록) 별 키 추출 계획 (키마다 값 추출 함수, FK 마다 값 위치) - INSERT 구문마다 한 번"""
+        if columns is None:
+            raise ValueError(f"{table} INSERT 에 컬럼 목록이 없어 컬럼명을 알 수 없습니다 (schema 지정 필요)")
+        position = {column: i for i, column in enumerate(columns)}
+        keys = []
+        for name, kind, key_columns in self.keys.get(table, ()):
+            index = (table, key_columns)
+            getter = None
+            if all(column in position for column in key_columns):
+                getter = itemgetter(*(position[column] for column in key_columns))
+            else:
+                # 자동 증가 id 처럼 INSERT 에 없는 컬럼의 키는 검사할 수 없음
+                self.skipped.add(f"{table}.{name}")
+                self._unindexed.add(index)
+            keys.append((name, kind, key_columns, getter, self._hashes[index], self._excluded[index]))
+        fks = []
+        for name, column, parent, parent_columns in self.foreign_keys.get(table, ()):
+            if column not in position:
+                self.skipped.add(name)
+                continue
+            fks.append((name, position[column], self._references[name]))
+        plan = (keys, fks)
+        self._plans[(table, columns)] = plan
+        return plan
+
+    def _compact(self, name):
+        """FK 자식 값 해시 버퍼를 이전 압축 결과와 합쳐 해시별 (처음 나온 행, 건수) 로 압축"""
+        reference = self._references[name]
+        buffer, rows, compacted = reference
+        hashes = np.frombuffer(buffer, dtype=np.int64) if len(buffer) else np.zeros(0, dtype=np.int64)
+        first = np.frombuffer(rows, dtype=np.int64) if len(rows) else np.zeros(0, dtype=np.int64)
+        counts = np.ones(len(hashes), dtype=np.int64)
+        if compacted is not None:
+            hashes, first, counts = (np.concatenate(pair) for pair in zip(compacted, (hashes, first, counts)))
+        reference[:] = [array('q'), array('q'), _compact_counts(hashes, first, counts)]
+
+    def _index_hashes(self, index):
+        """인덱스의 (색인된 행의 키 해시 배열, 행 번호 배열) - 제외된 행이 없으면 행 번호는 None (위치 + 1)"""
+        hashes = np.frombuffer(self._hashes[index], dtype=np.int64) if self._hashes[index] else np.zeros(0, np.int64)
+        if not self._excluded[index]:
+            return hashes, None
+        keep = np.ones(len(hashes), dtype=bool)
+        keep[np.frombuffer(self._excluded[index], dtype=np.int64) - 1] = False
+        return hashes[keep], np.flatnonzero(keep) + 1
+
+    def finish(self, records=None):
+        """쌓아 둔 해시로 중복 키와 FK 누락을 판정
+
+        records 에 덤프를 다시 읽는 (테이블, 행 dict) 이터러블 (read_records 결과) 을 주면 위반 후보가 있을 때만
+        한 번 더 읽어 실제 키 값으로 해시 충돌을 걸러내고 위반 사례에 키 값을 표시
+        (주지 않으면 해시가 같은 키를 중복으로 보고, 사례에는 행 번호만 표시)
+        """
+        parents = {(parent, parent_columns) for fks in self.foreign_keys.values()
+                   for _, _, parent, parent_columns in fks}
+        duplicates = []                         # (제약조건명, 종류, 테이블, 컬럼, [[같은 해시 행 번호...]])
+        parent_hashes = {}
+        for table, keys in self.keys.items():
+            for name, kind, columns in keys:
+                index = (table, columns)
+                hashes, rows = self._index_hashes(index)
+                ordered = np.sort(hashes)
+                unique = np.ones(len(ordered), dtype=bool)
+                np.not_equal(ordered[1:], ordered[:-1], out=unique[1:])
+                self.distinct[index] = int(unique.sum())
+                if index in parents:
+                    parent_hashes[index] = ordered[unique]
+                repeated = ordered[1:][~unique[1:]]
+                if kind == 'REF' or not len(repeated):
+                    continue
+                candidate = np.isin(hashes, repeated)
+                candidate_rows = np.flatnonzero(candidate) + 1 if rows is None else rows[candidate]
+                groups = {}
+                for value, row in zip(hashes[candidate].tolist(), candidate_rows.tolist()):
+                    groups.setdefault(value, []).append(row)
+                duplicates.append((f"{table}.{name}", kind, table, columns, list(groups.values())))
+
+        missing = []                            # (FK 이름, 자식 테이블, 컬럼, 부모 테이블, [(처음 나온 행, 건수)])
+        for table, fks in self.foreign_keys.items():
+            for name, column, parent, parent_columns in fks:
+                self._compact(name)
+                hashes, first, counts = self._references[name][2]
+                if not self.row_counts[table] or not len(hashes):
+                    continue
+                if (parent, parent_columns) in self._unindexed:
+                    # 부모 덤프에 참조 컬럼이 없으면 (구버전 컬럼명 등) 존재 여부를 판단할 수 없음
+                    self.skipped.add(name)
+                    continue
+                absent = ~np.isin(hashes, parent_hashes[(parent, parent_columns)])
+                if absent.any():
+                    order = np.argsort(first[absent])
+                    missing.append((name, table, column, parent,
+                                    list(zip(first[absent][order].tolist(), counts[absent][order].tolist()))))
+
+        values = self._recheck(records, duplicates, missing) if (duplicates or missing) and records is not None else None
+        self._report_duplicates(duplicates, values)
+        self._report_missing(missing, values)
+        return not self.violation_counts
+
+    def _recheck(self, records, duplicates, missing):
+        """덤프를 다시 읽어 후보 행의 실제 키 값 {(테이블, 행 번호): {컬럼 튜플: 키}}"""
+        wanted = {}
+        for _, _, table, columns, groups in duplicates:
+            for group in groups:
+                for row in group:
+                    wanted.setdefault(table, {}).setdefault(row, []).append(columns)
+        for _, table, column, _, absent in missing:
+            for row, _ in absent[:self.max_examples]:
+                wanted.setdefault(table, {}).setdefault(row, []).append((column,))
+
+        counters = Counter()
+        values = {}
+        for table, record in records:
+            if table not in wanted:
+                continue
+            counters[table] += 1
+            columns_list = wanted[table].get(counters[table])
+            if columns_list:
+                values[(table, counters[table])] = {columns: key_of(record, columns) for columns in columns_list}
+        return values
+
+    def _report_duplicates(self, duplicates, values):
+        for name, kind, table, columns, groups in duplicates:
+            found = []
+            for group in groups:
+                if values is None:
+                    found += [(row, group[0], None) for row in group[1:]]
+                    continue
+                # 해시가 같아도 실제 키가 다르면 (충돌) 중복이 아님
+                first_rows = {}
+                for row in group:
+                    key = values[(table, row)][columns]
+                    if key in first_rows:
+                        found.append((row, first_rows[key], key))
+                    else:
+                        first_rows[key] = row
+            for row, first, key in sorted(found):
+                shown = '키 해시 일치' if key is None else format_key(columns, key)
+                self._violation(name, table, row, f"{kind} 중복 ({shown}) - 처음 나온 행 {first:,}")
+
+    def _report_missing(self, missing, values):
+        for name, table, column, parent, absent in missing:
+            for row, count in absent:
+                key = values.get((table, row), {}).get((column,)) if values is not None else None
+                shown = '참조 값' if key is None else f"{column}={key!r}"
+                self._violation(name, table, row, f"{shown} 가 {parent} 에 없음 (총 {count:,}행)")
+                self.violation_counts[name] += count - 1
+
+    def distinct_count(self, table, columns):
+        """finish() 후 키의 고유값 수 (NULL 제외, 해시 기준)"""
+        return self.distinct.get((table, tuple(columns)), 0)
+
+    @property
+    def is_valid(self):
+        return not self.violation_counts
+
+    def report(self):
+        """검사 결과 출력"""
+        print(f"📊 검사 행 수: {sum(self.row_counts.values()):,}행 ({len(self.row_counts)}개 테이블)")
+        for table, count in self.row_counts.items():
+            print(f"   - {table}: {count:,}행")
+
+        for skipped in sorted(self.skipped):
+            print(f"ℹ️  {skipped}: INSERT 에 해당 컬럼이 없어 검사 생략")
+
+        if not self.violation_counts:
+            print("✅ PK/UNIQUE/FK 무결성 위반 없음")
+            return
+
+        print(f"❌ 무결성 위반 {sum(self.violation_counts.values()):,}건")
+        for name, count in self.violation_counts.items():
+            print(f"\n   [{name}] {count:,}건")
+            examples = self.violations.get(name, [])
+            for example in examples:
+                print(f"      - {example}")
+            if len(examples) >= self.max_examples:
+                print(f"      ... (처음 {self.max_examples}건만 표시)")
+
+
+def check_dump(path, schema=None, foreign_keys=LOGICAL_FOREIGN_KEYS, max_examples=MAX_EXAMPLES):
+    """SQL 덤프 전체를 한 번 훑어 무결성 검사 후 검사기 반환 (위반 후보가 있을 때만 재확인용으로 한 번 더 읽음)"""
+    checker = IntegrityChecker(schema, foreign_keys, max_examples)
+    for table, columns, values in read_rows(path, checker.keys, checker.schema):
+        checker.add_row(table, columns, values)
+    checker.finish(read_records(path, checker.keys, checker.schema))
+    return checker
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python integrity_checker.py <덤프파일.sql[.gz]>")
+        sys.exit(2)
+
+    print(f"🔍 {sys.argv[1]} 무결성 검사 시작...")
+    result = check_dump(sys.argv[1])
+    result.report()
+    sys.exit(0 if result.is_valid else 1)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+시가총액가중 시장지수 (KOSPI 대용) 계산
+시세 저장소(price_store) 종가와 종목별 상장주식수로 기준일 100 인 시가총액가중 지수를 만들어
+risk_metrics 의 베타 / 시장 상관계수 (strategy_learning_analysis.beta, correlation_kospi) 기준으로 사용
+
+지수 수익률 = 전일 시가총액 가중 종목 수익률 (전일/당일 종가가 모두 있는 종목만, 상장·거래정지는 제수 조정과 같음)
+결과는 저장소 옆 캐시 디렉터리에 보관하고, 거래일이 추가되면 새 거래일만 이어서 계산
+장중 시세는 live() 로 바뀐 종목의 시가총액 차이만 더해 지수를 갱신 (종목 수와 무관)
+
+상장주식수 데이터가 없으므로 기본은 seed 로 만든 Zipf 분포 시가총액 (상위 종목이 지수를 주도) 에서 역산
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from price_history import TRADING_DAYS_PER_YEAR
+from price_store import DEFAULT_STORE, PriceStore, cache_directory, codes_hash, day_hashes
+
+CACHE_FORMAT = 1
+
+# 캐시 디렉터리 = 저장소 디렉터리 + CACHE_SUFFIX
+CACHE_SUFFIX = '_index'
+
+# 기준일 지수
+BASE_LEVEL = 100.0
+
+# 합성 시가총액: 순위 r 의 시가총액 ∝ r^-ZIPF_EXPONENT, 전 종목 합계 TOTAL_MARKET_CAP (원)
+ZIPF_EXPONENT = 1.1
+TOTAL_MARKET_CAP = 2000 * 10 ** 12
+
+# 지수 계산 시 한 번에 읽는 거래일 수
+DAY_BLOCK = 250
+
+# 캐시 파일 이름
+META_FILE = 'meta.json'
+SHARES_FILE = 'shares.npy'
+LEVELS_FILE = 'levels.npy'
+RETURNS_FILE = 'returns.npy'
+HASHES_FILE = 'day_hashes.npy'
+
+
+def synthetic_shares(store, seed=42, exponent=ZIPF_EXPONENT, total=TOTAL_MARKET_CAP):
+    """Zipf 분포 시가총액을 종목에 무작위 배정하고 첫 종가로 나눈 상장주식수 (종목)"""
+    rng = np.random.default_rng(seed)
+    ranks = rng.permutation(len(store)) + 1
+    caps = ranks.astype(np.float64) ** -exponent
+    caps *= total / caps.sum()
+    close = store._close
+    # 종목별 첫 유효 종가 (상장 전 NaN 은 건너뜀)
+    first = np.full(len(store), np.nan)
+    for start in range(0, close.shape[1], DAY_BLOCK):
+        block = np.asarray(close[:, start:start + DAY_BLOCK])
+        missing = np.isnan(first)
+        if not missing.any():
+            break
+        valid = ~np.isnan(block)
+        at = valid.argmax(axis=1)
+        found = missing & valid.any(axis=1)
+        first[found] = block[found, at[found]]
+    listed = ~np.isnan(first)
+    shares = np.zeros(len(store), dtype=np.int64)
+    shares[listed] = np.maximum(np.round(caps[listed] / first[listed]), 1)
+    return shares
+
+
+def load_shares(store, path):
+    """{종목코드: 상장주식수} JSON → 상장주식수 (종목), 없는 종목은 0 (지수 제외)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    return np.array([int(mapping.get(code, 0)) for code in store.codes], dtype=np.int64)
+
+
+def index_returns(close, shares, previous=None):
+    """종가 (종목, 거래일) 와 상장주식수로 일간 지수 수익률 (거래일)
+
+    previous 는 첫 거래일 전일 종가 (종목), 없으면 첫날 수익률은 0
+    """
+    close = np.asarray(close, dtype=np.float64)
+    prior = np.empty_like(close)
+    prior[:, 0] = np.nan if previous is None else previous
+    prior[:, 1:] = close[:, :-1]
+    valid = ~np.isnan(close) & ~np.isnan(prior) & (shares[:, None] > 0)
+    weight = np.where(valid, prior * shares[:, None], 0)
+    value = np.where(valid, close * shares[:, None], 0)
+    base = weight.sum(axis=0)
+    return np.divide(value.sum(axis=0), base, out=np.ones(close.shape[1]), where=base > 0) - 1
+
+
+def market_exposures(weights, returns, market):
+    """전략 비중 (전략, 종목), 종목 수익률 (종목, 거래일), 지수 수익률 (거래일) → (베타, 상관계수) (전략)
+
+    평균을 뺀 종목 수익률에 비중 행렬을 한 번 곱해 전략 수익률 편차를 구하고 지수와의 공분산/분산으로 계산
+    """
+    returns = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    market = np.nan_to_num(market) - np.nanmean(market)
+    portfolio = weights @ centered                                       # (전략, 거래일)
+    covariance = portfolio @ market
+    variance = (portfolio * portfolio).sum(axis=1)
+    market_variance = max(float(market @ market), 1e-18)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.where(variance > 0, covariance / np.sqrt(variance * market_variance), 0.0)
+    return covariance / market_variance, correlation
+
+
+class MarketIndex:
+    """price_store 시가총액가중 지수 캐시
+
+    사용 예:
+        index = MarketIndex(PriceStore('price_store'))
+        index.refresh()                               # 필요하면 계산/이어서 계산 ('hit', 'append', 'rebuild')
+        returns = index.returns()                     # 일간 지수 수익률 (저장소 거래일 순서)
+        level = index.live(['005930'], [71500])       # 장중 시세 반영 지수
+
+    shares    - 상장주식수 (종목) 배열 (None 이면 synthetic_shares(store, seed))
+    directory - 캐시 디렉터리 (기본: 저장소 디렉터리 + '_index')
+    """
+
+    def __init__(self, store, shares=None, seed=42, directory=None):
+        self.store = store
+        self.shares = synthetic_shares(store, seed) if shares is None else np.asarray(shares, dtype=np.int64)
+        self.directory = directory or cache_directory(store.directory, CACHE_SUFFIX)
+        self.meta = self._read_meta()
+        self._live = None
+
+    def _read_meta(self):
+        path = os.path.join(self.directory, META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def status(self):
+        """캐시 상태: 'hit' (최신), 'append' (추가된 거래일만 계산), 'rebuild' (전체 재계산)"""
+        meta = self.meta
+        if (meta is None or meta.get('format') != CACHE_FORMAT
+                or meta.get('codes') != codes_hash(self.store.codes, self.shares)):
+            return 'rebuild'
+        days = meta['days']
+        if days > self.store.shape[1] or str(self.store.dates[0]) != meta['start'] \
+                or str(self.store.dates[days - 1]) != meta['end']:
+            return 'rebuild'
+        hashes = np.load(os.path.join(self.directory, HASHES_FILE))
+        if not np.array_equal(day_hashes(self.store._close[:, :days]), hashes):
+            return 'rebuild'
+        return 'hit' if days == self.store.shape[1] else 'append'
+
+    def refresh(self):
+        """캐시를 저장소에 맞춤, 수행한 작업 ('hit', 'append', 'rebuild') 반환"""
+        status = self.status()
+        if status == 'hit':
+            return status
+        close = self.store._close
+        total = self.store.shape[1]
+        if status == 'rebuild':
+            first, levels, returns, hashes = 0, np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.uint64)
+        else:
+            first = self.meta['days']
+            levels = np.load(os.path.join(self.directory, LEVELS_FILE))
+            returns = np.load(os.path.join(self.directory, RETURNS_FILE))
+            hashes = np.load(os.path.join(self.directory, HASHES_FILE))
+        level = levels[-1] if len(levels) else BASE_LEVEL
+        new_levels, new_returns = [], []
+        for start in range(first, total, DAY_BLOCK):
+            block = np.asarray(close[:, start:min(start + DAY_BLOCK, total)])
+            previous = np.asarray(close[:, start - 1]) if start else None
+            block_returns = index_returns(block, self.shares, previous)
+            block_levels = level * np.cumprod(1 + block_returns)
+            level = block_levels[-1]
+            new_returns.append(block_returns)
+            new_levels.append(block_levels)
+        levels = np.concatenate([levels, *new_levels])
+        returns = np.concatenate([returns, *new_returns])
+        hashes = np.concatenate([hashes, day_hashes(close[:, first:total])])
+        self._write(levels, returns, hashes)
+        return status
+
+    def _write(self, levels, returns, hashes):
+        """지수와 상장주식수를 임시 디렉터리에 쓴 뒤 교체"""
+        parent = os.path.dirname(os.path.abspath(self.directory))
+        os.makedirs(parent, exist_ok=True)
+        temp = tempfile.mkdtemp(prefix='.market_index_', dir=parent)
+        try:
+            np.save(os.path.join(temp, LEVELS_FILE), levels)
+            np.save(os.path.join(temp, RETURNS_FILE), returns)
+            np.save(os.path.join(temp, HASHES_FILE), hashes)
+            np.save(os.path.join(temp, SHARES_FILE), self.shares)
+            meta = {
+                'format': CACHE_FORMAT,
+                'codes': codes_hash(self.store.codes, self.shares),
+                'days': len(levels),
+                'start': str(self.store.dates[0]),
+                'end': str(self.store.dates[len(levels) - 1]),
+                'base_level': BASE_LEVEL,
+            }
+            with open(os.path.join(temp, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory)
+            os.replace(temp, self.directory)
+        finally:
+            if os.path.isdir(temp):
+                shutil.rmtree(temp)
+        self.meta = meta
+        self._live = None
+
+    def _load(self, filename):
+        if self.meta is None:
+            raise ValueError(f"{self.directory}: 지수 캐시가 없습니다 (refresh() 먼저 실행)")
+        return np.load(os.path.join(self.directory, filename), mmap_mode='r')
+
+    def levels(self):
+        """일별 지수 (거래일)"""
+        return self._load(LEVELS_FILE)
+
+    def returns(self, start=None, end=None):
+        """일간 지수 수익률 (거래일) - 기간은 저장소 date_range 와 같음"""
+        return np.array(self._load(RETURNS_FILE)[self.store.date_range(start, end)])
+
+    def live(self, codes, prices):
+        """장중 시세 (종목코드, 가격) 를 반영한 지수 - 마지막 종가 기준 시가총액에서 바뀐 종목 몫만 갱신"""
+        if self._live is None:
+            level = float(self.levels()[-1])
+            last = np.asarray(self.store._close[:, self.meta['days'] - 1])
+            valid = ~np.isnan(last)
+            caps = np.where(valid, last, 0) * self.shares
+            self._live = {
+                'prices': np.where(valid, last, 0),
+                'shares': np.where(valid, self.shares, 0),
+                'base': caps.sum(),
+                'total': caps.sum(),
+                'level': level,
+            }
+        live = self._live
+        index = self.store.stock_index(codes)
+        prices = np.asarray(prices, dtype=np.float64)
+        # 같은 종목이 여러 번 오면 마지막 가격만 반영
+        index, last = np.unique(index[::-1], return_index=True)
+        prices = prices[::-1][last]
+        live['total'] += (live['shares'][index] * (prices - live['prices'][index])).sum()
+        live['prices'][index] = prices
+        return live['level'] * live['total'] / live['base']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='시세 저장소로 시가총액가중 시장지수 (KOSPI 대용) 생성/갱신')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--cache', help='지수 캐시 디렉터리 (기본: 저장소 + _index)')
+    parser.add_argument('--shares', help='{종목코드: 상장주식수} JSON (없으면 seed 로 합성)')
+    parser.add_argument('--seed', type=int, default=42, help='합성 시가총액 난수 seed')
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    shares = load_shares(store, args.shares) if args.shares else None
+    index = MarketIndex(store, shares, args.seed, args.cache)
+    started = time.perf_counter()
+    status = index.refresh()
+    elapsed = time.perf_counter() - started
+    labels = {'hit': '최신 상태 (재사용)', 'append': '추가 거래일 반영', 'rebuild': '전체 계산'}
+    levels = index.levels()
+    returns = index.returns()
+    caps = np.nan_to_num(np.asarray(store._close[:, -1])) * index.shares
+    top = np.sort(caps)[::-1][:10].sum() / max(caps.sum(), 1)
+    print(f"📈 {index.directory}: {labels[status]} ({elapsed:.2f}초)")
+    print(f"   {index.meta['start']} ~ {index.meta['end']} ({len(levels):,}일), 지수 {BASE_LEVEL:g} → {levels[-1]:.2f}, "
+          f"연 변동성 {returns[1:].std() * np.sqrt(TRADING_DAYS_PER_YEAR) * 100:.2f}%, 상위 10종목 비중 {top * 100:.1f}%")
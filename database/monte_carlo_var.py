@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+몬테카를로 VaR / CVaR 엔진
+공분산 캐시(covariance_store) 의 종목 공분산과 전략 비중으로 전략 수익률을 시나리오 단위로 표본 추출해
+strategy_learning_analysis.var_95 (1일 95% VaR, %) 와 CVaR 를 계산
+
+전략 수익률은 비중과 종목 수익률의 선형결합이므로 종목 시나리오를 만들지 않고
+전략 공분산 WΣWᵀ 를 고유분해해 상위 요인 + 전략별 잔차로 바로 표본 추출 (전략마다 분산은 정확히 보존)
+두꺼운 꼬리는 시나리오별 공통 카이제곱 혼합 (다변량 t) 으로 반영
+시나리오는 메모리 한도에 맞춘 묶음으로 만들고, 전략별로 손실 상위 (1 - 신뢰수준) 몫만 남겨 정확한 분위수 계산
+묶음별 VaR 의 표준오차 (batch means) 로 수렴 정도를 함께 보고
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from covariance_store import DEFAULT_WINDOW, CovarianceStore
+from price_store import DEFAULT_STORE, PriceStore
+from risk_metrics import VAR_LEVEL, composition_weights, decimal, load_learning_strategies
+from sql_writer import format_value
+
+DEFAULT_SCENARIOS = 100000
+
+# 다변량 t 자유도 (None 이면 정규분포)
+DEGREES_OF_FREEDOM = 5
+
+# 전략 공분산에서 공통 요인으로 표본 추출하는 고유벡터 수 (나머지는 전략별 독립 잔차)
+FACTORS = 64
+
+# 시나리오 묶음이 쓰는 메모리 한도 (바이트, 꼬리 보관분 전략 × 시나리오 × (1 - 신뢰수준) × 8 바이트는 별도)
+MEMORY_BUDGET = 128 * 1024 * 1024
+
+# 전략 공분산 WΣW 계산 시 한 번에 곱하는 전략 수
+STRATEGY_CHUNK = 256
+
+
+def portfolio_moments(weights, covariance, mean, chunk=STRATEGY_CHUNK):
+    """전략 비중 (전략, 종목) → (전략 평균 일간 수익률 (전략), 전략 공분산 (전략, 전략))"""
+    exposure = np.empty_like(weights)
+    for first in range(0, len(weights), chunk):
+        exposure[first:first + chunk] = weights[first:first + chunk] @ covariance
+    return weights @ mean, exposure @ weights.T
+
+
+def factor_loadings(covariance, factors=FACTORS):
+    """전략 공분산 → (상위 요인 적재 (전략, 요인), 전략별 잔차 표준편차 (전략))"""
+    values, vectors = np.linalg.eigh(covariance)
+    factors = min(factors, len(values))
+    loadings = vectors[:, -factors:] * np.sqrt(np.maximum(values[-factors:], 0))
+    residual = np.diag(covariance) - (loadings * loadings).sum(axis=1)
+    return loadings, np.sqrt(np.maximum(residual, 0))
+
+
+def scenario_chunk(strategies, factors, budget=MEMORY_BUDGET):
+    """메모리 한도 안에서 한 번에 만드는 시나리오 수 (새 시나리오 수익률 + 잔차 난수, 요인 난수)"""
+    return max(1, budget // (8 * (2 * strategies + factors)))
+
+
+def simulate(mean, loadings, residual, scenarios=DEFAULT_SCENARIOS, level=VAR_LEVEL, dof=DEGREES_OF_FREEDOM,
+             seed=42, budget=MEMORY_BUDGET, horizon=1):
+    """전략별 VaR / CVaR (손실, 수익률 단위) 와 수렴 기록
+
+    버퍼 하나의 앞쪽 행에 지금까지 가장 낮은 수익률 (꼬리) 을, 바로 뒤에 새 시나리오 묶음을 만들고
+    제자리 partition 으로 꼬리만 다시 앞으로 모음 (메모리 = 꼬리 + 묶음, 시나리오 수와 무관)
+    반환: {'var', 'cvar', 'stderr' (VaR 표준오차), 'convergence': [(시나리오 수, 평균 VaR 변화, 최대 상대 표준오차)]}
+    """
+    rng = np.random.default_rng(seed)
+    strategies, factors = loadings.shape
+    chunk = min(scenario_chunk(strategies, factors, budget), scenarios)
+    keep = math.ceil(scenarios * (1 - level))
+    buffer = np.empty((keep + chunk, strategies))                          # (시나리오, 전략) 수익률
+    noise = np.empty((chunk, strategies))
+    drift = mean * horizon
+    spread = math.sqrt(horizon)
+    filled = 0
+    done = 0
+    batch_var = []
+    convergence = []
+    previous = None
+    while done < scenarios:
+        size = min(chunk, scenarios - done)
+        block = buffer[filled:filled + size]
+        np.matmul(rng.standard_normal((size, factors)), loadings.T, out=block)
+        rng.standard_normal(out=noise[:size])
+        noise[:size] *= residual
+        block += noise[:size]
+        if dof:
+            # 분산이 1 이 되도록 맞춘 카이제곱 혼합 → 다변량 t
+            block *= np.sqrt((dof - 2) / rng.chisquare(dof, size))[:, None]
+        block *= spread
+        block += drift
+
+        count = math.ceil(size * (1 - level))
+        block.partition(count - 1, axis=0)
+        batch_var.append(-block[count - 1])
+        filled += size
+        done += size
+        width = min(keep, filled)
+        buffer[:filled].partition(width - 1, axis=0)
+        filled = width
+
+        # 지금까지 시나리오의 VaR = 수익률 하위 ceil(n × (1 - level)) 번째 값의 부호 반대
+        rank = math.ceil(done * (1 - level)) - 1
+        buffer[:filled].partition(rank, axis=0)
+        current = -buffer[rank]
+        stderr = (np.std(batch_var, axis=0, ddof=1) / math.sqrt(len(batch_var)) if len(batch_var) > 1
+                  else np.full(strategies, np.nan))
+        change = np.nan if previous is None else float(np.abs(current - previous).mean())
+        convergence.append((done, change, float(np.max(stderr / np.maximum(np.abs(current), 1e-12)))
+                            if len(batch_var) > 1 else np.nan))
+        previous = current
+    return {
+        'var': previous,
+        'cvar': -buffer[:filled].mean(axis=0),
+        'stderr': stderr,
+        'convergence': convergence,
+    }
+
+
+def strategy_var(store, weights, scenarios=DEFAULT_SCENARIOS, window=DEFAULT_WINDOW, cache=None,
+                 method='ledoit_wolf', **options):
+    """전략 비중 (전략, 종목) 의 몬테카를로 VaR / CVaR (공분산 캐시는 필요하면 갱신)"""
+    covariance = CovarianceStore(store, window, cache)
+    covariance.refresh()
+    mean, matrix = portfolio_moments(weights, covariance.matrix(method), covariance.mean())
+    loadings, residual = factor_loadings(matrix)
+    return simulate(mean, loadings, residual, scenarios, **options)
+
+
+def update_statements(codes, result):
+    """strategy_learning_analysis.var_95 UPDATE 구문 (%)"""
+    for code, var in zip(codes, result['var'].tolist()):
+        yield (f"UPDATE strategy_learning_analysis SET var_95 = {decimal(var * 100, 2, 999.99)} "
+               f"WHERE strategy_code = {format_value(code)};\n")
+
+
+def print_convergence(convergence):
+    print(f"   {'시나리오':>10} {'평균 VaR 변화':>14} {'최대 상대 표준오차':>18}")
+    for done, change, stderr in convergence:
+        change_text = '-' if np.isnan(change) else f"{change * 100:.4f}%p"
+        stderr_text = '-' if np.isnan(stderr) else f"{stderr * 100:.2f}%"
+        print(f"   {done:>10,} {change_text:>14} {stderr_text:>18}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='전략 몬테카를로 VaR/CVaR 계산 후 strategy_learning_analysis.var_95 UPDATE 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--cache', help='공분산 캐시 디렉터리 (기본: 저장소 + _covariance)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='공분산 추정 구간 (거래일)')
+    parser.add_argument('--covariance', choices=['ledoit_wolf', 'sector', 'sample'], default='ledoit_wolf',
+                        help='공분산 추정')
+    parser.add_argument('--learning-dump', required=True, help='strategy_learning_master 가 들어 있는 SQL 덤프')
+    parser.add_argument('--scenarios', type=int, default=DEFAULT_SCENARIOS, help='시나리오 수')
+    parser.add_argument('--dof', type=float, default=DEGREES_OF_FREEDOM, help='다변량 t 자유도 (0 이면 정규분포)')
+    parser.add_argument('--horizon', type=int, default=1, help='VaR 기간 (거래일)')
+    parser.add_argument('--memory', type=int, default=MEMORY_BUDGET // (1024 * 1024), help='시나리오 묶음 메모리 한도 (MB)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    parser.add_argument('--output', default='update_var.sql', help='출력 SQL 파일')
+    args = parser.parse_args()
+    if args.dof and args.dof <= 2:
+        parser.error('--dof 는 2 보다 커야 합니다 (분산이 유한해야 함)')
+
+    store = PriceStore(args.store)
+    learning = load_learning_strategies(args.learning_dump)
+    weights, _, missing = composition_weights(store, [composition for _, composition in learning])
+    if missing:
+        print(f"⚠️  저장소에 없는 종목 {len(set(missing))}개는 제외하고 비중을 다시 맞춤")
+    held = weights.sum(axis=1) > 0
+    codes = [code for (code, _), keep in zip(learning, held) if keep]
+
+    started = time.perf_counter()
+    result = strategy_var(store, weights[held], args.scenarios, args.window, args.cache, args.covariance,
+                          level=VAR_LEVEL, dof=args.dof or None, seed=args.seed,
+                          budget=args.memory * 1024 * 1024, horizon=args.horizon)
+    elapsed = time.perf_counter() - started
+    print(f"🎲 전략 {len(codes):,}개 × 시나리오 {args.scenarios:,}개 ({args.covariance}, "
+          f"{'정규' if not args.dof else f't(자유도 {args.dof:g})'}, {elapsed:.2f}초)")
+    print_convergence(result['convergence'])
+    print(f"   VaR 평균 {result['var'].mean() * 100:.2f}%, CVaR 평균 {result['cvar'].mean() * 100:.2f}%")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(f"-- 몬테카를로 VaR (monte_carlo_var.py, 신뢰수준 {VAR_LEVEL:.0%}, {args.horizon}일)\nUSE kpsdb;\n\n")
+        f.writelines(update_statements(codes, result))
+    print(f"📁 파일: {args.output}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+가격-시간 우선 주문 체결 시뮬레이터
+생성된 trading_history 는 주문 1건 = 체결 1건 (ORD/EXE 같은 순번) 이므로
+종목별 호가창 (매수/매도 힙) 에 주문을 넣어 한 주문이 여러 번에 나누어 체결되는 체결 단위 매매내역으로 변환
+
+(종목, 매매일자) 를 한 세션으로 보고 세션 안의 고객 주문을 임의 도착 순서로 처리
+    - 세션 기준가 = 고객 주문 단가의 중앙값을 KRX 호가단위로 반올림 (같은 날 같은 종목은 모든 계좌가 같은 호가창)
+    - 지정가 대기 주문 (PASSIVE_RATIO): 기준가 ± 0 ~ PASSIVE_TICKS 호가에 접수, 체결되지 않은 잔량은 호가창에 대기
+      → 이후 들어오는 반대편 고객 주문이나 시장 참여자 주문 (TAKER) 에 나누어 체결
+    - 시장가성 주문: 반대편 잔량이 부족하면 시장 참여자 호가 (MAKER) 를 기준가 ± 1 ~ LEVEL_TICKS 호가에 채운 뒤
+      여러 호가/여러 주문을 쓸어 가며 체결 (가격 우선 → 같은 가격은 접수 순)
+    - 장 마감까지 남은 대기 잔량은 종가 단일가로 주문 가격에 한 번에 체결 (모든 주문은 전량 체결)
+시장 참여자 주문 수량은 들어온 고객 주문 수량 × MAKER_SIZE 평균의 지수분포 → 주문당 체결 건수 조절
+
+출력 행은 주문번호는 그대로, 체결번호는 계좌 안 체결 순번 (EXECUTION_FORMAT) 으로 다시 매기고
+order_quantity/order_amount 에 체결 단위 수량/금액 (체결수량 × 체결가) 을 기록
+체결 수량 합은 주문 수량과 같으므로 cost_basis.py 로 재생한 보유수량은 변환 전과 동일
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+import numpy as np
+
+from dataset_spec import parse_schema
+from price_history import round_tick, tick_size
+from reference_data import TRADE_COLUMNS
+from sql_reader import read_rows
+from sql_writer import amount
+from tsv_writer import WRITERS
+
+SELL_CODE = '2'
+
+# 체결번호: 접두어 + 계좌 안 체결 순번 7자리
+EXECUTION_FORMAT = 'EXE{:07d}'
+
+# 지정가로 호가창에 대기하는 고객 주문 비율
+PASSIVE_RATIO = 0.4
+
+# 대기 주문 가격 = 기준가 ± 0 ~ PASSIVE_TICKS 호가 (매수는 아래, 매도는 위)
+PASSIVE_TICKS = 2
+
+# 시장 참여자 호가 = 기준가 ± 1 ~ LEVEL_TICKS 호가, 시장가성 고객 주문의 지정가 한도 (PASSIVE_TICKS 이상)
+LEVEL_TICKS = 3
+
+# 시장 참여자 주문 평균 수량 (들어온 고객 주문 수량 대비 배수)
+MAKER_SIZE = 0.5
+
+# 시장 참여자 (TAKER) 주문 id (고객 주문 id 는 0 이상 행 위치)
+MARKET_ID = -1
+
+class OrderBook:
+    """종목 하나의 가격-시간 우선 호가창
+
+    매수/매도 각각 [정렬 가격, 접수 순번, 주문 id, 잔량] 힙 (매수는 가격 부호를 바꿔 최고가가 맨 앞)
+    """
+
+    def __init__(self):
+        self.bids = []
+        self.asks = []
+        self.depth = [0, 0]                     # 매수/매도 대기 잔량 합계
+        self._sequence = 0
+
+    def clear(self):
+        """세션 종료 (대기 주문 모두 삭제)"""
+        self.bids.clear()
+        self.asks.clear()
+        self.depth = [0, 0]
+
+    def post(self, order_id, sell, price, quantity):
+        """체결 없이 호가창에 대기 주문 추가 (반대편 최우선 호가와 교차하지 않는 가격만)"""
+        self._sequence += 1
+        if sell:
+            heapq.heappush(self.asks, [price, self._sequence, order_id, quantity])
+        else:
+            heapq.heappush(self.bids, [-price, self._sequence, order_id, quantity])
+        self.depth[sell] += quantity
+
+    def submit(self, order_id, sell, quantity, price=None):
+        """주문 접수 → (체결 목록 [(상대 주문 id, 체결가, 체결수량)], 미체결 수량)
+
+        반대편 호가를 가격 우선, 같은 가격은 접수 순으로 체결 (체결가 = 대기 주문 가격)
+        price 가 있으면 지정가 (남은 수량은 대기), 없으면 시장가 (남은 수량은 취소)
+        """
+        book = self.bids if sell else self.asks
+        fills = []
+        remaining = quantity
+        while remaining and book:
+            entry = book[0]
+            level = -entry[0] if sell else entry[0]
+            if price is not None and (level < price if sell else level > price):
+                break
+            traded = entry[3] if entry[3] < remaining else remaining
+            fills.append((entry[2], level, traded))
+            remaining -= traded
+            entry[3] -= traded
+            if not entry[3]:
+                heapq.heappop(book)
+        self.depth[not sell] -= quantity - remaining
+        if remaining and price is not None:
+            self.post(order_id, sell, price, remaining)
+        return fills, remaining
+
+    def resting(self):
+        """대기 중인 [정렬 가격, 접수 순번, 주문 id, 잔량] 목록 (매수 가격은 부호가 바뀐 값)"""
+        return [(False, entry) for entry in self.bids] + [(True, entry) for entry in self.asks]
+
+
+def match_session(book, rng, orders, reference, tick, executions, passive_ratio=PASSIVE_RATIO,
+                  maker_size=MAKER_SIZE):
+    """세션 하나 (한 종목, 하루) 의 고객 주문 [(주문 id, 매도 여부, 수량)] 을 도착 순서대로 체결
+
+    executions[주문 id] 에 (체결가, 체결수량) 을 체결 순서대로 추가
+    """
+    uniform = rng.random                        # randint 보다 빠른 정수 추출 (int(uniform() * n))
+    for order_id, sell, quantity in orders:
+        mean = quantity * maker_size
+        if uniform() < passive_ratio:
+            offset = int(uniform() * (PASSIVE_TICKS + 1)) * tick
+            fills, _ = book.submit(order_id, sell, quantity, reference + offset if sell else reference - offset)
+        else:
+            # 반대편 잔량이 모자라면 시장 참여자 호가를 채운 뒤 지정가 한도 안에서 전량 체결
+            while book.depth[not sell] < quantity:
+                level = (1 + int(uniform() * LEVEL_TICKS)) * tick
+                book.post(MARKET_ID, not sell, reference - level if sell else reference + level,
+                          1 + int(rng.expovariate(1 / mean)))
+            limit = LEVEL_TICKS * tick
+            fills, _ = book.submit(order_id, sell, quantity, reference - limit if sell else reference + limit)
+        for resting_id, price, traded in fills:
+            executions[order_id].append((price, traded))
+            if resting_id != MARKET_ID:
+                executions[resting_id].append((price, traded))
+
+        # 시장 참여자 시장가 주문이 대기 주문 일부를 가져감
+        taker_fills, _ = book.submit(MARKET_ID, uniform() < 0.5, 1 + int(rng.expovariate(1 / mean)))
+        for resting_id, price, traded in taker_fills:
+            if resting_id != MARKET_ID:
+                executions[resting_id].append((price, traded))
+
+    # 장 마감: 남은 대기 잔량은 주문 가격으로 한 번에 체결
+    for sell, (key, _, order_id, remaining) in sorted(book.resting(), key=lambda item: item[1][1]):
+        if order_id != MARKET_ID:
+            executions[order_id].append((key if sell else -key, remaining))
+    book.clear()
+
+
+def load_orders(path, schema=None):
+    """덤프의 trading_history 를 컬럼별 목록 dict 로 읽음 (단가 = 주문금액 / 주문수량)"""
+    schema = parse_schema() if schema is None else schema
+    orders = {name: [] for name in ('account', 'date', 'order', 'stock', 'code', 'quantity', 'price')}
+    last_columns = None
+    for _, columns, values in read_rows(path, ['trading_history'], schema):
+        if columns is not last_columns:
+            missing = [column for column in TRADE_COLUMNS if column not in columns]
+            if missing:
+                raise ValueError(f"{path}: trading_history INSERT 에 {', '.join(missing)} 컬럼이 없습니다")
+            position = [columns.index(column) for column in TRADE_COLUMNS]
+            last_columns = columns
+        account, date, order, _, stock, code, quantity, won = (values[i] for i in position)
+        if quantity < 1:
+            continue
+        orders['account'].append(account)
+        orders['date'].append(date)
+        orders['order'].append(order)
+        orders['stock'].append(stock)
+        orders['code'].append(str(code))
+        orders['quantity'].append(quantity)
+        orders['price'].append(float(won) / quantity)
+    return orders
+
+
+def match_orders(orders, seed=42, passive_ratio=PASSIVE_RATIO, maker_size=MAKER_SIZE):
+    """전체 주문을 (종목, 일자) 세션별로 체결 → 주문 행 위치별 [(체결가, 체결수량)] 목록
+
+    세션은 (종목, 일자) 순서로, 세션 안 도착 순서는 seed 로 섞으므로 같은 입력/seed 면 결과 동일
+    """
+    sessions = {}
+    for index, key in enumerate(zip(orders['stock'], orders['date'])):
+        sessions.setdefault(key, []).append(index)
+    keys = sorted(sessions)
+    prices = orders['price']
+    medians = np.array([sorted(prices[i] for i in sessions[key])[len(sessions[key]) // 2] for key in keys])
+    references = round_tick(medians)
+    ticks = tick_size(references)
+
+    rng = random.Random(seed)
+    books = {}
+    executions = [[] for _ in prices]
+    sell = [code == SELL_CODE for code in orders['code']]
+    quantity = orders['quantity']
+    for key, reference, tick in zip(keys, references.tolist(), ticks.tolist()):
+        arrivals = sessions[key]
+        rng.shuffle(arrivals)
+        book = books.setdefault(key[0], OrderBook())
+        # 기준가 아래로 LEVEL_TICKS 호가를 둘 수 없을 만큼 싼 종목은 매수 호가를 1원 이상으로
+        reference = max(reference, LEVEL_TICKS * tick + 1)
+        match_session(book, rng, [(i, sell[i], quantity[i]) for i in arrivals], reference, tick, executions,
+                      passive_ratio, maker_size)
+    return executions
+
+
+def execution_rows(orders, executions):
+    """주문 행 순서대로 체결 행 튜플 yield (체결번호는 계좌 안 체결 순번)"""
+    counters = {}
+    for index, fills in enumerate(executions):
+        account = orders['account'][index]
+        common = (orders['date'][index], orders['order'][index])
+        for price, traded in fills:
+            number = counters.get(account, 0) + 1
+            counters[account] = number
+            yield (account, *common, EXECUTION_FORMAT.format(number), orders['stock'][index], orders['code'][index],
+                   traded, amount(price * traded))
+
+
+def fill_counts(executions):
+    """주문당 체결 건수 분포 {1: 주문 수, 2: ..., '4+': ...}"""
+    counts = np.bincount(np.array([len(fills) for fills in executions], dtype=np.int64))
+    return {1: int(counts[1:2].sum()), 2: int(counts[2:3].sum()), 3: int(counts[3:4].sum()),
+            '4+': int(counts[4:].sum())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='종목별 가격-시간 우선 호가창으로 매매내역을 체결 단위 (부분 체결) 로 변환')
+    parser.add_argument('dump', help='trading_history INSERT 가 들어 있는 SQL 덤프 (.sql/.sql.gz)')
+    parser.add_argument('--output', default='insert_executions.sql',
+                        help='체결 단위 trading_history 파일 (tsv 형식이면 디렉터리)')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--passive-ratio', type=float, default=PASSIVE_RATIO, help='지정가 대기 주문 비율')
+    parser.add_argument('--maker-size', type=float, default=MAKER_SIZE,
+                        help='시장 참여자 주문 평균 수량 (고객 주문 수량 대비, 작을수록 주문당 체결 건수 증가)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args()
+
+    print(f"🔍 {args.dump} 매매내역 읽는 중...")
+    orders = load_orders(args.dump)
+    total = len(orders['account'])
+    print(f"📊 주문 {total:,}건")
+
+    started = time.perf_counter()
+    executions = match_orders(orders, args.seed, args.passive_ratio, args.maker_size)
+    elapsed = time.perf_counter() - started
+    count = sum(len(fills) for fills in executions)
+    print(f"⚖️  체결 {count:,}건 (주문당 {count / max(total, 1):.2f}건, {elapsed:.2f}초, "
+          f"분당 {total / max(elapsed, 1e-9) * 60:,.0f}주문)")
+    for fills, orders_with in fill_counts(executions).items():
+        print(f"   체결 {fills}건 주문: {orders_with:,}건 ({orders_with / max(total, 1):.1%})")
+
+    with WRITERS[args.format](args.output) as writer:
+        writer.write("-- 체결 단위 매매내역 (order_matching.py)\nUSE kpsdb;\n\n")
+        if args.format == 'sql':
+            writer.write("DELETE FROM trading_history;\n\n")
+        written = writer.insert('trading_history', TRADE_COLUMNS, execution_rows(orders, executions))
+    print(f"📁 trading_history {written:,}건: {args.output}")
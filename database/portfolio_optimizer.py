@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+포트폴리오 최적화기 (최소분산 / 최대샤프 / 위험균형)
+시세 저장소(price_store) 수익률로 위험도·투자스타일별 후보 종목을 고르고 최적 비중을 구해
+strategy_learning_master 행 (portfolio_composition 포함) 을 생성
+
+공분산은 covariance_store 캐시 (기본 Ledoit-Wolf 수축 추정, 메모리 매핑) 를 그대로 쓰고 전략마다 후보 종목
+블록 (K × K) 만 모아 Σd 를 배치 행렬곱으로 계산하므로, 전략 수천 개가 같은 추정을 공유하고 다시 실행할 때는 공분산을 계산하지 않음
+비중은 종목/업종 상한이 있는 단체(simplex) 위에서 Frank-Wolfe 로 전략 묶음 단위 일괄 계산
+(꼭짓점은 기울기가 작은 종목부터 종목·업종 상한까지 채우는 greedy 해 → 상한을 정확히 지킴)
+최대샤프는 위험회피계수 격자로 효율적 투자선을 구해 샤프비율이 가장 높은 점을 선택
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from covariance_store import CovarianceStore
+from price_history import TRADING_DAYS_PER_YEAR
+from price_store import DEFAULT_STORE, PriceStore
+from reference_data import INVESTMENT_STYLES, RISK_LEVELS
+from risk_metrics import RISK_FREE_RATE, STYLE_SIGNALS, stock_signals
+from tsv_writer import WRITERS
+
+# 추정 구간 (거래일, 기본 최근 2년)
+ESTIMATION_DAYS = TRADING_DAYS_PER_YEAR * 2
+
+# 공분산 추정 (covariance_store 캐시의 추정 이름)
+COVARIANCE_METHOD = 'ledoit_wolf'
+
+# 종목별 기대수익률을 전 종목 평균 쪽으로 당기는 비율 (과거 평균수익률의 추정 오차 완화)
+MEAN_SHRINKAGE = 0.5
+
+# 최적화 방식 → 이름
+METHODS = {
+    'min_variance': '최소분산',
+    'max_sharpe': '최대샤프',
+    'risk_parity': '위험균형',
+}
+
+# 위험도별 후보 종목 수와 종목/업종 비중 상한 (후보는 위험도에 대응하는 변동성 5분위 안에서 선정)
+RISK_PROFILES = {
+    '초저위험': {'candidates': 40, 'stock_cap': 0.08, 'sector_cap': 0.25},
+    '저위험': {'candidates': 35, 'stock_cap': 0.10, 'sector_cap': 0.30},
+    '중위험': {'candidates': 30, 'stock_cap': 0.12, 'sector_cap': 0.35},
+    '고위험': {'candidates': 25, 'stock_cap': 0.15, 'sector_cap': 0.40},
+    '초고위험': {'candidates': 20, 'stock_cap': 0.20, 'sector_cap': 0.50},
+}
+
+# 효율적 투자선을 그리는 위험회피계수 격자 (최대샤프용)
+FRONTIER_AVERSIONS = np.geomspace(0.5, 64, 10)
+
+# Frank-Wolfe / 위험균형 반복 횟수
+ITERATIONS = 150
+PARITY_ITERATIONS = 100
+
+# 후보 선정 시 스타일 지표 순위에 더하는 무작위 폭 (전략마다 후보가 조금씩 달라지도록)
+SELECTION_NOISE = 0.3
+
+# composition 에 남기는 최소 비중 (이보다 작은 종목은 빼고 다시 맞춤)
+MIN_WEIGHT = 0.002
+
+# 메모리 사용량을 묶어 두기 위해 한 번에 계산하는 전략(행) 수
+STRATEGY_CHUNK = 512
+
+LEARNING_MASTER_COLUMNS = ['strategy_code', 'strategy_name', 'description', 'risk_level', 'investment_style',
+                           'keyword1', 'keyword2', 'keyword3', 'generation_type', 'generation_source',
+                           'portfolio_composition', 'performance_metrics', 'generation_status', 'created_by']
+
+def risk_model(covariance, method=COVARIANCE_METHOD, shrinkage=MEAN_SHRINKAGE):
+    """refresh() 한 CovarianceStore → {'covariance' (종목, 종목) 일간 (메모리 매핑), 'expected' (종목) 연율화}"""
+    annual = covariance.mean() * TRADING_DAYS_PER_YEAR
+    return {
+        'covariance': covariance.matrix(method),
+        'expected': (1 - shrinkage) * annual + shrinkage * annual.mean(),
+    }
+
+
+def candidate_covariance(model, candidates):
+    """후보 종목 번호 (전략, K) 의 연율화 공분산 블록 (전략, K, K)"""
+    return model['covariance'][candidates[:, :, None], candidates[:, None, :]] * TRADING_DAYS_PER_YEAR
+
+
+def covariance_product(covariance, vectors):
+    """후보 종목 공분산과 벡터의 곱 Σd (전략, K) - covariance (전략, K, K)"""
+    return np.matmul(covariance, vectors[:, :, None])[:, :, 0]
+
+
+def sector_totals(weights, sector, sectors):
+    """전략별 업종 비중 합계 (전략, 업종)"""
+    totals = np.zeros((len(weights), sectors))
+    np.add.at(totals, (np.arange(len(weights))[:, None], sector), weights)
+    return totals
+
+
+def feasible_caps(sector, stock_cap, sector_cap, sectors):
+    """후보 종목 수로 비중 100% 를 채울 수 있도록 종목/업종 상한을 필요한 만큼 올림"""
+    stock_cap = np.maximum(stock_cap, 1 / sector.shape[1])
+    counts = sector_totals(np.ones(sector.shape), sector, sectors)
+    low, high = sector_cap.copy(), np.ones(len(sector))
+    for _ in range(30):
+        middle = (low + high) / 2
+        enough = np.minimum(middle[:, None], counts * stock_cap[:, None]).sum(axis=1) >= 1 - 1e-9
+        high = np.where(enough, middle, high)
+        low = np.where(enough, low, middle)
+    enough = np.minimum(sector_cap[:, None], counts * stock_cap[:, None]).sum(axis=1) >= 1 - 1e-9
+    return stock_cap, np.where(enough, sector_cap, high)
+
+
+def vertex(gradient, sector, stock_cap, sector_cap, sectors):
+    """상한 있는 단체 위에서 gradient·s 를 최소로 하는 꼭짓점 s (전략, K)
+
+    기울기가 작은 종목부터 종목 상한, 업종 남은 한도, 전체 남은 비중 중 작은 만큼 채움
+    (종목 상한이 같고 업종이 겹치지 않으므로 greedy 가 최적)
+    """
+    rows = np.arange(len(gradient))[:, None]
+    order = np.argsort(gradient, axis=1, kind='stable')
+    ordered = sector[rows, order]
+    # 정렬 순서에서 같은 업종 안의 순번 → 업종 한도 안에서 받을 수 있는 비중
+    onehot = ordered[:, :, None] == np.arange(sectors)
+    rank = np.take_along_axis(np.cumsum(onehot, axis=1), ordered[:, :, None], axis=2)[:, :, 0] - 1
+    take = np.clip(sector_cap[:, None] - rank * stock_cap[:, None], 0, stock_cap[:, None])
+    used = np.cumsum(take, axis=1) - take
+    take = np.clip(1 - used, 0, take)
+    result = np.empty_like(take)
+    result[rows, order] = take
+    return result
+
+
+def frank_wolfe(covariance, expected, aversion, sector, stock_cap, sector_cap, sectors,
+                iterations=ITERATIONS):
+    """(aversion / 2) wᵀΣw - expected·w 를 상한 있는 단체 위에서 최소화 (전략 묶음 일괄)
+
+    aversion (전략) 은 위험회피계수, expected 가 0 이면 최소분산
+    """
+    weights = cap_weights(np.full(expected.shape, 1 / expected.shape[1]), sector, stock_cap, sector_cap, sectors)
+    product = covariance_product(covariance, weights)
+    for _ in range(iterations):
+        gradient = aversion[:, None] * product - expected
+        direction = vertex(gradient, sector, stock_cap, sector_cap, sectors) - weights
+        direction_product = covariance_product(covariance, direction)
+        slope = (gradient * direction).sum(axis=1)
+        curvature = aversion * (direction * direction_product).sum(axis=1)
+        step = np.clip(np.where(curvature > 0, -slope / np.maximum(curvature, 1e-18), 1), 0, 1)
+        weights += step[:, None] * direction
+        product += step[:, None] * direction_product
+    return weights
+
+
+def cap_weights(weights, sector, stock_cap, sector_cap, sectors, rounds=50):
+    """비중을 종목/업종 상한 안으로 줄이고 넘친 비중을 여유 있는 종목에 비례 배분"""
+    rows = np.arange(len(weights))[:, None]
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    for _ in range(rounds):
+        weights = np.minimum(weights, stock_cap[:, None])
+        totals = sector_totals(weights, sector, sectors)
+        scale = np.minimum(1, sector_cap[:, None] / np.maximum(totals, 1e-18))
+        weights = weights * scale[rows, sector]
+        missing = 1 - weights.sum(axis=1)
+        if missing.max() < 1e-10:
+            break
+        full = (weights >= stock_cap[:, None] - 1e-12) | (scale[rows, sector] < 1) | \
+            (sector_totals(weights, sector, sectors)[rows, sector] >= sector_cap[:, None] - 1e-12)
+        free = np.where(full, 0, np.maximum(weights, 1e-12))
+        weights = weights + free / np.maximum(free.sum(axis=1, keepdims=True), 1e-18) * missing[:, None]
+    return weights
+
+
+def risk_parity(covariance, sector, stock_cap, sector_cap, sectors, iterations=PARITY_ITERATIONS):
+    """종목별 위험기여도 wᵢ(Σw)ᵢ 가 같아지도록 곱셈 갱신 후 상한 적용"""
+    variance = np.maximum(np.diagonal(covariance, axis1=1, axis2=2), 1e-18)
+    weights = 1 / np.sqrt(variance)
+    weights /= weights.sum(axis=1, keepdims=True)
+    for _ in range(iterations):
+        contribution = weights * covariance_product(covariance, weights)
+        target = contribution.sum(axis=1, keepdims=True) / weights.shape[1]
+        weights = weights * np.sqrt(target / np.maximum(contribution, 1e-18))
+        weights /= weights.sum(axis=1, keepdims=True)
+    return cap_weights(weights, sector, stock_cap, sector_cap, sectors)
+
+
+def portfolio_stats(covariance, expected, weights, risk_free=RISK_FREE_RATE):
+    """사전(ex-ante) 연 기대수익률, 변동성, 샤프비율"""
+    annual = (expected * weights).sum(axis=1)
+    volatility = np.sqrt(np.maximum((weights * covariance_product(covariance, weights)).sum(axis=1), 0))
+    return annual, volatility, (annual - risk_free) / np.maximum(volatility, 1e-12)
+
+
+def optimize(model, candidates, sector, method, stock_cap, sector_cap, sectors):
+    """전략 묶음 (후보 종목 번호 (전략, K)) 의 최적 비중 (전략, K)"""
+    covariance = candidate_covariance(model, candidates)
+    if method == 'risk_parity':
+        return risk_parity(covariance, sector, stock_cap, sector_cap, sectors)
+    if method == 'min_variance':
+        zero = np.zeros(candidates.shape)
+        return frank_wolfe(covariance, zero, np.ones(len(candidates)), sector, stock_cap, sector_cap,
+                           sectors)
+
+    # 최대샤프: 전략 × 위험회피계수 행으로 펼쳐 효율적 투자선을 한 번에 풀고 샤프비율 최대인 점 선택
+    points = len(FRONTIER_AVERSIONS)
+
+    def spread(values):
+        return np.repeat(values, points, axis=0)
+
+    expected = model['expected'][candidates] - RISK_FREE_RATE
+    frontier = frank_wolfe(spread(covariance), spread(expected),
+                           np.tile(FRONTIER_AVERSIONS, len(candidates)), spread(sector), spread(stock_cap),
+                           spread(sector_cap), sectors)
+    _, _, sharpe = portfolio_stats(spread(covariance), spread(expected) + RISK_FREE_RATE, frontier)
+    best = sharpe.reshape(len(candidates), points).argmax(axis=1)
+    return frontier.reshape(len(candidates), points, -1)[np.arange(len(candidates)), best]
+
+
+def select_candidates(signals, stock_sector, risk_level, style, rng):
+    """위험도 변동성 5분위 안에서 투자스타일 지표 상위 (+ 무작위 폭) 후보 종목 번호
+
+    한 업종에서는 업종 상한을 종목 상한으로 채울 수 있는 수까지만 골라 업종 상한이 지켜지도록 함
+    """
+    profile = RISK_PROFILES[risk_level]
+    stocks = len(signals['volatility'])
+    order = np.argsort(signals['volatility'], kind='stable')
+    level = RISK_LEVELS.index(risk_level)
+    band = order[level * stocks // len(RISK_LEVELS):(level + 1) * stocks // len(RISK_LEVELS)]
+    signal = STYLE_SIGNALS.get(style, 'sharpe')
+    if signal == 'broad':
+        score = rng.random(len(band))
+    else:
+        score = np.argsort(np.argsort(signals[signal][band])) / len(band) + rng.random(len(band)) * SELECTION_NOISE
+    ranked = band[np.argsort(-score, kind='stable')]
+    # 점수 순서에서 업종 안 순번 (업종별 안정 정렬 후 업종 시작 위치와의 차이)
+    sector = stock_sector[ranked]
+    by_sector = np.argsort(sector, kind='stable')
+    first = np.searchsorted(sector[by_sector], sector[by_sector])
+    rank = np.empty(len(ranked), dtype=np.int64)
+    rank[by_sector] = np.arange(len(ranked)) - first
+    limit = int(np.ceil(profile['sector_cap'] / profile['stock_cap'] - 1e-9))
+    picked = ranked[rank < limit][:profile['candidates']]
+    if len(picked) < min(profile['candidates'], len(ranked)):
+        # 업종 수가 모자라면 남은 자리는 점수 순으로 채움 (feasible_caps 가 업종 상한을 올림)
+        rest = ranked[rank >= limit][:profile['candidates'] - len(picked)]
+        picked = np.concatenate([picked, rest])
+    return np.sort(picked)
+
+
+def strategy_plan(count, methods=tuple(METHODS)):
+    """생성할 전략 (위험도, 투자스타일, 최적화 방식) 목록 - 조합을 차례로 돌아가며 count 개"""
+    combinations = [(level, style, method) for level in RISK_LEVELS for style in INVESTMENT_STYLES
+                    for method in methods]
+    return [combinations[i % len(combinations)] for i in range(count)]
+
+
+def generate(store, count, days=ESTIMATION_DAYS, seed=42, methods=tuple(METHODS), covariance_method=COVARIANCE_METHOD,
+             cache=None):
+    """전략 count 개의 후보 종목과 최적 비중 생성
+
+    공분산은 CovarianceStore (cache 디렉터리, 기본: 저장소 + '_covariance') 의 최근 days 거래일 추정을 갱신해 사용
+
+    반환: (전략 목록 [(위험도, 투자스타일, 방식)], 후보 종목 번호 목록, 비중 목록, 사전 지표 {'expected_return', 'volatility', 'sharpe'})
+    """
+    rng = np.random.default_rng(seed)
+    returns = store.returns()[:, -days:]
+    covariance = CovarianceStore(store, days, cache)
+    covariance.refresh()
+    model = risk_model(covariance, covariance_method)
+    signals = stock_signals(returns)
+    names = sorted(set(store.sectors)) if store.sectors else ['기타']
+    stock_sector = (np.array([names.index(name) for name in store.sectors]) if store.sectors
+                    else np.zeros(len(store), dtype=np.int64))
+
+    plan = strategy_plan(count, methods)
+    candidates = [select_candidates(signals, stock_sector, level, style, rng) for level, style, _ in plan]
+    weights = [None] * count
+    stats = {name: np.zeros(count) for name in ('expected_return', 'volatility', 'sharpe')}
+    groups = {}
+    for i, (level, _, method) in enumerate(plan):
+        groups.setdefault((level, method, len(candidates[i])), []).append(i)
+    for (level, method, _), rows in groups.items():
+        profile = RISK_PROFILES[level]
+        for first in range(0, len(rows), STRATEGY_CHUNK):
+            chunk = rows[first:first + STRATEGY_CHUNK]
+            index = np.array([candidates[i] for i in chunk])
+            sector = stock_sector[index]
+            stock_cap, sector_cap = feasible_caps(sector, np.full(len(chunk), profile['stock_cap']),
+                                                  np.full(len(chunk), profile['sector_cap']), len(names))
+            result = optimize(model, index, sector, method, stock_cap, sector_cap, len(names))
+            result = np.where(result >= MIN_WEIGHT, result, 0)
+            result = cap_weights(result, sector, stock_cap, sector_cap, len(names))
+            annual, volatility, sharpe = portfolio_stats(candidate_covariance(model, index), model['expected'][index],
+                                                         result)
+            for row, i in enumerate(chunk):
+                weights[i] = result[row]
+            stats['expected_return'][chunk] = annual
+            stats['volatility'][chunk] = volatility
+            stats['sharpe'][chunk] = sharpe
+    return plan, candidates, weights, stats
+
+
+def composition(store, candidates, weights):
+    """portfolio_composition JSON dict ({"stocks": [{"stock_code", "weight", "sector"}]}, 비중은 %)"""
+    stocks = []
+    for stock, weight in sorted(zip(candidates.tolist(), weights.tolist()), key=lambda item: -item[1]):
+        if weight >= MIN_WEIGHT:
+            item = {'stock_code': store.codes[stock], 'weight': round(weight * 100, 2)}
+            if store.sectors:
+                item['sector'] = store.sectors[stock]
+            stocks.append(item)
+    return {'stocks': stocks}
+
+
+def master_rows(store, plan, candidates, weights, stats, days, covariance_method=COVARIANCE_METHOD, code_prefix='FAI',
+                created_by='SYSTEM'):
+    """strategy_learning_master 행 (generation_type 'FAI' 자동생성)"""
+    for i, (level, style, method) in enumerate(plan):
+        method_name = METHODS[method]
+        profile = RISK_PROFILES[level]
+        held = int((weights[i] >= MIN_WEIGHT).sum())
+        metrics = {
+            'expected_return': round(float(stats['expected_return'][i]) * 100, 2),
+            'expected_volatility': round(float(stats['volatility'][i]) * 100, 2),
+            'sharpe_ratio': round(float(stats['sharpe'][i]), 3),
+            'optimization': method,
+        }
+        yield (f"{code_prefix}{i + 1:06d}",
+               f"{code_prefix}_{method}_{i + 1:06d}",
+               f"{style} 기준 {level} 후보 {len(candidates[i])}종목 중 {held}종목을 {method_name} 비중으로 구성 "
+               f"(종목 상한 {profile['stock_cap'] * 100:.0f}%, 업종 상한 {profile['sector_cap'] * 100:.0f}%)",
+               level,
+               style,
+               method_name,
+               '최적화',
+               style,
+               'FAI',
+               f"portfolio_optimizer.py (최근 {days}거래일, 공분산 {covariance_method})",
+               json.dumps(composition(store, candidates[i], weights[i]), ensure_ascii=False),
+               json.dumps(metrics, ensure_ascii=False),
+               '완료',
+               created_by)
+
+
+def print_summary(plan, stats):
+    print(f"   {'위험도':<6} {'방식':<6} {'전략':>6} {'수익률':>8} {'변동성':>8} {'샤프':>7}")
+    levels = np.array([level for level, _, _ in plan])
+    methods = np.array([method for _, _, method in plan])
+    for level in RISK_LEVELS:
+        for method, name in METHODS.items():
+            rows = (levels == level) & (methods == method)
+            if rows.any():
+                print(f"   {level:<6} {name:<6} {int(rows.sum()):6,} {stats['expected_return'][rows].mean() * 100:7.2f}% "
+                      f"{stats['volatility'][rows].mean() * 100:7.2f}% {stats['sharpe'][rows].mean():7.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='시세 저장소로 최적 비중 전략을 만들어 strategy_learning_master INSERT 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--count', type=int, default=1000, help='생성할 전략 수')
+    parser.add_argument('--days', type=int, default=ESTIMATION_DAYS, help='추정 구간 (거래일)')
+    parser.add_argument('--method', choices=sorted(METHODS), action='append', help='최적화 방식 (반복 지정, 기본 전체)')
+    parser.add_argument('--covariance', choices=['ledoit_wolf', 'sector', 'sample'], default=COVARIANCE_METHOD,
+                        help='공분산 추정 (covariance_store 캐시)')
+    parser.add_argument('--cache', help='공분산 캐시 디렉터리 (기본: 저장소 + _covariance)')
+    parser.add_argument('--seed', type=int, default=42, help='후보 종목 선정 난수 시드')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--output', default='insert_strategy_learning_master.sql', help='출력 파일 (tsv 는 디렉터리)')
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    print(f"📊 저장소 {args.store}: 종목 {store.shape[0]:,}개 × 거래일 {store.shape[1]:,}일, 추정 구간 {args.days}일")
+    started = time.perf_counter()
+    plan, candidates, weights, stats = generate(store, args.count, args.days, args.seed,
+                                                tuple(args.method or METHODS), args.covariance, args.cache)
+    print(f"🧮 전략 {args.count:,}개 최적화 ({time.perf_counter() - started:.2f}초)")
+    print_summary(plan, stats)
+
+    with WRITERS[args.format](args.output) as sql:
+        sql.write("-- 최적화 전략 (portfolio_optimizer.py)\nUSE kpsdb;\n\n")
+        sql.insert('strategy_learning_master', LEARNING_MASTER_COLUMNS,
+                   master_rows(store, plan, candidates, weights, stats, args.days, args.covariance))
+    print(f"📁 파일: {args.output}")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+상관관계가 있는 종목 일별 시세 시뮬레이터
+전 종목의 일별 종가 경로를 기하 브라운 운동(GBM)으로 한꺼번에 생성해 stock_price_history 로 출력
+일별 충격 = 시장 공통 충격 + 업종 공통 충격 + 종목 고유 충격 (같은 업종 종목끼리 더 강하게 상관)
+종가는 KRX 호가단위로 맞추고 전일 종가 대비 ±30% 가격제한폭 안으로 보정하며,
+마지막 종가는 stock_current_price 현재가로 함께 출력
+
+날짜별 루프 없이 (거래일, 종목) 행렬 연산으로 계산하므로 2,500종목 × 10년도 몇 초 안에 생성
+같은 seed 면 항상 같은 시세
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from dataset_spec import DEFAULT_SPEC, write_lines
+from price_store import write_history_store
+from sql_writer import DEFAULT_MAX_BYTES, SqlWriter
+from trading_calendar import krx_calendar
+from tsv_writer import WRITERS
+from vector_backend import LAYOUTS, assemble, gather, number_parts, vocab_table
+
+# KRX 호가가격단위 (2023년 개편 기준): 가격 구간 경계 → 구간별 호가단위
+TICK_BOUNDS = np.array([2000, 5000, 20000, 50000, 200000, 500000])
+TICK_SIZES = np.array([1, 5, 10, 50, 100, 500, 1000])
+
+# 가격제한폭 (전일 종가 대비 ±30%) - 정수 연산용 10분율
+LIMIT_UP = 13
+LIMIT_DOWN = 7
+
+TRADING_DAYS_PER_YEAR = 250
+
+# 업종: (업종명, 변동성 배율)
+SECTORS = [
+    ('반도체', 1.2),
+    ('자동차', 1.0),
+    ('2차전지', 1.5),
+    ('바이오', 1.6),
+    ('금융', 0.8),
+    ('화학', 1.0),
+    ('철강', 0.9),
+    ('건설', 1.0),
+    ('유통', 0.8),
+    ('통신', 0.6),
+    ('IT서비스', 1.2),
+    ('엔터테인먼트', 1.4),
+]
+
+# 일별 충격의 시장/업종 공통 성분 비중 (같은 업종 상관계수 0.325, 다른 업종 0.2)
+MARKET_LOADING = 0.45
+SECTOR_LOADING = 0.35
+
+# 종목별 연 기대수익률 (평균, 표준편차) 과 기본 연 변동성 범위
+DRIFT = (0.06, 0.05)
+VOLATILITY = (0.20, 0.45)
+
+# 시작 가격 범위 (stock_current_price 기존 생성 범위와 같음, 로그 균등분포)
+START_PRICE = (1000, 900000)
+
+HISTORY_COLUMNS = ['stock_code', 'trading_date', 'close_price', 'change_rate']
+CURRENT_COLUMNS = ['stock_code', 'current_price']
+
+# 출력 시 한 번에 조립하는 종목 수
+FORMAT_STOCKS = 64
+
+def stock_codes(count=DEFAULT_SPEC['tables']['stock_current_price']['rows']):
+    """dataset_spec 의 stock_current_price 와 같은 종목코드 (000001 ~)"""
+    return [f"{i:06d}" for i in range(1, count + 1)]
+
+
+def trading_days(end, count):
+    """end 일자(YYYYMMDD)까지의 최근 거래일 count 개 (주말/KRX 휴장일 제외, datetime64[D] 배열)"""
+    return krx_calendar().recent(end, count)
+
+
+def tick_size(prices):
+    """가격별 호가단위"""
+    return TICK_SIZES[np.searchsorted(TICK_BOUNDS, prices, side='right')]
+
+
+def round_tick(prices):
+    """가장 가까운 호가로 반올림한 정수 가격 (최소 1원)"""
+    tick = tick_size(prices)
+    return np.maximum(np.rint(prices / tick) * tick, 1).astype(np.int64)
+
+
+def limit_prices(previous):
+    """전일 종가 기준 (상한가, 하한가) - 상한가는 호가단위 내림, 하한가는 올림"""
+    upper = previous * LIMIT_UP // 10
+    upper -= upper % tick_size(upper)
+    lower = -(-previous * LIMIT_DOWN // 10)
+    tick = tick_size(lower)
+    lower += -lower % tick
+    return upper, np.maximum(lower, 1)
+
+
+def apply_limits(close, start):
+    """전일 종가 대비 가격제한폭을 넘는 종가를 상한가/하한가로 보정 (보정이 다음 날에 주는 영향까지 반복)"""
+    while True:
+        previous = np.concatenate([start[None, :], close[:-1]])
+        upper, lower = limit_prices(previous)
+        over = close > upper
+        under = close < lower
+        if not (over.any() or under.any()):
+            return close
+        close = np.where(over, upper, np.where(under, lower, close))
+
+
+def simulate(stocks=2500, years=10, end='20241231', seed=42, codes=None):
+    """전 종목 일별 종가 시뮬레이션
+
+    반환: {
+        'codes':   종목코드 목록,
+        'dates':   거래일 배열 (datetime64[D]),
+        'close':   종가 정수 행렬 (거래일, 종목),
+        'start':   첫 거래일 전일 종가 (종목),
+        'sectors': 종목별 업종 번호 (sector_names 인덱스),
+        'sector_names': 업종명 목록,
+    }
+    """
+    codes = stock_codes(stocks) if codes is None else list(codes)
+    stocks = len(codes)
+    days = int(round(years * TRADING_DAYS_PER_YEAR))
+    rng = np.random.default_rng(seed)
+
+    sectors = rng.integers(0, len(SECTORS), stocks)
+    multiplier = np.array([scale for _, scale in SECTORS])[sectors]
+    volatility = rng.uniform(*VOLATILITY, stocks) * multiplier
+    drift = rng.normal(*DRIFT, stocks)
+    start = round_tick(np.exp(rng.uniform(np.log(START_PRICE[0]), np.log(START_PRICE[1]), stocks)))
+
+    # 상관 충격: 시장(거래일) + 업종(거래일, 업종) + 종목 고유(거래일, 종목), 분산 1 로 정규화
+    shocks = rng.standard_normal((days, stocks))
+    shocks *= np.sqrt(1 - MARKET_LOADING ** 2 - SECTOR_LOADING ** 2)
+    shocks += MARKET_LOADING * rng.standard_normal(days)[:, None]
+    shocks += SECTOR_LOADING * rng.standard_normal((days, len(SECTORS)))[:, sectors]
+
+    dt = 1 / TRADING_DAYS_PER_YEAR
+    returns = shocks
+    returns *= volatility * np.sqrt(dt)
+    returns += (drift - volatility ** 2 / 2) * dt
+    np.clip(returns, np.log(LIMIT_DOWN / 10), np.log(LIMIT_UP / 10), out=returns)
+
+    # 연속 경로를 누적합으로 한 번에 구한 뒤 호가단위 반올림, 제한폭 보정
+    path = np.cumsum(returns, axis=0)
+    path += np.log(start)
+    close = apply_limits(round_tick(np.exp(path, out=path)), start)
+
+    return {
+        'codes': codes,
+        'dates': trading_days(end, days),
+        'close': close,
+        'start': start,
+        'sectors': sectors,
+        'sector_names': [name for name, _ in SECTORS],
+    }
+
+
+def change_rates(history):
+    """전일 대비 등락률 (%) × 100 정수 행렬 (거래일, 종목)"""
+    close = history['close']
+    previous = np.concatenate([history['start'][None, :], close[:-1]])
+    return np.rint((close - previous) * 10000 / previous).astype(np.int64)
+
+
+def date_strings(dates):
+    """datetime64[D] 배열 → YYYYMMDD 문자열 목록"""
+    return [text.replace('-', '') for text in np.datetime_as_string(dates, unit='D')]
+
+
+def history_lines(history, format_value, output_format='sql', batch=FORMAT_STOCKS):
+    """stock_price_history 행 문자열을 (종목, 거래일) 순서로 종목 batch 개씩 (행 목록, 바이트 수 목록) yield"""
+    layout = LAYOUTS[output_format]
+    codes = vocab_table(history['codes'], format_value)
+    dates = vocab_table(date_strings(history['dates']), format_value)
+    close = history['close']
+    rates = change_rates(history)
+    days, stocks = close.shape
+    for first in range(0, stocks, batch):
+        last = min(first + batch, stocks)
+        yield assemble([
+            [gather(codes, np.repeat(np.arange(first, last), days))],
+            [gather(dates, np.tile(np.arange(days), last - first))],
+            number_parts(close[:, first:last].T.ravel() * 100, 2),
+            number_parts(rates[:, first:last].T.ravel(), 2),
+        ], layout)
+
+
+def current_lines(history, format_value, output_format='sql'):
+    """마지막 종가를 stock_current_price 행 문자열로 (행 목록, 바이트 수 목록) yield"""
+    yield assemble([
+        [gather(vocab_table(history['codes'], format_value), np.arange(len(history['codes'])))],
+        number_parts(history['close'][-1] * 100, 2),
+    ], LAYOUTS[output_format])
+
+
+def write_history(path, history, output_format='sql', max_bytes=DEFAULT_MAX_BYTES, commit_every=None):
+    """시세 이력과 현재가를 INSERT 파일(또는 TSV 디렉터리)로 기록하고 테이블별 행 수 반환"""
+    if output_format == 'sql':
+        writer = SqlWriter(path, max_bytes=max_bytes, commit_every=commit_every)
+    else:
+        writer = WRITERS[output_format](path)
+    dates = history['dates']
+    with writer as sql:
+        sql.write(f"""-- 종목 일별 시세 (price_history.py)
+-- 종목 {len(history['codes']):,}개 × 거래일 {len(dates):,}일 ({date_strings(dates[:1])[0]} ~ {date_strings(dates[-1:])[0]})
+USE kpsdb;
+
+""")
+        if output_format == 'sql':
+            sql.write("DELETE FROM stock_price_history;\nDELETE FROM stock_current_price;\n\n")
+        return {
+            'stock_price_history': write_lines(sql, 'stock_price_history', HISTORY_COLUMNS,
+                                               history_lines(history, writer.format_value, output_format)),
+            'stock_current_price': write_lines(sql, 'stock_current_price', CURRENT_COLUMNS,
+                                               current_lines(history, writer.format_value, output_format)),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='상관관계가 있는 종목 일별 시세 생성 (GBM + 업종 충격 + KRX 호가/가격제한폭)')
+    parser.add_argument('--stocks', type=int, default=len(stock_codes()), help='종목 수')
+    parser.add_argument('--years', type=float, default=10, help='기간 (년, 연 250 거래일)')
+    parser.add_argument('--end', default='20241231', help='마지막 거래일 (YYYYMMDD)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--output', default=None, help='출력 파일 (tsv 형식이면 디렉터리)')
+    parser.add_argument('--store', default=None, help='같은 시세로 price_store memmap 저장소도 생성할 디렉터리')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = 'insert_price_history.sql' if args.format == 'sql' else 'price_history_tsv'
+
+    print(f"🔄 시세 생성 중... (종목 {args.stocks:,}개, {args.years:g}년, seed={args.seed})")
+    started = time.perf_counter()
+    history = simulate(args.stocks, args.years, args.end, args.seed)
+    simulated = time.perf_counter() - started
+    days = len(history['dates'])
+    print(f"   ✅ 시뮬레이션: {days:,}거래일 × {args.stocks:,}종목 ({simulated:.2f}초)")
+
+    counts = write_history(args.output, history, args.format)
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f"   ✅ {table}: {count:,}건")
+    if args.store:
+        write_history_store(args.store, history, {'seed': args.seed})
+        print(f"   📦 저장소: {args.store}")
+    print(f"📊 총 {sum(counts.values()):,}건, {elapsed:.2f}초")
+    print(f"📁 파일: {args.output}")
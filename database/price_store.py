@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+종목 시세 컬럼형 저장소 (numpy.memmap)
+종가/일간수익률을 (종목, 거래일) float64 행렬 .npy 파일로, 종목코드/거래일 색인을 별도 파일로 저장
+분석 작업마다 SQL/CSV 를 다시 해석하지 않고 파일을 메모리 매핑으로 열어 필요한 종목·기간만 읽음
+
+종목 하나의 시계열이 연속된 영역에 놓이도록 종목 우선(행 = 종목) 순서로 저장하고,
+읽기 전용으로 열기 때문에 여러 작업 프로세스가 같은 파일을 복사 없이 공유 (OS 페이지 캐시 공유)
+PriceStore 객체를 프로세스 풀에 넘기면 경로만 전달되고 각 프로세스에서 다시 매핑됨
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from sql_reader import read_rows
+
+STORE_FORMAT = 1
+
+DEFAULT_STORE = 'price_store'
+
+# 저장소 파일 이름
+CLOSE_FILE = 'close.npy'
+RETURNS_FILE = 'returns.npy'
+CODES_FILE = 'codes.json'
+DATES_FILE = 'dates.npy'
+SECTORS_FILE = 'sectors.json'
+META_FILE = 'meta.json'
+
+# 덤프를 읽을 때 파이썬 리스트에 모았다가 배열로 바꾸는 단위 (행 수)
+LOAD_BATCH = 1000000
+
+
+def cache_directory(store_directory, suffix):
+    """저장소 옆 파생 캐시 디렉터리 (<저장소><suffix>) - 저장소는 재생성 시 통째로 교체되므로 안에 두지 않음"""
+    return os.path.normpath(store_directory) + suffix
+
+
+def codes_hash(codes, *arrays):
+    """종목코드 목록 (+ 종목별 배열) 의 sha256 - 파생 캐시가 같은 종목 구성으로 만들어졌는지 확인용"""
+    digest = hashlib.sha256(json.dumps(list(codes), ensure_ascii=False).encode('utf-8'))
+    for values in arrays:
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def day_hashes(matrix):
+    """거래일별 (종목) 열의 64비트 해시 (거래일) - 파생 캐시가 과거 시세 변경을 감지하는 데 사용"""
+    columns = np.ascontiguousarray(np.asarray(matrix).T)
+    return np.array([int.from_bytes(hashlib.blake2b(column.tobytes(), digest_size=8).digest(), 'little')
+                     for column in columns], dtype=np.uint64)
+
+
+def _to_date(value):
+    """YYYYMMDD 문자열/정수, datetime64, date → datetime64[D]"""
+    if value is None:
+        return None
+    if isinstance(value, (str, int, np.integer)) and len(str(value)) == 8 and str(value).isdigit():
+        text = str(value)
+        return np.datetime64(f"{text[:4]}-{text[4:6]}-{text[6:]}", 'D')
+    return np.datetime64(value, 'D')
+
+
+def write_store(directory, codes, dates, close, start=None, meta=None, sectors=None):
+    """종가 행렬 (거래일, 종목) 로 저장소 생성 (임시 디렉터리에 쓴 뒤 교체)
+
+    start 는 첫 거래일 전일 종가 (없으면 첫날 수익률은 NaN), sectors 는 종목별 업종명 목록 (선택)
+    """
+    close = np.asarray(close)
+    days, stocks = close.shape
+    if len(codes) != stocks or len(dates) != days:
+        raise ValueError(f"종가 행렬 {close.shape} 과 종목 {len(codes)}개 / 거래일 {len(dates)}일이 맞지 않습니다")
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    temp = tempfile.mkdtemp(prefix='.price_store_', dir=parent)
+    try:
+        stored = np.lib.format.open_memmap(os.path.join(temp, CLOSE_FILE), mode='w+', dtype=np.float64,
+                                           shape=(stocks, days))
+        stored[:] = close.T
+        previous = np.empty((stocks, days))
+        previous[:, 0] = np.nan if start is None else start
+        previous[:, 1:] = stored[:, :-1]
+        returns = np.lib.format.open_memmap(os.path.join(temp, RETURNS_FILE), mode='w+', dtype=np.float64,
+                                            shape=(stocks, days))
+        np.divide(stored, previous, out=returns)
+        returns -= 1
+        stored.flush()
+        returns.flush()
+        del stored, returns, previous
+
+        np.save(os.path.join(temp, DATES_FILE), np.asarray(dates, dtype='datetime64[D]'))
+        with open(os.path.join(temp, CODES_FILE), 'w', encoding='utf-8') as f:
+            json.dump(list(codes), f, ensure_ascii=False)
+        if sectors is not None:
+            with open(os.path.join(temp, SECTORS_FILE), 'w', encoding='utf-8') as f:
+                json.dump(list(sectors), f, ensure_ascii=False)
+        with open(os.path.join(temp, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'format': STORE_FORMAT, 'stocks': stocks, 'days': days, **(meta or {})}, f, ensure_ascii=False)
+
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(temp, directory)
+    finally:
+        if os.path.isdir(temp):
+            shutil.rmtree(temp)
+    return PriceStore(directory)
+
+
+def write_history_store(directory, history, meta=None):
+    """price_history.simulate() 결과로 저장소 생성 (업종 포함)"""
+    sectors = [history['sector_names'][sector] for sector in history['sectors'].tolist()]
+    return write_store(directory, history['codes'], history['dates'], history['close'], history['start'], meta,
+                       sectors)
+
+
+def build_from_dump(directory, path, schema=None):
+    """SQL 덤프의 stock_price_history 행으로 저장소 생성 (없는 (종목, 거래일) 은 NaN)"""
+    codes, dates, closes = [], [], []
+    parts = []
+    last_columns = None
+    for table, columns, values in read_rows(path, ['stock_price_history'], schema):
+        if columns is not last_columns:
+            if columns is None or 'close_price' not in columns:
+                raise ValueError(f"{path}: stock_price_history INSERT 에 컬럼 목록(close_price)이 없습니다")
+            code_at = columns.index('stock_code')
+            date_at = columns.index('trading_date')
+            close_at = columns.index('close_price')
+            last_columns = columns
+        codes.append(values[code_at])
+        dates.append(values[date_at])
+        closes.append(float(values[close_at]))
+        if len(codes) >= LOAD_BATCH:
+            parts.append((np.array(codes), np.array(dates), np.array(closes)))
+            codes, dates, closes = [], [], []
+    parts.append((np.array(codes, dtype=str), np.array(dates, dtype=str), np.array(closes, dtype=np.float64)))
+
+    code_values = np.concatenate([part[0] for part in parts])
+    date_values = np.concatenate([part[1] for part in parts])
+    if not len(code_values):
+        raise ValueError(f"{path}: stock_price_history 행이 없습니다")
+    unique_codes, code_index = np.unique(code_values, return_inverse=True)
+    unique_dates, date_index = np.unique(date_values, return_inverse=True)
+    close = np.full((len(unique_dates), len(unique_codes)), np.nan)
+    close[date_index, code_index] = np.concatenate([part[2] for part in parts])
+    return write_store(directory, unique_codes.tolist(), [_to_date(date) for date in unique_dates], close,
+                       meta={'source': os.path.abspath(path)})
+
+
+class PriceStore:
+    """메모리 매핑된 시세 저장소 (읽기 전용)
+
+    사용 예:
+        store = PriceStore('price_store')
+        close = store.close(['000001', '000002'], '20240101', '20241231')   # (종목 2, 거래일) 배열
+        returns = store.returns(start='20240101')                           # 전 종목
+        series = store.series('000001')                                     # 종목 하나 (매핑 그대로, 복사 없음)
+
+    슬라이스는 요청한 종목 행과 기간 열만 읽으며 전체 행렬을 메모리에 올리지 않음
+    """
+
+    def __init__(self, directory=DEFAULT_STORE):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"{directory}: 지원하지 않는 저장소 형식입니다: {self.meta.get('format')}")
+        with open(os.path.join(directory, CODES_FILE), 'r', encoding='utf-8') as f:
+            self.codes = json.load(f)
+        self.sectors = None
+        if os.path.exists(os.path.join(directory, SECTORS_FILE)):
+            with open(os.path.join(directory, SECTORS_FILE), 'r', encoding='utf-8') as f:
+                self.sectors = json.load(f)
+        self.dates = np.load(os.path.join(directory, DATES_FILE))
+        self._index = {code: i for i, code in enumerate(self.codes)}
+        self._close = np.load(os.path.join(directory, CLOSE_FILE), mmap_mode='r')
+        self._returns = np.load(os.path.join(directory, RETURNS_FILE), mmap_mode='r')
+
+    def __getstate__(self):
+        # 프로세스 간 전달 시 배열 대신 경로만 넘기고 받는 쪽에서 다시 매핑
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'])
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        """(종목 수, 거래일 수)"""
+        return self._close.shape
+
+    def stock_index(self, codes):
+        """종목코드 목록 → 행 번호 배열 (없는 종목은 KeyError)"""
+        try:
+            return np.array([self._index[code] for code in codes], dtype=np.intp)
+        except KeyError as e:
+            raise KeyError(f"저장소에 없는 종목코드입니다: {e.args[0]}") from None
+
+    def date_range(self, start=None, end=None):
+        """[start, end] 거래일에 해당하는 열 구간 (slice)"""
+        first = 0 if start is None else int(np.searchsorted(self.dates, _to_date(start), side='left'))
+        last = len(self.dates) if end is None else int(np.searchsorted(self.dates, _to_date(end), side='right'))
+        return slice(first, max(first, last))
+
+    def _select(self, matrix, codes, start, end):
+        columns = self.date_range(start, end)
+        if codes is None:
+            return np.array(matrix[:, columns])
+        return matrix[self.stock_index(codes), columns]
+
+    def close(self, codes=None, start=None, end=None):
+        """종가 (종목, 거래일) 배열 - codes 순서대로, 기간은 양 끝 포함"""
+        return self._select(self._close, codes, start, end)
+
+    def returns(self, codes=None, start=None, end=None):
+        """일간 수익률 (종목, 거래일) 배열 (첫 거래일은 전일 종가 기준, 모르면 NaN)"""
+        return self._select(self._returns, codes, start, end)
+
+    def series(self, code, start=None, end=None, kind='close'):
+        """종목 하나의 시계열 (메모리 매핑 뷰, 복사 없음)"""
+        matrix = self._close if kind == 'close' else self._returns
+        return matrix[self.stock_index([code])[0], self.date_range(start, end)]
+
+    def date_strings(self, start=None, end=None):
+        """기간의 거래일 YYYYMMDD 문자열 목록"""
+        return [text.replace('-', '') for text in np.datetime_as_string(self.dates[self.date_range(start, end)])]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='종목 시세 memmap 저장소 생성/조회')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='저장소 디렉터리')
+    parser.add_argument('--from-dump', metavar='SQL', help='stock_price_history INSERT 덤프로 저장소 생성')
+    parser.add_argument('--simulate', action='store_true', help='price_history 시뮬레이터로 바로 저장소 생성')
+    parser.add_argument('--stocks', type=int, default=2500, help='--simulate 종목 수')
+    parser.add_argument('--years', type=float, default=10, help='--simulate 기간 (년)')
+    parser.add_argument('--seed', type=int, default=42, help='--simulate 난수 seed')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.from_dump:
+        print(f"🔄 {args.from_dump} 에서 저장소 생성 중...")
+        store = build_from_dump(args.store, args.from_dump)
+    elif args.simulate:
+        from price_history import simulate
+
+        print(f"🔄 시세 시뮬레이션으로 저장소 생성 중... (종목 {args.stocks:,}개, {args.years:g}년, seed={args.seed})")
+        store = write_history_store(args.store, simulate(args.stocks, args.years, seed=args.seed),
+                                    {'seed': args.seed})
+    else:
+        store = PriceStore(args.store)
+    elapsed = time.perf_counter() - started
+
+    stocks, days = store.shape
+    dates = store.date_strings()
+    print(f"📦 {args.store}: 종목 {stocks:,}개 × 거래일 {days:,}일 ({dates[0]} ~ {dates[-1]}, {elapsed:.2f}초)")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+회전율 최소화 리밸런싱 주문 생성
+보유 수량, 현재가, 목표 비중(customer_balance.rebalancing_target_weight), 주문가능금액으로
+허용편차(allowed_deviation) 안에 들어오는 정수 수량 매수/매도 주문을 만들어 trading_history 형식으로 출력
+
+회전율을 줄이기 위해 목표 비중까지 되돌리지 않고 허용 범위 밖 종목만 범위 경계까지 매매
+    1. 상단을 넘은 종목은 상단 이하가 되는 최소 수량 매도
+    2. 하단에 못 미친 종목은 하단 이상이 되는 최소 수량 매수
+    3. 매도 대금 + 주문가능금액으로 매수 대금이 모자라면 목표보다 비중이 큰 종목부터 하단까지 추가 매도
+    4. 그래도 모자라면 (호가·수량 단위 반올림 몇 주) 비중 부족이 작은 종목부터 매수 수량을 줄임
+비중 기준 평가금액은 주문 전 보유 평가금액이고, 주문가능금액은 customer_deposit.available_amount (없으면 deposit_amount)
+
+drift_scanner 와 같은 계좌별 평탄 배열을 그대로 쓰므로 계좌별 루프 없이 전 계좌 주문을 한 번에 계산
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from cost_basis import grouped_cumsum
+from dataset_spec import parse_schema, write_lines
+from drift_scanner import build_book, joined, load_dump, load_tsv, lookup
+from reference_data import TRADE_COLUMNS
+from sql_reader import read_rows
+from tsv_reader import read_columns, table_columns
+from tsv_writer import WRITERS
+from vector_backend import LAYOUTS, assemble, gather, number_parts, vocab_table
+
+# 매매 수량 단위 (KRX 주식은 1주)
+ROUND_LOT = 1
+
+# 주문가능금액 컬럼 (앞쪽 우선)
+CASH_COLUMNS = ['available_amount', 'deposit_amount']
+
+# 주문/체결번호: 접두어 + 계좌 안 주문 순번 7자리 (매도 먼저)
+ORDER_FORMAT = 'RBO{:07d}'
+EXECUTION_FORMAT = 'RBE{:07d}'
+
+BUY_CODE = '1'
+SELL_CODE = '2'
+
+def load_cash_tsv(directory, schema=None):
+    """customer_deposit.tsv 의 (계좌번호 배열, 주문가능금액 원×100 배열)"""
+    columns = table_columns(directory, 'customer_deposit', schema=schema)
+    column = next(name for name in CASH_COLUMNS if name in columns)
+    values = read_columns(os.path.join(directory, 'customer_deposit.tsv'), columns,
+                          {'account_number': 'text', column: 2})
+    return values['account_number'], values[column]
+
+
+def load_cash_dump(path, schema=None):
+    """덤프의 customer_deposit 에서 (계좌번호 배열, 주문가능금액 원×100 배열)"""
+    schema = parse_schema() if schema is None else schema
+    accounts, cash = [], []
+    for _, columns, values in read_rows(path, ['customer_deposit'], schema):
+        record = dict(zip(columns, values))
+        amount = next((record[name] for name in CASH_COLUMNS if record.get(name) is not None), 0)
+        accounts.append(str(record['account_number']).encode('utf-8'))
+        cash.append(int(round(amount * 100)))
+    return np.array(accounts, dtype=bytes), np.array(cash, dtype=np.int64)
+
+
+def _ceil_lots(shares, lot):
+    """shares 이상이 되는 lot 배수"""
+    return -(-shares // lot) * lot
+
+
+def _fund_buys(group, quantity, price, lot, sell, buy, need_min, active, target, weight, deficit):
+    """매수 대금 부족 계좌의 보유 행에서 (추가 매도 수량, 매수 감소 수량) 계산 - plan_orders() 3, 4 단계"""
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    local = np.cumsum(np.r_[True, group[1:] != group[:-1]]) - 1
+    rows = len(group)
+
+    # 목표 대비 초과 비중 큰 종목부터 하단까지 추가 매도
+    capacity = np.where(active & (buy == 0), np.maximum(quantity - sell - need_min, 0), 0)
+    capacity -= capacity % lot
+    order = np.lexsort((target - weight, local))
+    available = (capacity * price)[order]
+    used = grouped_cumsum(available, starts, local[order]) - available
+    take = np.clip(deficit[group[order]] - used, 0, available)
+    extra = np.zeros(rows, dtype=np.int64)
+    extra[order] = np.minimum(_ceil_lots(-(-take // np.maximum(price[order], 1)), lot[order]), capacity[order])
+
+    # 그래도 모자라면 비중 부족이 작은 종목부터 매수 수량을 줄임
+    remaining = deficit[group[starts]] - np.add.reduceat(extra * price, starts)
+    order = np.lexsort((np.where(buy > 0, target - weight, np.inf), local))
+    spend = (buy * price)[order]
+    used = grouped_cumsum(spend, starts, local[order]) - spend
+    cut = np.clip(remaining[local[order]] - used, 0, spend)
+    reduce = np.zeros(rows, dtype=np.int64)
+    reduce[order] = np.minimum(_ceil_lots(-(-cut // np.maximum(price[order], 1)), lot[order]), buy[order])
+    return extra, reduce
+
+
+def plan_orders(book, cash, lot=ROUND_LOT, include_disabled=False):
+    """전 계좌 리밸런싱 주문 수량 계산
+
+    book - drift_scanner.build_book() 결과, cash - 계좌별 주문가능금액 (원×100)
+    rebalancing_yn='N' 계좌는 include_disabled 가 아니면 주문하지 않음
+    반환 dict:
+        delta      - 보유 행별 주문 수량 (+ 매수, - 매도)
+        cash_after - 계좌별 주문 후 주문가능금액
+        turnover   - 계좌별 편도 회전율 (매매대금 / 2 / 평가금액)
+        full_turnover - 목표 비중까지 그대로 되돌렸을 때의 편도 회전율 (비교용)
+        outside    - 주문 후에도 허용 범위 밖인 보유 행 (현금 부족, 한 주 가격이 범위보다 큰 경우)
+    """
+    offsets = book['offsets']
+    rows = len(book['value'])
+    accounts = len(offsets)
+    group = np.repeat(np.arange(accounts), np.diff(np.r_[offsets, rows]))
+    quantity = book['quantity']
+    price = book['price']
+    lot = np.broadcast_to(np.asarray(lot, dtype=np.int64), quantity.shape)
+    priced = price > 0
+    safe_price = np.maximum(price, 1)
+
+    def per_account(values):
+        return np.add.reduceat(values, offsets) if rows else np.zeros(accounts, dtype=values.dtype)
+
+    total = per_account(book['value'])
+    target_total = per_account(book['target'])
+    target = book['target'] / np.maximum(target_total, 1)[group]
+    band = (book['deviation'] / 10000)[group]
+    active = ((target_total > 0) & (total > 0) & (book['enabled'] | include_disabled))[group] & priced
+    base = total[group].astype(np.float64)
+
+    # 허용 범위 [하단, 상단] 안에 드는 수량 구간 (원×100 / 원×100 → 주)
+    keep_max = np.floor((target + band) * base / safe_price).astype(np.int64)
+    need_min = np.ceil(np.maximum(target - band, 0) * base / safe_price).astype(np.int64)
+    nearest = np.rint(target * base / safe_price).astype(np.int64)
+    upper, lower = keep_max, need_min
+    narrow = need_min > keep_max                           # 한 주 가격이 범위보다 커서 범위 안 수량이 없음
+    keep_max = np.where(narrow, nearest, keep_max)
+    need_min = np.where(narrow, nearest, need_min)
+
+    sell = np.where(active, np.minimum(_ceil_lots(np.maximum(quantity - keep_max, 0), lot), quantity), 0)
+    buy = np.where(active, _ceil_lots(np.maximum(need_min - quantity, 0), lot), 0)
+
+    # 매수 대금이 매도 대금 + 주문가능금액보다 큰 계좌만 3, 4 단계 (보유 행이 계좌별로 모여 있으므로 부분 배열도 계좌 순)
+    deficit = per_account(buy * price) - per_account(sell * price) - cash
+    short = np.flatnonzero((deficit > 0)[group])
+    if len(short):
+        extra, reduce = _fund_buys(group[short], quantity[short], price[short], lot[short], sell[short], buy[short],
+                                   need_min[short], active[short], target[short],
+                                   (book['value'] / np.maximum(total, 1)[group])[short], deficit)
+        sell[short] += extra
+        buy[short] -= reduce
+
+    delta = buy - sell
+    traded = per_account(np.abs(delta) * price)
+    final = quantity + delta
+    full = np.where(active, np.abs(np.floor(target * base / safe_price) - quantity) * price, 0)
+    return {
+        'delta': delta,
+        'cash_after': cash - per_account(delta * price),
+        'turnover': traded / 2 / np.maximum(total, 1),
+        'full_turnover': per_account(full) / 2 / np.maximum(total, 1),
+        'outside': np.flatnonzero(active & ((final > upper) | (final < lower))),
+    }
+
+
+def order_lines(book, plan, trading_date, format_value, output_format='sql', batch=1000000):
+    """주문을 trading_history 행 문자열로 (계좌 순, 계좌 안에서 매도 먼저) batch 행씩 (행 목록, 바이트 수 목록) yield"""
+    delta = plan['delta']
+    rows = np.flatnonzero(delta)
+    group = np.searchsorted(book['offsets'], rows, side='right') - 1
+    rows = rows[np.lexsort((delta[rows] > 0, group))]
+    group = np.searchsorted(book['offsets'], rows, side='right') - 1
+    first = np.r_[True, group[1:] != group[:-1]] if len(rows) else np.zeros(0, bool)
+    sequence = np.arange(len(rows)) - np.maximum.accumulate(np.where(first, np.arange(len(rows)), 0)) + 1
+
+    layout = LAYOUTS[output_format]
+    account_index, account_rows = np.unique(group, return_inverse=True)
+    accounts = vocab_table([code.decode('utf-8') for code in book['accounts'][account_index].tolist()], format_value)
+    stock_codes, stock_rows = np.unique(book['stock'][rows], return_inverse=True)
+    stocks = vocab_table([code.decode('utf-8') for code in stock_codes.tolist()], format_value)
+    date = vocab_table([trading_date], format_value)
+    sides = vocab_table([SELL_CODE, BUY_CODE], format_value)
+    width = max(int(sequence.max(initial=1)), 1)
+    orders = vocab_table([ORDER_FORMAT.format(i) for i in range(width + 1)], format_value)
+    executions = vocab_table([EXECUTION_FORMAT.format(i) for i in range(width + 1)], format_value)
+    for start in range(0, len(rows), batch):
+        part = rows[start:start + batch]
+        count = len(part)
+        yield assemble([
+            [gather(accounts, account_rows[start:start + batch])],
+            [gather(date, np.zeros(count, dtype=np.intp))],
+            [gather(orders, sequence[start:start + batch])],
+            [gather(executions, sequence[start:start + batch])],
+            [gather(stocks, stock_rows[start:start + batch])],
+            [gather(sides, (delta[part] > 0).astype(np.intp))],
+            number_parts(np.abs(delta[part])),
+            number_parts(np.abs(delta[part]) * book['price'][part], 2),
+        ], layout)
+
+
+def write_orders(path, book, plan, trading_date, output_format='sql'):
+    """주문을 INSERT 파일(또는 TSV 디렉터리)로 기록하고 행 수 반환"""
+    writer = WRITERS[output_format](path)
+    with writer as sql:
+        sql.write(f"-- 리밸런싱 주문 (rebalancing_orders.py)\n-- 주문일 {trading_date}\nUSE kpsdb;\n\n")
+        return write_lines(sql, 'trading_history', TRADE_COLUMNS,
+                           order_lines(book, plan, trading_date, writer.format_value, output_format))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='허용편차를 벗어난 계좌의 회전율 최소 리밸런싱 주문 생성')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tsv', metavar='DIR', help='customer_balance/stock_current_price/customer_strategy/'
+                                                      'customer_deposit TSV 디렉터리')
+    source.add_argument('--dump', metavar='SQL', help='INSERT 덤프 파일')
+    parser.add_argument('--date', default=datetime.now().strftime('%Y%m%d'), help='주문일 (YYYYMMDD)')
+    parser.add_argument('--lot', type=int, default=ROUND_LOT, help='매매 수량 단위 (주)')
+    parser.add_argument('--all', action='store_true', help="rebalancing_yn='N' 계좌도 주문 생성")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--output', default=None, help='출력 파일 (tsv 형식이면 디렉터리)')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = 'insert_rebalancing_orders.sql' if args.format == 'sql' else 'rebalancing_orders_tsv'
+
+    started = time.perf_counter()
+    if args.tsv:
+        book = build_book(load_tsv(args.tsv))
+        cash_accounts, cash_amounts = load_cash_tsv(args.tsv)
+    else:
+        book = build_book(load_dump(args.dump))
+        cash_accounts, cash_amounts = load_cash_dump(args.dump)
+    cash = joined(cash_amounts, lookup(cash_accounts, book['accounts']))
+    loaded = time.perf_counter()
+
+    plan = plan_orders(book, cash, args.lot, args.all)
+    planned = time.perf_counter()
+    count = write_orders(args.output, book, plan, args.date, args.format)
+    finished = time.perf_counter()
+
+    delta = plan['delta']
+    ordered = np.add.reduceat(delta != 0, book['offsets']) > 0 if len(delta) else np.zeros(0, bool)
+    print(f"📥 로드: 계좌 {len(book['accounts']):,}개, 보유 {len(delta):,}건 ({loaded - started:.2f}초)")
+    print(f"🧮 주문 계산: 주문 계좌 {int(ordered.sum()):,}개, 매도 {int((delta < 0).sum()):,}건, "
+          f"매수 {int((delta > 0).sum()):,}건 ({planned - loaded:.2f}초)")
+    if ordered.any():
+        print(f"   회전율 평균 {plan['turnover'][ordered].mean() * 100:.2f}% "
+              f"(목표 비중까지 되돌리면 {plan['full_turnover'][ordered].mean() * 100:.2f}%)")
+    if len(plan['outside']):
+        print(f"⚠️  주문 후에도 허용 범위 밖 보유 {len(plan['outside']):,}건 (주문가능금액 부족 또는 한 주 가격이 범위보다 큼)")
+    print(f"📁 파일: {args.output} ({count:,}건, {finished - planned:.2f}초)")
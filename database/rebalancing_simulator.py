@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+계좌 단위 리밸런싱 시뮬레이터
+customer_strategy 에서 rebalancing_yn='Y' 인 계좌를 시세 저장소(price_store)의 일별 종가로 운용하면서
+rebalancing_cycle(일) 주기가 돌아오거나 종목 비중이 목표 비중에서 allowed_deviation(%p) 넘게 벗어나면
+목표 비중으로 되돌리는 매매를 만들어 trading_history 형식으로 출력
+
+계좌 묶음(청크)마다 (계좌, 보유 종목) 배열로 모든 계좌의 비중 이탈/주기 도래를 하루 단위로 한꺼번에 검사하고,
+청크는 프로세스 풀에서 병렬로 처리해 10만 계좌 규모의 리밸런싱 주문 폭주를 재현
+목표 비중은 customer_balance.rebalancing_target_weight (있으면), 없으면 시작일의 평가금액 비중
+매매는 정수 수량으로 하고 (수수료 없음) 수량을 맞추고 남는 금액은 다음 리밸런싱에 다시 씀
+예수금(customer_deposit)은 리밸런싱 대상이 아니므로 사용하지 않음
+주기는 계좌별 마지막 설정 변경일(customer_strategy.updated_at)부터 세어 계좌마다 리밸런싱일이 흩어짐
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset_spec import (DEFAULT_SPEC, MERGE_BATCH, account_numbers, parse_schema, read_shard_lines,
+                          shard_ranges, write_lines)
+from price_store import DEFAULT_STORE, PriceStore
+from reference_data import HOLDING_QUANTITIES, TRADE_COLUMNS
+from sql_reader import read_rows
+from tsv_writer import WRITERS
+from vector_backend import LAYOUTS, assemble, gather, number_parts, sample_positions, vocab_table
+
+# 병렬 작업 하나가 맡는 계좌 수
+CHUNK_ACCOUNTS = 10000
+
+# 주문/체결번호: 접두어 + 거래일 순번 4자리 + 보유 종목 순번 3자리 (계좌·일자 안에서 유일)
+ORDER_FORMAT = 'RBO{:04d}{:03d}'
+EXECUTION_FORMAT = 'RBE{:04d}{:03d}'
+
+BUY_CODE = '1'
+SELL_CODE = '2'
+
+# 시뮬레이션 종료 후 출력하는 주문 폭주 상위 거래일 수
+TOP_BURSTS = 5
+
+def price_matrix(store, start=None, end=None):
+    """기간 종가를 (거래일, 종목) 원×100 정수 행렬로 (빈 값은 직전 종가, 첫 종가 전은 0)"""
+    close = store.close(start=start, end=end).T
+    present = ~np.isnan(close)
+    last = np.maximum.accumulate(np.where(present, np.arange(len(close))[:, None], 0), axis=0)
+    filled = close[last, np.arange(close.shape[1])]
+    return np.rint(np.nan_to_num(filled) * 100).astype(np.int64)
+
+
+def make_book(accounts, stock, quantity, cycle, deviation, anchor=None, target=None):
+    """계좌별 입력 → 시뮬레이션 입력 dict
+
+    stock/quantity/target 은 (계좌, 보유 종목) 배열 (보유 종목 수가 모자라는 칸은 수량 0, 목표 0)
+    anchor 는 주기 기준일 (datetime64[D], 생략하면 시작일), target 을 생략하면 시작일 평가금액 비중을 목표로 씀
+    """
+    return {
+        'accounts': list(accounts),
+        'stock': np.asarray(stock, dtype=np.int64),
+        'quantity': np.asarray(quantity, dtype=np.int64),
+        'target': None if target is None else np.asarray(target, dtype=np.float64),
+        'cycle': np.asarray(cycle, dtype=np.int64),
+        'deviation': np.asarray(deviation, dtype=np.float64),
+        'anchor': None if anchor is None else np.asarray(anchor, dtype='datetime64[D]'),
+    }
+
+
+def slice_book(book, start, stop):
+    return {name: (value[start:stop] if value is not None else None) for name, value in book.items()}
+
+
+def sort_book(book):
+    """계좌번호 순으로 정렬한 book (청크를 차례로 이어 붙인 출력이 계좌번호 순이 되도록)"""
+    order = sorted(range(len(book['accounts'])), key=book['accounts'].__getitem__)
+    if order == list(range(len(order))):
+        return book
+    return {name: (None if value is None else [value[row] for row in order] if name == 'accounts' else value[order])
+            for name, value in book.items()}
+
+
+def synthetic_book(count, store, seed=42, spec=DEFAULT_SPEC):
+    """스트레스 테스트용 계좌 count 개 (dataset_spec 기본 스펙과 같은 분포, 전부 rebalancing_yn='Y')
+
+    주기 기준일은 최근 1년 안에서 임의로 흩어 놓음
+    """
+    rng = np.random.default_rng(seed)
+    tables = spec['tables']
+    holdings = min(tables['customer_balance']['rows'], len(store))
+    _, cycles = tables['customer_strategy']['columns']['rebalancing_cycle']
+    _, deviation_low, deviation_high, digits = tables['customer_strategy']['columns']['allowed_deviation']
+    quantities = np.resize(np.array(HOLDING_QUANTITIES), holdings)
+    accounts = account_numbers(dict(spec, accounts=count), 1)
+    return make_book(
+        accounts,
+        sample_positions(rng, count, len(store), holdings),
+        np.broadcast_to(quantities, (count, holdings)),
+        rng.choice(cycles, count),
+        np.round(rng.uniform(deviation_low, deviation_high, count), digits),
+        store.dates[-1] - rng.integers(0, 365, count),
+    )
+
+
+def load_book(path, store, schema=None):
+    """덤프의 customer_strategy / customer_balance 로 rebalancing_yn='Y' 계좌 입력 만들기
+
+    저장소에 없는 종목은 제외, customer_balance 에 rebalancing_target_weight 컬럼이 있으면 목표 비중으로 사용
+    """
+    schema = parse_schema() if schema is None else schema
+    strategies = {}
+    balances = {}
+    missing = set()
+    for table, columns, values in read_rows(path, ['customer_strategy', 'customer_balance'], schema):
+        record = dict(zip(columns, values))
+        account = record['account_number']
+        if table == 'customer_strategy':
+            if record['rebalancing_yn'] == 'Y':
+                changed = record.get('updated_at')
+                strategies[account] = (int(record['rebalancing_cycle']), float(record['allowed_deviation']),
+                                       np.datetime64(str(changed)[:10], 'D') if changed else None)
+        elif record['stock_code'] in store._index:
+            weight = record.get('rebalancing_target_weight')
+            balances.setdefault(account, []).append((store._index[record['stock_code']], int(record['quantity']),
+                                                     None if weight is None else float(weight)))
+        else:
+            missing.add(record['stock_code'])
+
+    accounts = [account for account in strategies if account in balances]
+    width = max((len(balances[account]) for account in accounts), default=1)
+    stock = np.zeros((len(accounts), width), dtype=np.int64)
+    quantity = np.zeros((len(accounts), width), dtype=np.int64)
+    target = np.zeros((len(accounts), width))
+    has_target = False
+    for row, account in enumerate(accounts):
+        for slot, (index, count, weight) in enumerate(balances[account]):
+            stock[row, slot] = index
+            quantity[row, slot] = count
+            if weight is not None:
+                target[row, slot] = weight
+                has_target = True
+    book = make_book(accounts, stock, quantity, [strategies[account][0] for account in accounts],
+                     [strategies[account][1] for account in accounts],
+                     [strategies[account][2] or 'NaT' for account in accounts], target if has_target else None)
+    return book, sorted(missing)
+
+
+def simulate(book, prices, dates):
+    """계좌 묶음을 기간 동안 운용하며 리밸런싱 매매 생성
+
+    prices - price_matrix() 결과 (거래일, 종목), dates - 거래일 datetime64[D] 배열
+    반환: (매매 dict {'account','day','slot','stock','buy','quantity','amount'}, 통계 dict)
+    """
+    stock = book['stock']
+    quantity = book['quantity'].copy()
+    accounts, width = stock.shape
+    cash = np.zeros(accounts, dtype=np.int64)
+    target = book['target']
+    if target is None or not target.any():
+        # 목표 비중이 없으면 시작일 평가금액 비중 유지
+        target = (quantity * prices[0][stock]).astype(np.float64)
+    totals = target.sum(axis=1, keepdims=True)
+    target = np.divide(target, totals, out=np.zeros_like(target), where=totals > 0)
+    deviation = book['deviation'] / 100
+    cycle = book['cycle']
+    day_numbers = dates.astype('datetime64[D]').astype(np.int64)
+    # 마지막 리밸런싱일 = 시작일 이전 가장 최근의 (기준일 + 주기 배수)
+    last = np.full(accounts, day_numbers[0])
+    if book['anchor'] is not None:
+        anchor = book['anchor'].astype(np.int64)
+        known = (cycle > 0) & ~np.isnat(book['anchor'])
+        last[known] = day_numbers[0] - (day_numbers[0] - anchor[known]) % cycle[known]
+
+    trades = {name: [] for name in ('account', 'day', 'slot', 'stock', 'buy', 'quantity', 'amount')}
+    stats = {'cycle': np.zeros(len(dates), dtype=np.int64), 'band': np.zeros(len(dates), dtype=np.int64),
+             'trades': np.zeros(len(dates), dtype=np.int64)}
+    for day in range(len(dates)):
+        price = prices[day][stock]
+        value = quantity * price
+        total = value.sum(axis=1) + cash
+        weight = value / np.maximum(total, 1)[:, None]
+
+        due = (cycle > 0) & (day_numbers[day] - last >= cycle)
+        breach = (np.abs(weight - target).max(axis=1) > deviation) & (total > 0)
+        rows = np.flatnonzero(due | breach)
+        stats['cycle'][day] = np.count_nonzero(due)
+        stats['band'][day] = np.count_nonzero(breach & ~due)
+        if not len(rows):
+            continue
+
+        row_price = price[rows]
+        wanted = np.floor(target[rows] * total[rows, None] / np.maximum(row_price, 1)).astype(np.int64)
+        wanted[row_price <= 0] = quantity[rows][row_price <= 0]   # 가격이 없는 종목은 그대로 보유
+        delta = wanted - quantity[rows]
+        quantity[rows] = wanted
+        cash[rows] -= (delta * row_price).sum(axis=1)
+        last[rows] = day_numbers[day]
+
+        local, slot = np.nonzero(delta)
+        change = delta[local, slot]
+        trades['account'].append(rows[local])
+        trades['day'].append(np.full(len(local), day))
+        trades['slot'].append(slot)
+        trades['stock'].append(stock[rows[local], slot])
+        trades['buy'].append(change > 0)
+        trades['quantity'].append(np.abs(change))
+        trades['amount'].append(np.abs(change) * row_price[local, slot])
+        stats['trades'][day] = len(local)
+
+    trades = {name: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+              for name, parts in trades.items()}
+    # 거래일 순으로 쌓인 매매를 (계좌, 거래일, 주문번호) 순으로 - 주문번호는 거래일 안에서 보유 종목 순번 순
+    order = np.lexsort((trades['slot'], trades['day'], trades['account']))
+    trades = {name: value[order] for name, value in trades.items()}
+    stats['quantity'] = quantity
+    stats['cash'] = cash
+    return trades, stats
+
+
+def trade_lines(trades, accounts, codes, dates, width, format_value, output_format='sql', batch=MERGE_BATCH):
+    """simulate() 매매를 trading_history 행 문자열로 batch 행씩 (행 목록, 바이트 수 목록) yield"""
+    layout = LAYOUTS[output_format]
+    account_table = vocab_table(accounts, format_value)
+    date_table = vocab_table([text.replace('-', '') for text in np.datetime_as_string(dates, unit='D')], format_value)
+    orders = vocab_table([ORDER_FORMAT.format(day, slot) for day in range(len(dates)) for slot in range(width)],
+                         format_value)
+    executions = vocab_table([EXECUTION_FORMAT.format(day, slot) for day in range(len(dates))
+                              for slot in range(width)], format_value)
+    code_table = vocab_table(codes, format_value)
+    sides = vocab_table([SELL_CODE, BUY_CODE], format_value)
+    for first in range(0, len(trades['account']), batch):
+        part = {name: value[first:first + batch] for name, value in trades.items()}
+        order = part['day'] * width + part['slot']
+        yield assemble([
+            [gather(account_table, part['account'])],
+            [gather(date_table, part['day'])],
+            [gather(orders, order)],
+            [gather(executions, order)],
+            [gather(code_table, part['stock'])],
+            [gather(sides, part['buy'].astype(np.intp))],
+            number_parts(part['quantity']),
+            number_parts(part['amount'], 2),
+        ], layout)
+
+
+def simulate_chunk(store, book, start, end, path, output_format='sql'):
+    """계좌 묶음 하나를 운용하고 매매 행을 path 에 한 줄씩 기록 (프로세스 풀 작업 단위), 일별 통계 반환"""
+    dates = store.dates[store.date_range(start, end)]
+    trades, stats = simulate(book, price_matrix(store, start, end), dates)
+    format_value = WRITERS[output_format].format_value
+    with open(path, 'w', encoding='utf-8') as f:
+        for lines, _ in trade_lines(trades, book['accounts'], store.codes, dates, book['stock'].shape[1],
+                                    format_value, output_format):
+            if lines:
+                f.write('\n'.join(lines))
+                f.write('\n')
+    return {name: stats[name] for name in ('cycle', 'band', 'trades')}
+
+
+def run(book, store, path, start=None, end=None, workers=1, chunk=CHUNK_ACCOUNTS, output_format='sql'):
+    """전체 계좌를 chunk 개씩 나눠 (workers > 1 이면 병렬로) 운용하고 매매내역 파일 생성, 일별 합계 통계 반환
+
+    매매내역은 (account_number, trading_date, order_number) 순이라 chunk / workers 와 관계없이 같은 파일
+    """
+    book = sort_book(book)
+    count = len(book['accounts'])
+    ranges = shard_ranges(count, -(-count // chunk)) if count else []
+    totals = None
+    with tempfile.TemporaryDirectory(prefix='rebalancing_shards_') as directory:
+        jobs = [(store, slice_book(book, first, last), start, end,
+                 os.path.join(directory, f"trading_history.{first:08d}.rows"), output_format)
+                for first, last in ranges]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [future.result() for future in [pool.submit(simulate_chunk, *job) for job in jobs]]
+        else:
+            results = [simulate_chunk(*job) for job in jobs]
+        for stats in results:
+            totals = stats if totals is None else {name: totals[name] + stats[name] for name in totals}
+
+        with WRITERS[output_format](path) as sql:
+            sql.write(f"-- 리밸런싱 시뮬레이션 매매내역 (rebalancing_simulator.py)\n-- 계좌 {count:,}개\nUSE kpsdb;\n\n")
+            write_lines(sql, 'trading_history', TRADE_COLUMNS, read_shard_lines([job[4] for job in jobs]))
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='customer_strategy 설정대로 계좌 리밸런싱을 시뮬레이션해 매매내역 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--dump', help='customer_strategy/customer_balance/customer_deposit 가 들어 있는 SQL 덤프')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='덤프 대신 기본 스펙 분포의 계좌 N 개로 실행')
+    parser.add_argument('--seed', type=int, default=42, help='--synthetic 난수 seed')
+    parser.add_argument('--start', help='시작 거래일 (YYYYMMDD, 기본: 저장소 마지막 1년)')
+    parser.add_argument('--end', help='마지막 거래일 (YYYYMMDD)')
+    parser.add_argument('--workers', type=int, default=1, help=f'병렬 작업 프로세스 수 (CPU {os.cpu_count()}개)')
+    parser.add_argument('--chunk', type=int, default=CHUNK_ACCOUNTS, help='작업 하나가 맡는 계좌 수')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='sql', help='출력 형식')
+    parser.add_argument('--output', default=None, help='출력 파일 (tsv 형식이면 디렉터리)')
+    args = parser.parse_args()
+    if args.dump is None and args.synthetic is None:
+        parser.error('--dump 또는 --synthetic 중 하나를 지정해야 합니다')
+    if args.output is None:
+        args.output = 'insert_rebalancing_trades.sql' if args.format == 'sql' else 'rebalancing_trades_tsv'
+
+    store = PriceStore(args.store)
+    if args.start is None:
+        args.start = store.date_strings()[max(0, store.shape[1] - 250)]
+    if args.synthetic is not None:
+        book = synthetic_book(args.synthetic, store, args.seed)
+    else:
+        book, missing = load_book(args.dump, store)
+        if missing:
+            print(f"⚠️  저장소에 없는 종목 {len(missing)}개는 제외: {', '.join(missing[:10])}")
+    dates = store.date_strings(args.start, args.end)
+    print(f"🔄 리밸런싱 시뮬레이션 중... (계좌 {len(book['accounts']):,}개, {dates[0]} ~ {dates[-1]}, "
+          f"작업자 {args.workers}개)")
+
+    started = time.perf_counter()
+    stats = run(book, store, args.output, args.start, args.end, args.workers, args.chunk, args.format)
+    elapsed = time.perf_counter() - started
+    if stats is None:
+        print("⚠️  리밸런싱 대상 계좌가 없습니다")
+    else:
+        total = int(stats['trades'].sum())
+        print(f"   ✅ 리밸런싱 {int(stats['cycle'].sum()):,}회 (주기 도래) + {int(stats['band'].sum()):,}회 (허용편차 초과), "
+              f"매매 {total:,}건 ({elapsed:.2f}초)")
+        print("📈 주문 폭주 상위 거래일:")
+        for day in np.argsort(-stats['trades'], kind='stable')[:TOP_BURSTS].tolist():
+            print(f"   {dates[day]}: 매매 {int(stats['trades'][day]):,}건 "
+                  f"(주기 {int(stats['cycle'][day]):,}계좌, 편차 {int(stats['band'][day]):,}계좌)")
+    print(f"📁 파일: {args.output}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mock 데이터 공용 기준 데이터
+생성 스크립트마다 중복되던 계좌번호, 고객 보유 종목, 리밸런싱 전략, 회사명 목록을 한 곳에 모음
+"""
+
+# 기본 고객 계좌번호
+ACCOUNT_NUMBER = '99911122222'
+
+# 고객잔고 20개 종목 (실제 종목코드, 종목명)
+CUSTOMER_STOCKS = [
+    ('005930', '삼성전자'), ('000660', 'SK하이닉스'), ('035420', 'NAVER'),
+    ('051910', 'LG화학'), ('207940', '삼성바이오로직스'), ('005490', 'POSCO홀딩스'),
+    ('000270', '기아'), ('035720', '카카오'), ('105560', 'KB금융'),
+    ('055550', '신한지주'), ('096770', 'SK이노베이션'), ('017670', 'SK텔레콤'),
+    ('066570', 'LG전자'), ('009150', '삼성전기'), ('036570', '엔씨소프트'),
+    ('323410', '카카오뱅크'), ('086790', '하나금융지주'), ('068270', '셀트리온'),
+    ('373220', 'LG에너지솔루션'), ('247540', '에코프로비엠')
+]
+
+CUSTOMER_STOCK_CODES = [code for code, _ in CUSTOMER_STOCKS]
+CUSTOMER_NAMES = [name for _, name in CUSTOMER_STOCKS]
+
+# 고객잔고 종목별 보유수량 (CUSTOMER_STOCKS 순서)
+HOLDING_QUANTITIES = [500, 150, 80, 45, 25, 120, 200, 180, 220, 300,
+                      85, 160, 90, 130, 75, 400, 110, 95, 60, 140]
+
+# 스키마 ENUM 값 (sql/create_tables_final.sql)
+RISK_LEVELS = ['초저위험', '저위험', '중위험', '고위험', '초고위험']
+INVESTMENT_STYLES = ['가치투자', '성장투자', '배당투자', '지수추종', '단기/스윙', '퀀트/시스템트레이딩', '테마/모멘텀']
+REBALANCING_FREQUENCIES = ['일간', '주간', '월간', '분기', '반기', '연간']
+
+# 매매내역 매수매도구분코드 (trading_history CHECK 제약, 1:매수 2:매도)
+BUY_SELL_CODES = ('1', '2')
+
+# 매매내역(trading_history) 을 만드는 모듈들이 쓰는 컬럼 순서
+TRADE_COLUMNS = ['account_number', 'trading_date', 'order_number', 'execution_number', 'stock_code',
+                 'buy_sell_code', 'order_quantity', 'order_amount']
+
+# 리밸런싱마스터 15개 전략
+# (rebalancing_strategy_code, rebalancing_name, rebalancing_description, risk_level, investment_style, keyword1, keyword2, keyword3)
+STRATEGIES = [
+    ('CONSERVATIVE_01', '안정형 포트폴리오', '안전자산 중심의 보수적 투자 전략', '저위험', '지수추종', '안정성', '보수적', '저위험'),
+    ('BALANCED_01', '균형형 포트폴리오', '주식과 채권의 균형잡힌 분산투자', '중위험', '지수추종', '균형', '분산투자', '중위험'),
+    ('GROWTH_01', '성장형 포트폴리오', '성장주 중심의 적극적 투자 전략', '고위험', '성장투자', '성장성', '적극적', '고수익'),
+    ('DIVIDEND_01', '배당형 포트폴리오', '배당수익을 중시하는 안정적 수익 추구', '저위험', '배당투자', '배당', '수익', '안정적'),
+    ('TECH_01', 'IT기술주 포트폴리오', 'IT 기술주에 집중 투자하는 전략', '고위험', '테마/모멘텀', '기술주', 'IT', '혁신'),
+    ('GLOBAL_01', '글로벌 포트폴리오', '해외 주식 분산투자를 통한 글로벌 전략', '중위험', '지수추종', '글로벌', '해외투자', '분산'),
+    ('ESG_01', 'ESG 포트폴리오', '지속가능경영 기업 중심 투자', '중위험', '가치투자', '지속가능', '친환경', 'ESG'),
+    ('SMALL_CAP_01', '중소형주 포트폴리오', '중소형 성장주 중심 투자 전략', '고위험', '성장투자', '중소형주', '성장', '고성장'),
+    ('VALUE_01', '가치투자 포트폴리오', '저평가된 우량주 중심 투자', '중위험', '가치투자', '가치투자', '저평가', '우량주'),
+    ('SECTOR_01', '섹터별 포트폴리오', '업종별 분산투자 전략', '중위험', '테마/모멘텀', '섹터', '업종분산', '다양화'),
+    ('MOMENTUM_01', '모멘텀 포트폴리오', '상승 추세 종목 중심 투자', '초고위험', '테마/모멘텀', '모멘텀', '추세', '상승세'),
+    ('DEFENSIVE_01', '방어형 포트폴리오', '경기방어주 중심의 안정적 투자', '초저위험', '배당투자', '방어', '경기방어주', '안정'),
+    ('INCOME_01', '수익형 포트폴리오', '정기적 수익창출을 목적으로 하는 전략', '저위험', '배당투자', '수익창출', '정기수익', '안정수익'),
+    ('EMERGING_01', '이머징 포트폴리오', '신흥시장 투자를 통한 고성장 추구', '초고위험', '성장투자', '신흥시장', '고성장', '이머징'),
+    ('HYBRID_01', '하이브리드 포트폴리오', '여러 전략을 혼합한 복합 투자 전략', '중위험', '퀀트/시스템트레이딩', '복합전략', '하이브리드', '다전략')
+]
+
+STRATEGY_COLUMNS = ['rebalancing_strategy_code', 'rebalancing_name', 'rebalancing_description', 'risk_level',
+                    'investment_style', 'keyword1', 'keyword2', 'keyword3']
+
+
+def company_names():
+    """다양한 회사명 생성 (고객 보유 종목명 + 지역/업종 조합 + 영문명)"""
+    companies = list(CUSTOMER_NAMES)
+
+    # 추가 회사명 패턴
+    prefixes = ['한국', '대한', '동양', '서울', '부산', '대구', '인천', '광주', '대전', '울산']
+    suffixes = ['전자', '화학', '건설', '제약', '금속', '섬유', '식품', '통신', '보험', '증권',
+                '운수', '유통', '에너지', '바이오', '소프트', '테크', '시스템', '솔루션', '그룹', '홀딩스']
+
+    for prefix in prefixes:
+        for suffix in suffixes:
+            companies.append(f"{prefix}{suffix}")
+
+    # 영문 회사명도 추가
+    english_companies = [
+        'KOREA TECH', 'ASIA HOLDINGS', 'GLOBAL SYSTEMS', 'SMART SOLUTIONS',
+        'NEW ENERGY', 'BIO PHARMA', 'DIGITAL WORKS', 'GREEN POWER'
+    ]
+    companies.extend(english_companies)
+
+    return companies
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+전략 위험지표 계산 엔진
+전략별 포트폴리오 비중과 시세 저장소(price_store)의 일간 수익률로
+기대수익률/변동성/최대낙폭/샤프비율/VaR/베타/시장 상관계수를 계산해
+rebalancing_analysis, strategy_learning_analysis 행으로 출력
+
+전 전략을 (전략, 종목) 비중 행렬 하나로 묶어 행렬곱으로 일간 수익률을 구하고,
+이동 구간 통계는 누적합 차분, 최대낙폭은 누적최대(np.maximum.accumulate)로 계산해 날짜별 파이썬 루프가 없음
+포트폴리오는 매일 목표 비중으로 리밸런싱한다고 가정
+"""
+
+import argparse
+import json
+from decimal import Decimal
+
+import numpy as np
+
+from backtest import BACKTEST_COLUMNS, backtest_columns
+from market_index import MarketIndex
+from price_history import TRADING_DAYS_PER_YEAR
+from price_store import DEFAULT_STORE, PriceStore
+from reference_data import RISK_LEVELS, STRATEGIES, STRATEGY_COLUMNS
+from sql_reader import read_records
+from sql_writer import SqlWriter
+
+# 무위험 수익률 (연, 샤프비율 계산용)
+RISK_FREE_RATE = 0.035
+
+# 지표 계산 구간 (거래일, 기본 최근 1년)
+DEFAULT_WINDOW = TRADING_DAYS_PER_YEAR
+
+VAR_LEVEL = 0.95
+
+# 전략별 편입 종목 수 (지수추종은 더 넓게 분산)
+HOLDINGS = 20
+INDEX_HOLDINGS = 50
+
+# 투자스타일별 종목 선정 기준 (stock_signals() 지표 중 클수록 우선)
+STYLE_SIGNALS = {
+    '가치투자': 'reversal',
+    '성장투자': 'momentum_12m',
+    '배당투자': 'low_volatility',
+    '지수추종': 'broad',
+    '단기/스윙': 'momentum_1m',
+    '퀀트/시스템트레이딩': 'sharpe',
+    '테마/모멘텀': 'momentum_6m',
+}
+
+DEFAULT_FREQUENCY = '월간'
+
+ANALYSIS_COLUMNS = ['rebalancing_strategy_code', 'expected_return', 'volatility', 'max_drawdown',
+                    'investor_preference']
+LEARNING_COLUMNS = ['strategy_code', 'expected_return', 'expected_volatility', 'sharpe_ratio', 'max_drawdown',
+                    'var_95', 'beta', 'correlation_kospi', 'rebalancing_frequency', 'sector_allocation',
+                    *BACKTEST_COLUMNS.values()]
+
+
+def decimal(value, digits, limit):
+    """DECIMAL(p, digits) 컬럼 값 (범위를 넘으면 ±limit 로 자름)"""
+    value = min(max(float(value), -limit), limit)
+    return Decimal(f"{value:.{digits}f}")
+
+
+def _window_sums(values, window):
+    """(행, 거래일) 배열의 window 일 이동 합계 (행, 거래일 - window + 1) - 누적합 차분"""
+    total = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=total[:, 1:])
+    return total[:, window:] - total[:, :-window]
+
+
+def rolling_stats(returns, market, window):
+    """전략 일간 수익률 (전략, 거래일) 과 시장 수익률 (거래일) 의 window 일 이동 평균/표준편차/베타/상관계수"""
+    market = np.broadcast_to(market, returns.shape)
+    mean = _window_sums(returns, window) / window
+    market_mean = _window_sums(market[:1], window) / window
+    variance = _window_sums(returns * returns, window) / window - mean ** 2
+    market_variance = _window_sums(market[:1] * market[:1], window) / window - market_mean ** 2
+    covariance = _window_sums(returns * market, window) / window - mean * market_mean
+    variance = np.maximum(variance, 0)
+    market_variance = np.maximum(market_variance, 1e-18)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.where(variance > 0, covariance / np.sqrt(variance * market_variance), 0.0)
+    return {
+        'mean': mean,
+        'std': np.sqrt(variance * window / (window - 1)),
+        'beta': covariance / market_variance,
+        'correlation': correlation,
+    }
+
+
+def max_drawdown(returns):
+    """전략별 최대낙폭 (0 ~ 1) - 누적 자산의 누적최대 대비 하락폭 최댓값"""
+    wealth = np.cumprod(1 + returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1)
+    return (1 - wealth / peak).max(axis=1, initial=0)
+
+
+def market_returns(returns):
+    """시장 수익률 근사 (전 종목 동일가중 평균, 시가총액가중 지수 market_index 를 쓰지 않을 때)"""
+    return np.nanmean(returns, axis=0)
+
+
+def compute_metrics(weights, returns, market=None, window=DEFAULT_WINDOW, risk_free=RISK_FREE_RATE):
+    """비중 행렬 (전략, 종목) 과 종목 수익률 (종목, 거래일) 로 전략별 지표 일괄 계산
+
+    지표는 마지막 window 거래일 기준 (연율화), rolling 에는 전 기간 이동 구간 값 (전략, 거래일 - window + 1)
+    """
+    returns = np.nan_to_num(returns)
+    market = market_returns(returns) if market is None else np.nan_to_num(market)
+    window = min(window, returns.shape[1])
+    portfolio = weights @ returns
+
+    rolling = rolling_stats(portfolio, market, window)
+    recent = portfolio[:, -window:]
+    annual_return = rolling['mean'][:, -1] * TRADING_DAYS_PER_YEAR
+    annual_volatility = rolling['std'][:, -1] * np.sqrt(TRADING_DAYS_PER_YEAR)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(annual_volatility > 0, (annual_return - risk_free) / annual_volatility, 0.0)
+    return {
+        'expected_return': annual_return,
+        'volatility': annual_volatility,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown(recent),
+        'var_95': -np.quantile(recent, 1 - VAR_LEVEL, axis=1),
+        'beta': rolling['beta'][:, -1],
+        'correlation': rolling['correlation'][:, -1],
+        'rolling': rolling,
+        'returns': portfolio,
+    }
+
+
+def preference_scores(sharpe):
+    """샤프비율 순위로 매긴 투자자선호도 1 ~ 5점"""
+    if not len(sharpe):
+        return np.zeros(0, dtype=int)
+    rank = np.argsort(np.argsort(sharpe))
+    return 1 + rank * 5 // len(sharpe)
+
+
+def stock_signals(returns):
+    """종목 선정용 지표 (종목별): 변동성, 1/6/12개월 수익률, 샤프비율"""
+    returns = np.nan_to_num(returns)
+    log_wealth = np.cumsum(np.log1p(returns), axis=1)
+
+    def momentum(days):
+        days = min(days, returns.shape[1] - 1)
+        return log_wealth[:, -1] - log_wealth[:, -1 - days]
+
+    volatility = returns.std(axis=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    annual = returns.mean(axis=1) * TRADING_DAYS_PER_YEAR
+    return {
+        'volatility': volatility,
+        'momentum_1m': momentum(21),
+        'momentum_6m': momentum(126),
+        'momentum_12m': momentum(250),
+        'reversal': -momentum(250),
+        'low_volatility': -volatility,
+        'sharpe': np.where(volatility > 0, annual / np.maximum(volatility, 1e-12), 0),
+    }
+
+
+def strategy_weights(returns, strategies=STRATEGIES, holdings=HOLDINGS):
+    """rebalancing_master 전략별 포트폴리오 비중 (전략, 종목) - returns 는 종목 선정에 쓰는 과거 수익률
+
+    위험도 5단계를 종목 변동성 5분위에 대응시키고, 그 안에서 투자스타일 기준 상위 종목을 골라
+    변동성 역수 비중 (지수추종은 변동성 순으로 고르게 INDEX_HOLDINGS 종목 동일 비중)
+    """
+    signals = stock_signals(returns)
+    stocks = len(signals['volatility'])
+    order = np.argsort(signals['volatility'])
+    weights = np.zeros((len(strategies), stocks))
+    for row, strategy in enumerate(strategies):
+        info = dict(zip(STRATEGY_COLUMNS, strategy))
+        level = RISK_LEVELS.index(info['risk_level'])
+        band = order[level * stocks // len(RISK_LEVELS):(level + 1) * stocks // len(RISK_LEVELS)]
+        signal = STYLE_SIGNALS.get(info['investment_style'], 'sharpe')
+        if signal == 'broad':
+            picked = band[np.linspace(0, len(band) - 1, min(INDEX_HOLDINGS, len(band))).astype(int)]
+            weights[row, picked] = 1
+        else:
+            picked = band[np.argsort(-signals[signal][band], kind='stable')[:holdings]]
+            weights[row, picked] = 1 / np.maximum(signals['volatility'][picked], 1e-6)
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def composition_weights(store, compositions):
+    """portfolio_composition JSON ({"stocks": [{"stock_code", "weight", "sector"}]}) 목록 → (비중 행렬, 업종 배분, 누락 종목)
+
+    저장소에 없는 종목은 빼고 남은 비중을 100% 로 다시 맞춤
+    """
+    weights = np.zeros((len(compositions), len(store)))
+    allocations = []
+    missing = []
+    for row, composition in enumerate(compositions):
+        sectors = {}
+        for item in (composition or {}).get('stocks', []):
+            code = item.get('stock_code')
+            if code not in store._index:
+                missing.append(code)
+                continue
+            weight = float(item.get('weight', 0))
+            weights[row, store._index[code]] += weight
+            sector = item.get('sector') or (store.sectors[store._index[code]] if store.sectors else '기타')
+            sectors[sector] = sectors.get(sector, 0) + weight
+        allocations.append(sectors)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    allocations = [{sector: round(weight * 100 / total, 2) for sector, weight in sectors.items()} if total else {}
+                   for sectors, total in zip(allocations, totals[:, 0].tolist())]
+    return weights, allocations, missing
+
+
+def load_learning_strategies(path):
+    """덤프의 strategy_learning_master 에서 (전략코드, portfolio_composition) 목록"""
+    strategies = []
+    for _, record in read_records(path, ['strategy_learning_master']):
+        composition = record.get('portfolio_composition')
+        if isinstance(composition, str):
+            composition = json.loads(composition)
+        strategies.append((record['strategy_code'], composition))
+    return strategies
+
+
+def analysis_rows(codes, metrics):
+    """rebalancing_analysis 행 (수익률/변동성/낙폭은 %)"""
+    preference = preference_scores(metrics['sharpe'])
+    for i, code in enumerate(codes):
+        yield (code,
+               decimal(metrics['expected_return'][i] * 100, 2, 999.99),
+               decimal(metrics['volatility'][i] * 100, 2, 999.99),
+               decimal(metrics['max_drawdown'][i] * 100, 2, 999.99),
+               int(preference[i]))
+
+
+def learning_rows(codes, metrics, allocations, backtests, frequency=DEFAULT_FREQUENCY):
+    """strategy_learning_analysis 행 (backtests 는 backtest.backtest_columns() 결과)"""
+    for i, code in enumerate(codes):
+        yield (code,
+               decimal(metrics['expected_return'][i] * 100, 2, 999.99),
+               decimal(metrics['volatility'][i] * 100, 2, 999.99),
+               decimal(metrics['sharpe'][i], 3, 99.999),
+               decimal(metrics['max_drawdown'][i] * 100, 2, 999.99),
+               decimal(metrics['var_95'][i] * 100, 2, 999.99),
+               decimal(metrics['beta'][i], 3, 99.999),
+               decimal(metrics['correlation'][i], 3, 1),
+               frequency,
+               json.dumps(allocations[i], ensure_ascii=False),
+               *(backtests[column][i] for column in BACKTEST_COLUMNS.values()))
+
+
+def print_metrics(codes, metrics):
+    print(f"   {'전략':<16} {'수익률':>8} {'변동성':>8} {'샤프':>7} {'MDD':>7} {'VaR95':>7} {'베타':>6} {'상관':>6}")
+    for i, code in enumerate(codes):
+        print(f"   {code:<16} {metrics['expected_return'][i] * 100:7.2f}% {metrics['volatility'][i] * 100:7.2f}% "
+              f"{metrics['sharpe'][i]:7.3f} {metrics['max_drawdown'][i] * 100:6.2f}% {metrics['var_95'][i] * 100:6.2f}% "
+              f"{metrics['beta'][i]:6.3f} {metrics['correlation'][i]:6.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='시세 저장소로 전략 위험지표 계산 후 분석 테이블 INSERT 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='price_store 저장소 디렉터리')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='지표 계산 구간 (거래일)')
+    parser.add_argument('--market', choices=['index', 'equal'], default='index',
+                        help='베타/상관계수 기준 (index: 시가총액가중 지수 market_index, equal: 전 종목 동일가중)')
+    parser.add_argument('--learning-dump', help='strategy_learning_master 가 들어 있는 SQL 덤프 (있으면 '
+                                                'strategy_learning_analysis 도 생성)')
+    parser.add_argument('--var-scenarios', type=int, default=0, help='strategy_learning_analysis.var_95 를 몬테카를로 '
+                                                                     '시나리오 수만큼으로 계산 (0 이면 과거 수익률 분위수)')
+    parser.add_argument('--output', default='insert_risk_metrics.sql', help='출력 SQL 파일')
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    returns = store.returns()
+    if args.market == 'index':
+        market_index = MarketIndex(store)
+        market_index.refresh()
+        market = market_index.returns()
+    else:
+        market = market_returns(returns)
+    print(f"📊 저장소 {args.store}: 종목 {store.shape[0]:,}개 × 거래일 {store.shape[1]:,}일, 구간 {args.window}일")
+
+    # 종목 선정은 평가 구간 이전 데이터로만 (평가 구간 수익률로 고르면 사후 편향)
+    codes = [strategy[0] for strategy in STRATEGIES]
+    formation = returns[:, :-args.window] if returns.shape[1] > 2 * args.window else returns
+    metrics = compute_metrics(strategy_weights(formation), returns, market, args.window)
+    print("\n📈 rebalancing_analysis")
+    print_metrics(codes, metrics)
+
+    with SqlWriter(args.output) as sql:
+        sql.write("-- 전략 위험지표 (risk_metrics.py)\nUSE kpsdb;\n\nDELETE FROM rebalancing_analysis;\n\n")
+        sql.insert('rebalancing_analysis', ANALYSIS_COLUMNS, analysis_rows(codes, metrics))
+
+        if args.learning_dump:
+            learning = load_learning_strategies(args.learning_dump)
+            learning_codes = [code for code, _ in learning]
+            weights, allocations, missing = composition_weights(store, [composition for _, composition in learning])
+            if missing:
+                print(f"\n⚠️  저장소에 없는 종목 {len(set(missing))}개는 제외하고 비중을 다시 맞춤: "
+                      f"{', '.join(sorted(set(map(str, missing)))[:10])}")
+            held = weights.sum(axis=1) > 0
+            learning_metrics = compute_metrics(weights[held], returns, market, args.window)
+            if args.var_scenarios:
+                from monte_carlo_var import strategy_var
+
+                learning_metrics['var_95'] = strategy_var(store, weights[held], args.var_scenarios)['var']
+            backtests = backtest_columns(weights[held], returns, store.dates, DEFAULT_FREQUENCY)
+            learning_codes = [code for code, keep in zip(learning_codes, held) if keep]
+            allocations = [allocation for allocation, keep in zip(allocations, held) if keep]
+            print("\n📈 strategy_learning_analysis")
+            print_metrics(learning_codes, learning_metrics)
+            sql.write("DELETE FROM strategy_learning_analysis;\n\n")
+            sql.insert('strategy_learning_analysis', LEARNING_COLUMNS,
+                       learning_rows(learning_codes, learning_metrics, allocations, backtests))
+    print(f"\n📁 파일: {args.output}")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+쏠린(skewed) 부하 생성용 표본 추출
+실제 부하는 소수 종목 (005930 등) 에 거래가 몰리고 소수 계좌의 매매내역이 매우 길다
+가중치 목록을 별칭 표 (Vose alias method) 로 한 번 만들어 두면 가중치 수와 관계없이 한 번 뽑는 데 O(1)
+(균등 난수 2개 + 표 2개 조회) 이므로 numpy 배열 단위로도, 파이썬 random 으로 한 건씩도 같은 표를 사용
+
+    zipf_weights       - 순위 k (1부터) 의 가중치 k^-s (종목 인기도, 앞 순위일수록 자주 선택)
+    power_law_sizes    - 최소 ~ 최대 크기 k 의 가중치 k^-a (계좌별 행 수)
+    AliasTable.sample  - numpy Generator 로 여러 건 (배열)
+    AliasTable.draw    - random.Random 으로 한 건 (파이썬 백엔드/스크립트)
+
+dataset_spec.py 의 ('ref'/'sample', 'table.column', ('zipf', s)) 규칙과 테이블 sizes 항목이 이 모듈을 사용
+(dataset_spec.skewed_spec() 이 기본 스펙에 두 설정을 얹은 부하 테스트용 스펙)
+"""
+
+import argparse
+import time
+import zlib
+
+import numpy as np
+
+# 기본 종목 인기도 지수 (1 근처면 상위 1% 종목이 거래의 약 절반)
+ZIPF_EXPONENT = 1.1
+
+# 기본 계좌 크기 멱법칙 지수 (작을수록 큰 계좌가 많음)
+POWER_LAW_EXPONENT = 2.0
+
+# 겹치지 않게 뽑을 때 중복 재추첨 최대 횟수 (넘으면 가중치가 몇 개 값에 너무 몰린 것)
+MAX_REDRAWS = 1000
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    """순위 1 ~ count 의 Zipf 가중치 (순위^-exponent)"""
+    return np.arange(1, count + 1, dtype=np.float64) ** -exponent
+
+
+def power_law_sizes(minimum, maximum, exponent=POWER_LAW_EXPONENT):
+    """크기 minimum ~ maximum 의 멱법칙 가중치로 만든 별칭 표 (뽑은 값 + minimum = 크기)"""
+    if not 1 <= minimum <= maximum:
+        raise ValueError(f"크기 범위가 잘못되었습니다: {minimum} ~ {maximum}")
+    return AliasTable(np.arange(minimum, maximum + 1, dtype=np.float64) ** -exponent)
+
+
+def weighted_table(weighting, count):
+    """스펙 가중 규칙 ('zipf', 지수) 으로 값 count 개의 별칭 표 생성"""
+    kind, exponent = weighting
+    if kind != 'zipf':
+        raise ValueError(f"알 수 없는 가중 규칙입니다: {kind}")
+    return AliasTable(zipf_weights(count, exponent))
+
+
+def account_sizes(seed, table, accounts, minimum, maximum, exponent=POWER_LAW_EXPONENT):
+    """계좌별 행 수 (minimum ~ maximum 멱법칙, 계좌 순서 배열) - (seed, 테이블) 이 같으면 작업자/백엔드와 무관하게 동일"""
+    rng = np.random.default_rng([seed % 2 ** 63, zlib.crc32(f"{table}/sizes".encode('utf-8'))])
+    return power_law_sizes(minimum, maximum, exponent).sample(rng, accounts) + minimum
+
+
+class AliasTable:
+    """가중치 목록에서 위치 (0 ~ n-1) 를 가중치 비율로 O(1) 에 뽑는 별칭 표
+
+    칸 i 를 균등하게 고른 뒤 확률 probability[i] 로 i, 아니면 alias[i] 를 반환
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or not len(weights) or (weights < 0).any() or not weights.sum() > 0:
+            raise ValueError("가중치는 0 이상이고 합이 양수인 1차원 목록이어야 합니다")
+        count = len(weights)
+        scaled = (weights * (count / weights.sum())).tolist()
+        probability = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+        # 남은 칸은 부동소수 오차만큼만 1 과 다르므로 자기 자신 (확률 1)
+
+        self.probability = np.array(probability)
+        self.alias = np.array(alias, dtype=np.int64)
+        self.support = int(np.count_nonzero(weights))
+        self._lists = (probability, alias)
+
+    def __len__(self):
+        return len(self.alias)
+
+    def sample(self, rng, size=None):
+        """numpy Generator 로 위치 배열 추출"""
+        index = rng.integers(0, len(self.alias), size)
+        return np.where(rng.random(size) < self.probability[index], index, self.alias[index])
+
+    def draw(self, rng):
+        """random.Random 으로 위치 하나 추출"""
+        probability, alias = self._lists
+        index = int(rng.random() * len(alias))
+        return index if rng.random() < probability[index] else alias[index]
+
+    def sample_distinct(self, rng, groups, count):
+        """그룹 (행) 마다 서로 다른 위치 count 개 (groups, count) - 중복이 생긴 칸만 다시 추출"""
+        self._check_distinct(count)
+        picked = self.sample(rng, (groups, count))
+        for _ in range(MAX_REDRAWS):
+            order = np.argsort(picked, axis=1, kind='stable')
+            ordered = np.take_along_axis(picked, order, axis=1)
+            repeated = np.zeros(picked.shape, dtype=bool)
+            np.put_along_axis(repeated, order[:, 1:], ordered[:, 1:] == ordered[:, :-1], axis=1)
+            if not repeated.any():
+                return picked
+            picked[repeated] = self.sample(rng, int(repeated.sum()))
+        raise ValueError(f"중복 없는 추출이 {MAX_REDRAWS}회 안에 끝나지 않았습니다 (가중치가 너무 몰림)")
+
+    def draw_distinct(self, rng, count):
+        """random.Random 으로 서로 다른 위치 count 개 (뽑힌 순서)"""
+        self._check_distinct(count)
+        chosen = {}
+        for _ in range(count * MAX_REDRAWS):
+            chosen.setdefault(self.draw(rng), None)
+            if len(chosen) == count:
+                return list(chosen)
+        raise ValueError(f"중복 없는 추출이 {MAX_REDRAWS}회 안에 끝나지 않았습니다 (가중치가 너무 몰림)")
+
+    def _check_distinct(self, count):
+        if count > self.support:
+            raise ValueError(f"가중치가 양수인 값 {self.support}개에서 {count}개를 중복 없이 뽑을 수 없습니다")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Zipf 종목 인기도 / 멱법칙 계좌 크기 분포 미리보기')
+    parser.add_argument('--stocks', type=int, default=2500, help='종목 수')
+    parser.add_argument('--zipf', type=float, default=ZIPF_EXPONENT, help='종목 인기도 Zipf 지수')
+    parser.add_argument('--draws', type=int, default=10000000, help='종목 추출 횟수')
+    parser.add_argument('--accounts', type=int, default=10000, help='계좌 수')
+    parser.add_argument('--rows', type=int, default=930, help='계좌별 최소 행 수')
+    parser.add_argument('--max-rows', type=int, default=93000, help='계좌별 최대 행 수')
+    parser.add_argument('--power-law', type=float, default=POWER_LAW_EXPONENT, help='계좌 크기 멱법칙 지수')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    popularity = AliasTable(zipf_weights(args.stocks, args.zipf))
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    picked = popularity.sample(rng, args.draws)
+    elapsed = time.perf_counter() - started
+    counts = np.sort(np.bincount(picked, minlength=args.stocks))[::-1]
+    print(f"🎯 종목 {args.stocks:,}개 Zipf({args.zipf:g}) 별칭 표 {built * 1000:.1f}ms, "
+          f"{args.draws:,}회 추출 {elapsed:.2f}초 (초당 {args.draws / elapsed:,.0f}회)")
+    for top in (1, 10, 100):
+        print(f"   상위 {top:>3}개 종목 비중: {counts[:top].sum() / args.draws:.1%}")
+
+    sizes = power_law_sizes(args.rows, args.max_rows, args.power_law).sample(rng, args.accounts) + args.rows
+    ordered = np.sort(sizes)[::-1]
+    print(f"👥 계좌 {args.accounts:,}개 행 수 멱법칙({args.power_law:g}): 합계 {sizes.sum():,}행, "
+          f"평균 {sizes.mean():,.0f}, 중앙값 {np.median(sizes):,.0f}, 최대 {sizes.max():,}")
+    for share in (0.01, 0.1):
+        top = max(1, int(args.accounts * share))
+        print(f"   상위 {share:.0%} 계좌의 행 비중: {ordered[:top].sum() / sizes.sum():.1%}")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+스트리밍 SQL 덤프 리더
+파일 전체를 읽지 않고 청크 단위로 INSERT 구문을 해석해 테이블별 행 튜플을 하나씩 반환
+문자열 이스케이프(\\', '', \\\\, \\n 등), 주석, INSERT 이외 구문(USE/SET/DELETE/CREATE...)을 처리
+파일 크기와 관계없이 메모리 사용량은 청크 크기 + 가장 긴 행 정도로 일정하게 유지됨
+"""
+
+import gzip
+import re
+from decimal import Decimal
+
+CHUNK_SIZE = 1024 * 1024
+
+# 구문 시작부(주석, INSERT 헤더와 컬럼 목록) 판별을 위해 버퍼에 미리 확보하는 길이
+_LOOKAHEAD = 64 * 1024
+
+_STRING = r"'(?:[^'\\]|\\.|'')*'"
+
+# 구문 사이의 공백/주석
+_GAP = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+
+# INSERT 헤더: INSERT [IGNORE] INTO [db.]table [(col, ...)] VALUES
+_INSERT_HEADER = re.compile(
+    r"INSERT\s+(?:IGNORE\s+)?INTO\s+(?:`?\w+`?\.)?`?(\w+)`?\s*(?:\(([^)]*)\)\s*)?VALUES\s*",
+    re.IGNORECASE)
+
+# INSERT 이외의 구문 전체 (문자열/주석 안의 ; 는 무시)
+_OTHER_STATEMENT = re.compile(
+    r"(?:" + _STRING + r"|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|--[^\n]*\n|#[^\n]*\n|/\*.*?\*/|[^;'\"`#/-]|-(?!-)|/(?!\*))*;",
+    re.DOTALL)
+
+# VALUES 절의 행 하나와 뒤따르는 구분자(, 또는 ;) - 값 안의 함수 호출 괄호는 한 단계까지 허용
+# (JSON_OBJECT(...) 처럼 더 깊게 중첩된 행은 _scan_row() 로 처리)
+_ROW = re.compile(
+    r"(?:\s+|--[^\n]*\n)*\(((?:" + _STRING + r"|\((?:" + _STRING + r"|[^'()])*\)|[^'()])*)\)"
+    r"(?:\s+|--[^\n]*\n)*([,;])")
+
+_ROW_START = re.compile(r"(?:\s+|--[^\n]*\n)*\(")
+_ROW_END = re.compile(r"(?:\s+|--[^\n]*\n)*([,;])")
+
+# 괄호 중첩 계산용 토큰 (문자열, 괄호, 쉼표, 그 외 연속 문자)
+_NESTED_TOKEN = re.compile(r"'(?:[^'\\]|\\.|'')*'|[(),]|[^'(),]+", re.DOTALL)
+
+# 행 안의 값 토큰 (따옴표 안 문자열 내용 또는 앞뒤 공백을 뺀 따옴표 없는 값, 쉼표/공백은 건너뜀)
+# 따옴표 없는 값은 한 글자 이상이므로 두 번째 그룹이 비어 있으면 문자열 값
+_FIELD = re.compile(r"'((?:[^'\\]|\\.|'')*)'|([^,'\s](?:[^,']*[^,'\s])?)", re.DOTALL)
+
+_STRING_FULL = re.compile(_STRING, re.DOTALL)
+
+_UNESCAPE = re.compile(r"\\(.)|''", re.DOTALL)
+_UNESCAPE_MAP = {'0': '\0', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', 'b': '\b'}
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def unescape(text):
+    """SQL 문자열 리터럴 내용의 이스케이프 해제 (\\n → 개행, \\' → ', '' → ')"""
+    if '\\' not in text and "''" not in text:
+        return text
+    return _UNESCAPE.sub(lambda m: "'" if m.group(1) is None else _UNESCAPE_MAP.get(m.group(1), m.group(1)), text)
+
+
+def convert(raw):
+    """따옴표 없는 값을 파이썬 값으로 변환 (NULL → None, 정수 → int, 실수 → Decimal, 그 외 원문)"""
+    # 금액 같은 소수는 int() 예외를 거치지 않고 바로 Decimal 로
+    if '.' not in raw:
+        try:
+            return int(raw)
+        except ValueError:
+            pass
+    if raw.upper() == 'NULL':
+        return None
+    if _NUMBER.fullmatch(raw):
+        return Decimal(raw)
+    return raw
+
+
+def split_nested(body):
+    """중첩 괄호가 있는 행 내용을 최상위 쉼표 기준으로 나눈 원문 목록"""
+    parts = []
+    current = []
+    depth = 0
+    for token in _NESTED_TOKEN.findall(body):
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif token == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(token)
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def parse_row(body):
+    """괄호 안의 행 내용을 값 튜플로 변환 (함수 호출 등 식은 원문 문자열 그대로)"""
+    if '(' in body:
+        values = []
+        for part in split_nested(body):
+            if len(part) >= 2 and part[0] == "'" and part[-1] == "'" and _STRING_FULL.fullmatch(part):
+                values.append(unescape(part[1:-1]))
+            else:
+                values.append(convert(part))
+        return tuple(values)
+    if "'" not in body:
+        return tuple(convert(raw.strip()) for raw in body.split(','))
+    if '\\' not in body and "''" not in body:
+        # 이스케이프가 없으면 쉼표로 나눈 조각이 각각 온전한 문자열/값인지만 확인 (문자열 안 쉼표는 정규식으로)
+        values = []
+        for part in body.split(','):
+            part = part.strip()
+            if part[:1] == "'":
+                if len(part) < 2 or part[-1] != "'" or part.count("'") != 2:
+                    break
+                values.append(part[1:-1])
+            elif "'" in part or not part:
+                break
+            else:
+                values.append(convert(part))
+        else:
+            return tuple(values)
+    return tuple([convert(raw) if raw else unescape(text) for text, raw in _FIELD.findall(body)])
+
+
+def open_dump(path):
+    """덤프 파일 열기 (.gz 는 압축 해제하며 읽기)"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+class SqlDumpReader:
+    """SQL 덤프를 청크 단위로 읽으며 INSERT 행을 (테이블, 컬럼목록, 값튜플) 로 반환하는 리더
+
+    사용 예:
+        for table, columns, values in SqlDumpReader('dump.sql').rows():
+            ...
+
+    tables   - 이 테이블들의 행만 변환해 반환 (나머지는 건너뜀, None 이면 전체)
+    schema   - 컬럼 목록 없는 INSERT 를 위한 테이블별 컬럼 순서 (dataset_spec.parse_schema() 결과)
+    """
+
+    def __init__(self, path, tables=None, schema=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.tables = set(tables) if tables is not None else None
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self.row_counts = {}
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._consumed = 0
+
+    def _fill(self):
+        """버퍼에 청크 하나 추가 (이미 처리한 앞부분은 버림). 더 읽을 것이 없으면 False"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        self._consumed += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def _ensure(self, size):
+        """현재 위치 이후로 size 글자 이상이 버퍼에 있도록 채움 (파일 끝이면 있는 만큼)"""
+        while len(self._buffer) - self._pos < size and self._fill():
+            pass
+
+    def _match(self, pattern, lookahead=None):
+        """현재 위치에서 패턴 매칭 (버퍼 끝에 걸쳐 있으면 청크를 더 읽어 재시도)
+
+        lookahead 를 주면 남은 버퍼가 그보다 길 때 매칭 실패를 바로 확정 (불필요한 추가 읽기 방지)
+        """
+        while True:
+            match = pattern.match(self._buffer, self._pos)
+            if match and (match.end() < len(self._buffer) or self._eof):
+                return match
+            if match is None and lookahead is not None and len(self._buffer) - self._pos >= lookahead:
+                return None
+            if not self._fill():
+                return pattern.match(self._buffer, self._pos)
+
+    def _scan_row(self):
+        """괄호가 깊게 중첩된 행을 토큰 단위로 읽어 (행 내용, 구분자) 반환"""
+        start = self._match(_ROW_START)
+        if start is None:
+            return None
+        # 청크를 더 읽으면 버퍼 앞부분이 잘리므로 위치는 self._pos 기준 상대값으로 유지
+        body_offset = start.end() - self._pos
+        offset = body_offset
+        depth = 1
+        while depth:
+            token = _NESTED_TOKEN.match(self._buffer, self._pos + offset)
+            if token is None or (token.end() == len(self._buffer) and not self._eof):
+                if self._fill():
+                    continue
+                if token is None:
+                    return None
+            offset = token.end() - self._pos
+            if token.group() == '(':
+                depth += 1
+            elif token.group() == ')':
+                depth -= 1
+
+        body = self._buffer[self._pos + body_offset:self._pos + offset - 1]
+        self._pos += offset
+        end = self._match(_ROW_END)
+        if end is None:
+            return None
+        self._pos = end.end()
+        return body, end.group(1)
+
+    def _error(self, message):
+        snippet = self._buffer[self._pos:self._pos + 80].replace('\n', ' ')
+        raise ValueError(f"{self.path}: {message} (위치 {self._consumed + self._pos:,}): {snippet}")
+
+    def _columns(self, table, column_list):
+        if column_list is not None:
+            return tuple(column.strip().strip('`') for column in column_list.split(','))
+        if self.schema and table in self.schema:
+            return tuple(self.schema[table]['columns'])
+        return None
+
+    def rows(self):
+        """파일 전체를 한 번 훑으며 (table, columns, values) 를 하나씩 yield"""
+        with open_dump(self.path) as self._file:
+            self._fill()
+            while True:
+                # 청크 경계에 걸린 주석을 구문으로 오인하지 않도록 구문 시작부를 먼저 확보
+                self._ensure(_LOOKAHEAD)
+                self._pos = self._match(_GAP).end()
+                if self._pos >= len(self._buffer) and not self._fill():
+                    break
+                if self._pos >= len(self._buffer):
+                    continue
+
+                header = self._match(_INSERT_HEADER, _LOOKAHEAD)
+                if header is None:
+                    statement = self._match(_OTHER_STATEMENT)
+                    if statement is None:
+                        if self._eof and not self._buffer[self._pos:].strip():
+                            break
+                        self._error("구문 끝(;)을 찾을 수 없습니다")
+                    self._pos = statement.end()
+                    continue
+
+                table = header.group(1)
+                columns = self._columns(table, header.group(2))
+                wanted = self.tables is None or table in self.tables
+                self._pos = header.end()
+
+                while True:
+                    row = self._match(_ROW, _LOOKAHEAD)
+                    if row is not None:
+                        self._pos = row.end()
+                        body, separator = row.groups()
+                    else:
+                        scanned = self._scan_row()
+                        if scanned is None:
+                            self._error(f"{table}: VALUES 행을 해석할 수 없습니다")
+                        body, separator = scanned
+                    self.row_counts[table] = self.row_counts.get(table, 0) + 1
+                    if wanted:
+                        yield table, columns, parse_row(body)
+                    if separator == ';':
+                        break
+
+
+def read_rows(path, tables=None, schema=None, chunk_size=CHUNK_SIZE):
+    """SqlDumpReader(...).rows() 단축 함수"""
+    return SqlDumpReader(path, tables, schema, chunk_size).rows()
+
+
+def read_records(path, tables=None, schema=None, chunk_size=CHUNK_SIZE):
+    """(table, {컬럼명: 값}) 형태로 행을 하나씩 yield"""
+    for table, columns, values in read_rows(path, tables, schema, chunk_size):
+        if columns is None:
+            raise ValueError(f"{path}: {table} INSERT 에 컬럼 목록이 없어 컬럼명을 알 수 없습니다 (schema 지정 필요)")
+        yield table, dict(zip(columns, values))
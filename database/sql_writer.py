@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+스트리밍 SQL 작성기
+INSERT 구문 전체를 문자열로 모으지 않고, 행이 생성되는 즉시 파일(또는 표준출력)에 기록
+행 수와 관계없이 메모리 사용량이 일정하게 유지됨
+INSERT 구문은 바이트 한도(max_allowed_packet 대비)와 구문당 행 수 한도에 맞춰 자동 분할
+"""
+
+import sys
+from bisect import bisect_right
+from decimal import Decimal
+from itertools import accumulate, islice
+
+_CENT = Decimal('0.01')
+
+# 구문당 기본 바이트 한도 (MariaDB max_allowed_packet 기본값 16MB 보다 충분히 작게)
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+_ESCAPES = {
+    '\\': '\\\\',
+    "'": "\\'",
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+    '\x1a': '\\Z',
+}
+
+
+def amount(value):
+    """DECIMAL(15,2) 컬럼용 금액 값 (12345 → 12345.00)"""
+    return Decimal(value).quantize(_CENT)
+
+
+def quote(text):
+    """MariaDB 문자열 리터럴로 변환 (따옴표/백슬래시/제어문자 이스케이프)"""
+    if any(ch in _ESCAPES for ch in text):
+        text = ''.join(_ESCAPES.get(ch, ch) for ch in text)
+    return f"'{text}'"
+
+
+def format_value(value):
+    """파이썬 값을 SQL 리터럴로 변환 (None → NULL, str → 따옴표, 숫자 → 그대로)"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return quote(value)
+    return str(value)
+
+
+def format_row(values):
+    """행 튜플을 VALUES 절의 한 줄로 변환"""
+    return '(' + ', '.join(format_value(value) for value in values) + ')'
+
+
+class SqlWriter:
+    """SQL 파일에 구문과 행을 순차적으로 기록하는 작성기
+
+    사용 예:
+        with SqlWriter('out.sql') as sql:
+            sql.write("USE kpsdb;\\n\\n")
+            sql.insert('stock_current_price', ['stock_code', 'current_price'], rows)
+
+    max_bytes    - INSERT 구문 하나의 최대 바이트 수 (넘으면 새 INSERT 구문으로 분할)
+    max_rows     - INSERT 구문 하나의 최대 행 수 (None 이면 제한 없음)
+    commit_every - N 개 INSERT 구문마다 START TRANSACTION/COMMIT 으로 묶음 (None 이면 사용 안 함)
+    """
+
+    format_row = staticmethod(format_row)
+    format_value = staticmethod(format_value)
+
+    def __init__(self, path=None, mode='w', max_bytes=DEFAULT_MAX_BYTES, max_rows=None, commit_every=None):
+        # path가 None 또는 '-' 이면 표준출력으로 기록
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.commit_every = commit_every
+        self.statement_count = 0
+        self.file = None
+        self.row_counts = {}
+        self._table = None
+        self._header = None
+        self._pending_header = None
+        self._rows_in_statement = 0
+        self._statement_bytes = 0
+        self._comments = []
+        self._in_transaction = False
+        self._statements_in_transaction = 0
+
+    def __enter__(self):
+        if self.path in (None, '-'):
+            self.file = sys.stdout
+        else:
+            self.file = open(self.path, self.mode, encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._table is not None and exc_type is None:
+            self.end_insert()
+        if self._in_transaction and exc_type is None:
+            self._commit()
+        if self.file is not sys.stdout:
+            self.file.close()
+        else:
+            self.file.flush()
+        return False
+
+    def write(self, text):
+        """주석, DDL, 고정 INSERT 등 원문 그대로 기록"""
+        self.file.write(text)
+
+    def begin_insert(self, table, columns, continued=False):
+        """INSERT 구문 시작 (헤더는 첫 행이 들어올 때 기록, 이후 row() 로 행 추가)
+
+        continued=True 이면 파일에 이미 열려 있는 INSERT 에 이어서 행을 기록 (헤더 생략)
+        """
+        if self._table is not None:
+            self.end_insert()
+        self._table = table
+        self._header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n"
+        self._rows_in_statement = 0
+        self._pending_header = '' if continued else self._header
+
+    def comment(self, text):
+        """진행 중인 INSERT 의 다음 행 앞에 구분 주석 추가"""
+        self._comments.append(text)
+
+    def row(self, values):
+        """진행 중인 INSERT 에 한 행 기록"""
+        self.formatted_row(format_row(values))
+
+    def formatted_row(self, text):
+        """format_row() 로 이미 변환된 행 문자열 기록 (병렬 생성 결과 병합용)
+
+        바이트/행 수 한도를 넘게 되면 현재 구문을 닫고 같은 헤더로 새 INSERT 구문을 시작
+        (바이트 수는 구분자 ',\n', 앞에 붙는 주석, 구문 끝 ';' 까지 포함)
+        """
+        size = len(text) if text.isascii() else len(text.encode('utf-8'))
+        if self._rows_in_statement and (
+                (self.max_rows is not None and self._rows_in_statement >= self.max_rows)
+                or (self.max_bytes is not None
+                    and self._statement_bytes + 2 + self._comment_bytes() + size + 1 > self.max_bytes)):
+            self._close_statement()
+            self._pending_header = self._header
+
+        if self._rows_in_statement:
+            self.file.write(',\n')
+            self._statement_bytes += 2
+            if self._comments:
+                self.file.write('\n')
+                self._statement_bytes += 1
+        else:
+            if self.commit_every and not self._in_transaction:
+                self.file.write("START TRANSACTION;\n\n")
+                self._in_transaction = True
+            self.file.write(self._pending_header)
+            self._statement_bytes = len(self._pending_header.encode('utf-8'))
+        for comment in self._comments:
+            line = f"-- {comment}\n"
+            self.file.write(line)
+            self._statement_bytes += len(line.encode('utf-8'))
+        self._comments.clear()
+        self.file.write(text)
+        self._statement_bytes += size
+        self._rows_in_statement += 1
+        self.row_counts[self._table] = self.row_counts.get(self._table, 0) + 1
+
+    def _comment_bytes(self):
+        """다음 행 앞에 기록될 주석 줄 (이어지는 행이면 빈 줄 포함) 바이트 수"""
+        if not self._comments:
+            return 0
+        return sum(len(f"-- {comment}\n".encode('utf-8')) for comment in self._comments) + 1
+
+    def formatted_rows(self, lines, sizes=None):
+        """이미 변환된 행 문자열 여러 개를 한 번에 기록 (벡터화 생성 결과용)
+
+        sizes 는 각 행의 UTF-8 바이트 수 (None 이면 계산), 분할 규칙은 formatted_row() 와 동일
+        """
+        if sizes is None:
+            sizes = [len(line) if line.isascii() else len(line.encode('utf-8')) for line in lines]
+        start = 0
+        total = len(lines)
+        while start < total:
+            if not self._rows_in_statement or self._comments:
+                # 구문 첫 행과 주석이 붙는 행은 한 줄씩 기록
+                self.formatted_row(lines[start])
+                start += 1
+                continue
+
+            # 현재 구문에 이어 붙일 수 있는 행 수 (행마다 ',\n' 2바이트 추가, 구문 끝 ';' 1바이트 예약)
+            limit = total - start
+            if self.max_rows is not None:
+                limit = min(limit, self.max_rows - self._rows_in_statement)
+            if self.max_bytes is not None:
+                budget = self.max_bytes - self._statement_bytes - 1
+                limit = min(limit, max(0, budget // 3))
+                limit = bisect_right(list(accumulate(size + 2 for size in islice(sizes, start, start + limit))), budget)
+
+            if limit:
+                stop = start + limit
+                self.file.write(',\n')
+                self.file.write(',\n'.join(lines[start:stop]))
+                self._statement_bytes += sum(islice(sizes, start, stop)) + 2 * limit
+                self._rows_in_statement += limit
+                self.row_counts[self._table] = self.row_counts.get(self._table, 0) + limit
+                start = stop
+            if start < total:
+                self._close_statement()
+                self._pending_header = self._header
+
+    def end_insert(self):
+        """진행 중인 INSERT 구문 종료"""
+        if self._table is None:
+            return
+        self._comments.clear()
+        if self._rows_in_statement:
+            self._close_statement()
+        self._table = None
+        self._header = None
+        self._rows_in_statement = 0
+
+    def _close_statement(self):
+        self.file.write(';\n\n')
+        self._rows_in_statement = 0
+        self._statement_bytes = 0
+        self.statement_count += 1
+        if self._in_transaction:
+            self._statements_in_transaction += 1
+            if self._statements_in_transaction >= self.commit_every:
+                self._commit()
+
+    def _commit(self):
+        self.file.write("COMMIT;\n\n")
+        self._in_transaction = False
+        self._statements_in_transaction = 0
+
+    def insert(self, table, columns, rows):
+        """rows 이터러블을 소비하면서 INSERT 구문 하나를 기록하고 행 수 반환"""
+        before = self.row_counts.get(table, 0)
+        self.begin_insert(table, columns)
+        for values in rows:
+            self.row(values)
+        self.end_insert()
+        return self.row_counts.get(table, 0) - before
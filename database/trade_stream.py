@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+포지션 추적 매매내역 생성기
+(계좌, 종목) 별 보유수량 경로를 배열로 먼저 만들고 이웃한 보유수량의 차이를 매수/매도 주문으로 바꿔
+보유하지 않은 종목을 팔거나 보유수량보다 많이 파는 매매가 나오지 않게 생성
+마지막 보유수량은 고객잔고 수량과 같으므로 cost_basis.py 로 재생하면 잔고 수량이 그대로 맞음
+
+보유수량 경로 (종목마다 매매 n 건):
+    - 매매일은 0 ~ days 일 중 임의로 뽑아 정렬하고, 계좌 전체 매매를 일자순으로 다시 정렬
+      (일 = 영업일 순번, dataset_spec 은 trading_calendar 의 KRX 영업일 목록으로 날짜를 붙임)
+    - 중간 보유수량은 종목별 기준 수량 × 0.25 ~ 1.75 배, 매매 순번에 따라 짝/홀을 번갈아 맞춰
+      바로 앞 보유수량과 항상 다름 (수량 0 주문 없음)
+    - 일정 확률로 전량 매도 (보유수량 0) → 다음 매매는 신규 매수, 확률은 평균 보유기간이 holding_days 가 되도록
+      (매매 간격 / holding_days) 로 정함
+    - 마지막 매매 후 보유수량 = 고객잔고 수량
+    - 체결가는 현재가에서 거꾸로 간 로그 랜덤워크 (매매 간격 √일 × 일간 변동성)
+
+계좌 수만큼의 (계좌, 종목) 상태를 (계좌, 종목) 정수 배열 몇 개로만 다루므로 파이썬 루프 없이 계좌 묶음을 한 번에 생성
+dataset_spec.py 의 positions 규칙 (파이썬/numpy 백엔드 공통) 과 단일 계좌 생성 스크립트가 같은 함수를 사용
+"""
+
+import argparse
+import time
+import zlib
+
+import numpy as np
+
+from reference_data import BUY_SELL_CODES
+
+# 평균 보유기간 (일, 신규 매수 ~ 전량 매도)
+HOLDING_DAYS = 40
+
+# 일간 가격 변동성 (로그 수익률 표준편차)
+DAILY_VOLATILITY = 0.02
+
+# 종목별 매매 빈도 편차 (디리클레 집중도, 작을수록 일부 종목에 매매가 몰림)
+ACTIVITY_CONCENTRATION = 2.0
+
+# 중간 보유수량 = 기준 수량 × 이 구간의 균등분포
+POSITION_RANGE = (0.25, 1.75)
+
+# 전량 매도 확률 상한 (매매 간격이 보유기간보다 길어도 연속 청산/재매수만 반복하지 않도록)
+MAX_EXIT_PROBABILITY = 0.5
+
+
+def _group_starts(counts):
+    """그룹별 행 수 → 그룹 시작 위치 배열"""
+    return np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+
+def simulate_trades(rng, quantities, prices, trades, days, holding_days=HOLDING_DAYS, volatility=DAILY_VOLATILITY):
+    """계좌별 최종 보유수량 (계좌, 종목) 과 현재가 (계좌, 종목) → 계좌마다 trades 건의 매매 배열
+    trades 는 모든 계좌 공통 건수 또는 계좌별 건수 배열 (skew_sampling.account_sizes)
+
+    반환 dict (모든 배열 길이 = 계좌별 매매 건수 합계, 계좌 순서 → 매매일자 순서):
+        'slot'     - 계좌 안의 종목 위치 (quantities 의 열 번호)
+        'day'      - 기준일로부터 일수 (0 ~ days)
+        'sell'     - 매도 여부
+        'quantity' - 주문수량 (1 이상, 매도는 직전 보유수량 이하)
+        'won'      - 주문금액 (원, 주문수량 × 체결가)
+    """
+    quantities = np.asarray(quantities, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    accounts, slots = quantities.shape
+    trades = np.broadcast_to(np.asarray(trades, dtype=np.int64), (accounts,))
+    if (trades < slots).any():
+        raise ValueError(f"계좌별 매매 건수 {trades.min()}건이 보유 종목 수 {slots}개보다 적습니다 (종목마다 최소 1건 매수)")
+    if (quantities < 1).any():
+        raise ValueError("최종 보유수량은 1 이상이어야 합니다")
+
+    # 종목별 매매 건수: 최소 1건 + 나머지를 종목별 활동도 (디리클레) 비율로 다항 분배
+    activity = rng.gamma(ACTIVITY_CONCENTRATION, size=(accounts, slots))
+    activity /= activity.sum(axis=1, keepdims=True)
+    counts = (1 + rng.multinomial(trades - slots, activity)).ravel()
+    group = np.repeat(np.arange(accounts * slots), counts)
+    starts = _group_starts(counts)
+    step = np.arange(len(group)) - starts[group]
+    remaining = (counts[group] - 1) - step                                  # 이 매매 뒤에 남은 매매 수
+    first = step == 0
+    last = remaining == 0
+
+    # 매매일: (그룹, 일자) 정렬 → 그룹 안에서 일자 오름차순
+    span = days + 1
+    offset = group * span
+    day = np.sort(offset + rng.integers(0, span, len(group))) - offset
+
+    # 전량 매도: 첫/마지막 매매는 제외, 바로 앞 매매가 청산 후보였으면 제외 (연속 청산 방지)
+    gap = span / counts
+    exit_probability = np.minimum(gap / holding_days, MAX_EXIT_PROBABILITY)
+    drawn = (rng.random(len(group)) < exit_probability[group]) & ~first & ~last
+    closed = drawn.copy()
+    closed[1:] &= ~drawn[:-1]
+
+    # 보유수량 경로: 짝/홀을 매매마다 번갈아 (마지막이 최종 수량의 짝/홀) 맞춰 이웃한 값이 항상 다름
+    final = quantities.ravel()
+    base = final * np.exp(rng.normal(0.0, 0.5, len(final)))
+    parity = (final[group] + remaining) & 1
+    level = base[group] * rng.uniform(*POSITION_RANGE, len(group))
+    held = np.maximum(2 * (level.astype(np.int64) >> 1) + parity, 2 - parity)          # level > 0 이므로 내림 = 버림
+    held[closed] = 0
+    held[last] = final[group[last]]
+
+    before = np.empty_like(held)
+    before[1:] = held[:-1]
+    before[first] = 0
+    change = held - before
+
+    # 체결가: 마지막 매매 → 기준일 + days (현재가) 까지, 그리고 매매 사이 간격만큼 거꾸로 랜덤워크
+    following = np.empty_like(day)
+    following[:-1] = day[1:]
+    following[last] = days
+    shock = volatility * np.sqrt(following - day) * rng.standard_normal(len(group))
+    total = np.cumsum(shock)
+    ends = total[starts + counts - 1]
+    drift = ends[group] - total + shock                                    # 이 매매 이후 누적 변화
+    price = np.maximum(np.rint(prices.ravel()[group] * np.exp(-drift)), 1).astype(np.int64)
+
+    # 계좌 안에서 매매일자 순으로 정렬 (같은 날은 종목 순서, 같은 종목은 경로 순서 유지)
+    # 안정 argsort 대신 (계좌, 일자) 키 뒤에 행 번호 비트를 붙인 정수 하나로 일반 정렬 (키가 모두 달라 결과는 같고 몇 배 빠름)
+    account = group // slots
+    bits = len(group).bit_length()
+    order = np.sort(((account * span + day) << bits) | np.arange(len(group))) & ((1 << bits) - 1)
+    quantity = np.abs(change)[order]
+    return {
+        'slot': (group % slots)[order],
+        'day': day[order],
+        'sell': (change < 0)[order],
+        'quantity': quantity,
+        'won': quantity * price[order],
+    }
+
+
+def account_rng(seed, table, account):
+    """(seed, 테이블, 계좌) 별 독립 numpy 난수 스트림 (계좌 하나씩 생성하는 파이썬 경로용)"""
+    return np.random.default_rng([seed % 2 ** 63, zlib.crc32(f"{table}/{account}".encode('utf-8'))])
+
+
+def account_trades(rng, quantities, prices, trades, days, holding_days=HOLDING_DAYS):
+    """계좌 하나의 매매 목록 [(일수, 종목 위치, 매수매도구분코드, 주문수량, 주문금액(원))] (일자순)"""
+    stream = simulate_trades(rng, [quantities], [prices], trades, days, holding_days)
+    codes = np.array(BUY_SELL_CODES)[stream['sell'].astype(np.int64)]
+    return list(zip(stream['day'].tolist(), stream['slot'].tolist(), codes.tolist(),
+                    stream['quantity'].tolist(), stream['won'].tolist()))
+
+
+def replay(stream, accounts, slots, trades=None):
+    """매매 배열을 재생한 결과 (최종 보유수량 (계좌, 종목), 최소 보유수량 (계좌, 종목), 청산된 보유기간 배열 (일))
+
+    trades 는 계좌별 매매 건수 (생략하면 모든 계좌 같은 건수)
+    """
+    if trades is None:
+        trades = len(stream['slot']) // accounts
+    key = np.repeat(np.arange(accounts), trades) * slots + stream['slot']
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    signed = np.where(stream['sell'], -stream['quantity'], stream['quantity'])[order]
+    day = stream['day'][order]
+
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    total = np.cumsum(signed)
+    held = total - np.repeat(total[starts] - signed[starts], np.diff(np.r_[starts, len(key)]))
+    final = np.zeros(accounts * slots, dtype=np.int64)
+    final[key[starts]] = np.add.reduceat(signed, starts)
+    lowest = np.zeros(accounts * slots, dtype=np.int64)
+    lowest[key[starts]] = np.minimum.reduceat(held, starts)
+
+    # 보유기간: 보유수량 0 → 양수가 된 매매일 ~ 다시 0 이 된 매매일
+    opened = signed > 0
+    opened[1:] &= (held[:-1] == 0) | (key[1:] != key[:-1])
+    closing = np.flatnonzero(held == 0)
+    open_rows = np.flatnonzero(opened)
+    paired = open_rows[np.searchsorted(open_rows, closing) - 1]
+    return final.reshape(accounts, slots), lowest.reshape(accounts, slots), day[closing] - day[paired]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='포지션 추적 매매내역 생성 속도와 보유수량 정합성 점검')
+    parser.add_argument('--accounts', type=int, default=100000, help='계좌 수')
+    parser.add_argument('--trades', type=int, default=930, help='계좌별 매매 건수')
+    parser.add_argument('--slots', type=int, default=20, help='계좌별 보유 종목 수')
+    parser.add_argument('--days', type=int, default=300, help='매매 기간 (일)')
+    parser.add_argument('--holding-days', type=float, default=HOLDING_DAYS, help='평균 보유기간 (일)')
+    parser.add_argument('--batch', type=int, default=1024, help='한 번에 생성하는 계좌 수')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    generated = 0
+    oversold = 0
+    mismatched = 0
+    holding = []
+    elapsed = 0.0
+    for first in range(0, args.accounts, args.batch):
+        size = min(args.batch, args.accounts - first)
+        quantities = rng.integers(1, 500, (size, args.slots))
+        prices = rng.integers(1000, 900000, (size, args.slots))
+        started = time.perf_counter()
+        stream = simulate_trades(rng, quantities, prices, args.trades, args.days, args.holding_days)
+        elapsed += time.perf_counter() - started
+        final, lowest, periods = replay(stream, size, args.slots)
+        generated += len(stream['slot'])
+        oversold += int((lowest < 0).sum())
+        mismatched += int((final != quantities).sum())
+        holding.append(periods)
+
+    holding = np.concatenate(holding)
+    print(f"🔄 계좌 {args.accounts:,}개 × 매매 {args.trades:,}건 = {generated:,}건 "
+          f"({elapsed:.2f}초, 분당 {generated / elapsed * 60:,.0f}건)")
+    print(f"   보유수량 음수 (초과 매도) (계좌, 종목): {oversold:,}개")
+    print(f"   최종 보유수량 ≠ 잔고 수량 (계좌, 종목): {mismatched:,}개")
+    if len(holding):
+        print(f"   청산 {len(holding):,}회, 보유기간 평균 {holding.mean():.1f}일 / 중앙값 {np.median(holding):.0f}일")
+    if oversold or mismatched:
+        raise SystemExit(1)
+    print("✅ 모든 매도가 보유수량 이내이고 최종 보유수량이 잔고와 일치")
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+KRX 거래일 달력
+주말과 KRX 휴장일 (공휴일, 근로자의 날, 연말 휴장일, 선거일, 임시공휴일) 을 뺀 영업일을
+datetime64[D] 배열 하나와 "달력일 → 영업일 순번" 배열로 미리 만들어 두고,
+"n 영업일 뒤", "구간 안 임의 영업일", "월별 묶음" 을 날짜 배열 단위로 한 번에 계산
+
+영업일 순번 (ordinal) = 달력 첫 영업일부터 센 0 기반 번호
+순번끼리 더하고 빼면 영업일 이동/간격이 되고, strings() 의 YYYYMMDD 목록을 순번으로 바로 꺼내 쓸 수 있어
+생성기/시뮬레이터가 행마다 strptime/timedelta 를 호출하지 않음
+
+휴장일:
+    FIXED_HOLIDAYS  - 매년 같은 날 (양력 공휴일, 근로자의 날)
+    LISTED_HOLIDAYS - 해마다 바뀌는 날 (설날·추석 연휴, 부처님오신날, 대체공휴일, 선거일, 임시공휴일),
+                      목록에 없는 해는 매년 같은 날과 연말 휴장일만 반영 → 새 해 휴장일 공지가 나오면 목록에 추가
+                      (기본 달력은 긴 합성 시세 기간을 위해 목록보다 넓으므로, 목록에 없는 해의 날짜를 쓰면 해마다 한 번 경고)
+    연말 휴장일       - 12월 마지막 영업일
+"""
+
+import argparse
+import warnings
+from datetime import date, datetime
+
+import numpy as np
+
+# 달력 범위 (이 구간 밖 날짜는 ValueError)
+CALENDAR_START = '19900101'
+CALENDAR_END = '20351231'
+
+# 매년 같은 날짜의 휴장일 (MMDD): 신정, 삼일절, 근로자의 날, 어린이날, 현충일, 광복절, 개천절, 한글날, 성탄절
+FIXED_HOLIDAYS = ['0101', '0301', '0501', '0505', '0606', '0815', '1003', '1009', '1225']
+
+# 해마다 날짜가 바뀌는 휴장일 (MMDD, KRX 휴장일 공지 기준)
+LISTED_HOLIDAYS = {
+    2014: ['0130', '0131', '0201', '0506', '0604', '0908', '0909', '0910'],
+    2015: ['0218', '0219', '0220', '0525', '0814', '0926', '0927', '0928', '0929'],
+    2016: ['0207', '0208', '0209', '0210', '0413', '0506', '0514', '0914', '0915', '0916'],
+    2017: ['0127', '0128', '0129', '0130', '0503', '0509', '1002', '1004', '1005', '1006'],
+    2018: ['0215', '0216', '0217', '0507', '0522', '0613', '0923', '0924', '0925', '0926'],
+    2019: ['0204', '0205', '0206', '0506', '0512', '0912', '0913', '0914'],
+    2020: ['0124', '0125', '0126', '0127', '0415', '0430', '0817', '0930', '1001', '1002'],
+    2021: ['0211', '0212', '0213', '0519', '0816', '0920', '0921', '0922', '1004', '1011'],
+    2022: ['0131', '0201', '0202', '0309', '0508', '0601', '0909', '0910', '0911', '0912', '1010'],
+    2023: ['0121', '0122', '0123', '0124', '0527', '0529', '0928', '0929', '0930', '1002'],
+    2024: ['0209', '0210', '0211', '0212', '0410', '0506', '0515', '0916', '0917', '0918', '1001'],
+    2025: ['0127', '0128', '0129', '0130', '0303', '0506', '0603', '1005', '1006', '1007', '1008'],
+    2026: ['0216', '0217', '0218', '0302', '0524', '0525', '0603', '0817', '0924', '0925', '0926', '1005'],
+}
+
+ROLLS = ('forward', 'backward', 'raise')
+
+
+def to_days(values):
+    """YYYYMMDD 문자열/정수, date, datetime64 (또는 그 배열) → datetime64[D] (스칼라는 0차원 배열)"""
+    if isinstance(values, (date, datetime)):
+        return np.datetime64(values.strftime('%Y-%m-%d'), 'D')
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    number = values.astype(np.int64)
+    year, rest = np.divmod(number, 10000)
+    month, day = np.divmod(rest, 100)
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (day - 1)
+    # 월 범위를 벗어나거나 그 달에 없는 날 (20250231 → 3월로 넘어감) 은 되돌렸을 때 같은 달이 아님
+    invalid = (month < 1) | (month > 12) | (day < 1) | (days.astype('datetime64[M]') != months)
+    if invalid.any():
+        raise ValueError(f"존재하지 않는 YYYYMMDD 날짜가 있습니다: {values[invalid].ravel()[:5].tolist()}")
+    return days
+
+
+def krx_holidays(first_year, last_year):
+    """first_year ~ last_year 의 KRX 휴장일 (평일만, 정렬된 datetime64[D] 배열)"""
+    holidays = []
+    for year in range(first_year, last_year + 1):
+        holidays += [f"{year}{day}" for day in FIXED_HOLIDAYS + LISTED_HOLIDAYS.get(year, [])]
+    holidays = np.unique(to_days(holidays))
+    holidays = holidays[np.is_busday(holidays)]
+
+    # 연말 휴장일: 12월 31일부터 거꾸로 찾은 첫 영업일
+    year_ends = to_days([f"{year}1231" for year in range(first_year, last_year + 1)])
+    closing = np.busday_offset(year_ends, 0, roll='backward', holidays=holidays)
+    return np.union1d(holidays, closing)
+
+
+class TradingCalendar:
+    """KRX 영업일 달력 (영업일 배열 + 달력일별 영업일 순번 표)
+
+    사용 예:
+        calendar = krx_calendar()
+        ordinals = calendar.random(rng, '20250801', '20250831', 1000)   # 8월 중 임의 영업일 순번
+        settled = calendar.offset(calendar.dates(ordinals), 2)           # T+2 결제일
+        labels = calendar.strings()                                      # 순번 → YYYYMMDD
+    """
+
+    def __init__(self, start=CALENDAR_START, end=CALENDAR_END, holidays=None):
+        self.start = to_days(start)
+        self.end = to_days(end)
+        # 기본 KRX 휴장일이면 휴장일 목록에 없는 해를 쓸 때 경고 (직접 준 휴장일은 그대로 믿음)
+        self._unlisted = set()
+        if holidays is None:
+            first_year, last_year = self.start.astype(object).year, self.end.astype(object).year
+            holidays = krx_holidays(first_year, last_year)
+            self._unlisted = set(range(first_year, last_year + 1)) - set(LISTED_HOLIDAYS)
+        self.holidays = to_days(holidays)
+
+        calendar_days = np.arange(self.start, self.end + 1)
+        self._open = np.is_busday(calendar_days, holidays=self.holidays)
+        self.days = calendar_days[self._open]
+        # 달력일 → 그 날 또는 그 뒤 첫 영업일의 순번 (그 날 이전 영업일 수)
+        self._forward = np.cumsum(self._open) - self._open
+        self._strings = None
+
+    def __len__(self):
+        return len(self.days)
+
+    def _check_listed(self, days):
+        """휴장일 목록에 없는 해의 날짜가 있으면 (그 해는 매년 같은 휴장일과 연말 휴장일만 반영) 해마다 한 번 경고"""
+        if not self._unlisted or not np.size(days):
+            return
+        first, last = (int(day.astype('datetime64[Y]').astype(np.int64)) + 1970 for day in (days.min(), days.max()))
+        years = sorted(self._unlisted.intersection(range(first, last + 1)))
+        if years:
+            self._unlisted.difference_update(years)
+            warnings.warn(f"KRX 휴장일 목록(LISTED_HOLIDAYS)에 없는 연도 {', '.join(map(str, years))} 는 "
+                          f"설날·추석 등 해마다 바뀌는 휴장일이 빠진 달력입니다", stacklevel=3)
+
+    def _calendar_index(self, dates):
+        days = to_days(dates)
+        index = (days - self.start).astype(np.int64)
+        if ((index < 0) | (index >= len(self._open))).any():
+            raise ValueError(f"달력 범위 밖의 날짜가 있습니다 (범위 {self.label(0)} ~ {self.label(len(self) - 1)})")
+        self._check_listed(days)
+        return index
+
+    def is_open(self, dates):
+        """영업일 여부"""
+        return self._open[self._calendar_index(dates)]
+
+    def ordinal(self, dates, roll='forward'):
+        """날짜 → 영업일 순번 (휴장일은 roll 에 따라 다음/이전 영업일, 'raise' 면 ValueError)"""
+        if roll not in ROLLS:
+            raise ValueError(f"roll 은 {', '.join(ROLLS)} 중 하나여야 합니다: {roll}")
+        index = self._calendar_index(dates)
+        closed = ~self._open[index]
+        if roll == 'raise' and closed.any():
+            raise ValueError("영업일이 아닌 날짜가 있습니다")
+        ordinal = self._forward[index]
+        if roll == 'backward':
+            ordinal = ordinal - closed
+        if ((ordinal < 0) | (ordinal >= len(self))).any():
+            raise ValueError("달력 범위 밖으로 넘어가는 영업일이 있습니다")
+        return ordinal
+
+    def dates(self, ordinals):
+        """영업일 순번 → datetime64[D]"""
+        days = self.days[ordinals]
+        self._check_listed(days)
+        return days
+
+    def strings(self, first=None, last=None):
+        """영업일 YYYYMMDD 문자열 목록 (순번 first ~ last, 기본 전체) - 순번으로 바로 꺼내 쓰는 값 목록"""
+        if self._strings is None:
+            self._strings = [text.replace('-', '') for text in np.datetime_as_string(self.days, unit='D')]
+        first = 0 if first is None else first
+        last = len(self) - 1 if last is None else last
+        return self._strings[first:last + 1]
+
+    def label(self, ordinal):
+        """영업일 순번 하나 → YYYYMMDD"""
+        return self.strings(ordinal, ordinal)[0]
+
+    def span(self, start, end):
+        """start ~ end 안의 (첫 영업일 순번, 마지막 영업일 순번)"""
+        first, last = self.ordinal(start, 'forward'), self.ordinal(end, 'backward')
+        if first > last:
+            raise ValueError(f"{start} ~ {end} 사이에 영업일이 없습니다")
+        return int(first), int(last)
+
+    def offset(self, dates, count, roll='forward'):
+        """날짜마다 count 영업일 뒤 (음수면 앞) 의 날짜 (datetime64[D])"""
+        ordinal = self.ordinal(dates, roll) + np.asarray(count)
+        if ((ordinal < 0) | (ordinal >= len(self))).any():
+            raise ValueError("달력 범위 밖으로 넘어가는 영업일이 있습니다")
+        return self.dates(ordinal)
+
+    def between(self, start, end):
+        """start ~ end 안의 영업일 수"""
+        return self.ordinal(end, 'backward') - self.ordinal(start, 'forward') + 1
+
+    def random(self, rng, start, end, size=None):
+        """start ~ end 안에서 고르게 뽑은 영업일 순번 (numpy Generator)"""
+        first, last = self.span(start, end)
+        return rng.integers(first, last + 1, size)
+
+    def recent(self, end, count):
+        """end 또는 그 이전 마지막 영업일까지의 최근 영업일 count 개 (datetime64[D] 배열)"""
+        last = int(self.ordinal(end, 'backward'))
+        if last + 1 < count:
+            raise ValueError(f"{end} 이전 영업일이 {count:,}개보다 적습니다 (달력 시작 {self.label(0)})")
+        return self.dates(slice(last + 1 - count, last + 1))
+
+    def months(self, ordinals):
+        """영업일 순번 → 월 번호 (1970년 1월 = 0, datetime64[M] 정수값) - 월별 묶음 키"""
+        return self.days[ordinals].astype('datetime64[M]').astype(np.int64)
+
+    def month_bounds(self, start=None, end=None):
+        """월별 묶음: (월 (datetime64[M]), 월 첫 영업일 순번, 월 마지막 영업일 순번) 배열"""
+        first, last = self.span(start or self.start, end or self.end)
+        months = self.days[first:last + 1].astype('datetime64[M]')
+        keys, starts = np.unique(months, return_index=True)
+        ends = np.r_[starts[1:], len(months)] - 1
+        return keys, starts + first, ends + first
+
+
+_DEFAULT = None
+
+
+def krx_calendar():
+    """기본 KRX 달력 (프로세스당 한 번만 생성)"""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = TradingCalendar()
+    return _DEFAULT
+
+
+def business_days(start, days):
+    """기준일(YYYYMMDD) ~ 기준일 + days 일 중 KRX 영업일 YYYYMMDD 목록"""
+    calendar = krx_calendar()
+    return calendar.strings(*calendar.span(start, to_days(start) + days))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='KRX 거래일 달력 조회')
+    parser.add_argument('--year', type=int, default=datetime.now().year, help='휴장일/영업일 수를 볼 연도')
+    parser.add_argument('--offset', nargs=2, metavar=('YYYYMMDD', 'N'), help='날짜로부터 N 영업일 뒤 날짜')
+    args = parser.parse_args()
+
+    calendar = krx_calendar()
+    if args.offset:
+        moved = calendar.offset(args.offset[0], int(args.offset[1]))
+        print(f"📅 {args.offset[0]} + {int(args.offset[1])} 영업일 = {str(moved).replace('-', '')}")
+    else:
+        first, last = f"{args.year}0101", f"{args.year}1231"
+        holidays = calendar.holidays[(calendar.holidays >= to_days(first)) & (calendar.holidays <= to_days(last))]
+        print(f"📅 {args.year}년 KRX 영업일 {int(calendar.between(first, last))}일, 평일 휴장일 {len(holidays)}일"
+              + ("" if args.year in LISTED_HOLIDAYS else " (휴장일 목록에 없는 해: 매년 같은 날짜만 반영)"))
+        for day in holidays:
+            print(f"   - {str(day).replace('-', '')} ({'월화수목금토일'[day.astype(datetime).weekday()]})")
+        keys, starts, ends = calendar.month_bounds(first, last)
+        print("   월별 영업일: " + ", ".join(f"{str(key)[5:]}월 {end - start + 1}일"
+                                        for key, start, end in zip(keys, starts, ends)))
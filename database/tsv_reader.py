@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LOAD DATA 형식 TSV 컬럼 단위 읽기 (TsvWriter 출력, SELECT ... INTO OUTFILE 결과)
+줄마다 split 하는 파이썬 루프 없이 파일을 블록 단위 바이트 배열로 읽어 탭/개행 위치로 필드 경계를 구하고,
+필요한 컬럼만 고정폭 바이트 행렬로 모아 문자열/정수 배열로 한꺼번에 변환 (수천만 행도 수 초)
+
+필드 안의 탭/개행은 이스케이프(\\t, \\n)되어 있으므로 구분자와 섞이지 않음
+문자열 컬럼은 이스케이프를 풀지 않으므로 코드/번호처럼 특수문자가 없는 컬럼에 사용
+"""
+
+import os
+import re
+
+import numpy as np
+
+from dataset_spec import parse_schema
+
+# 한 번에 읽는 블록 크기 (줄 경계에서 자름)
+BLOCK_BYTES = 64 * 1024 * 1024
+
+_TAB = 9
+_NEWLINE = 10
+_LOAD_STATEMENT = re.compile(r"INTO TABLE (\w+).*?\n\(([^)]*)\);", re.DOTALL)
+
+
+def loader_columns(directory, loader_name='load_data.sql'):
+    """TsvWriter 로더 SQL 에서 테이블별 컬럼 순서 {테이블: [컬럼]} (로더가 없으면 빈 dict)"""
+    path = os.path.join(directory, loader_name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return {table: [name.strip() for name in columns.split(',')]
+            for table, columns in _LOAD_STATEMENT.findall(content)}
+
+
+def table_columns(directory, table, extra=(), schema=None):
+    """TSV 파일의 컬럼 순서: 로더 SQL 이 있으면 그 순서, 없으면 스키마 순서 + extra (ALTER 로 뒤에 추가된 컬럼)"""
+    columns = loader_columns(directory).get(table)
+    if columns:
+        return columns
+    schema = parse_schema() if schema is None else schema
+    return list(schema[table]['columns']) + list(extra)
+
+
+def read_blocks(path, block=BLOCK_BYTES):
+    """파일을 줄 경계에서 자른 block 바이트 내외의 uint8 배열로 yield"""
+    rest = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(block)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            cut = chunk.rfind(b'\n') + 1
+            rest = chunk[cut:]
+            if cut:
+                yield np.frombuffer(chunk, dtype=np.uint8, count=cut)
+    if rest:
+        yield np.frombuffer(rest + b'\n', dtype=np.uint8)
+
+
+def field_bounds(data, fields):
+    """블록의 필드 경계 (시작, 끝) 각각 (줄 수, fields) 배열 (끝은 구분자 위치)"""
+    ends = np.flatnonzero((data == _TAB) | (data == _NEWLINE))
+    if len(ends) % fields:
+        raise ValueError(f"TSV 필드 수가 컬럼 수({fields})와 맞지 않습니다")
+    ends = ends.reshape(-1, fields)
+    starts = np.empty_like(ends)
+    starts[:, 1:] = ends[:, :-1] + 1
+    starts[0, 0] = 0
+    starts[1:, 0] = ends[:-1, -1] + 1
+    return starts, ends
+
+
+def field_bytes(data, starts, ends):
+    """필드들을 최대 길이에 맞춘 (행 수, 폭) uint8 행렬로 (남는 칸은 0 바이트)"""
+    lengths = ends - starts
+    width = max(int(lengths.max(initial=0)), 1)
+    offsets = np.arange(width)
+    matrix = data[np.minimum(starts[:, None] + offsets, len(data) - 1)]
+    matrix[offsets >= lengths[:, None]] = 0
+    return matrix
+
+
+def text_values(data, starts, ends):
+    """필드를 바이트 문자열 배열 (dtype S폭) 로"""
+    matrix = field_bytes(data, starts, ends)
+    return np.ascontiguousarray(matrix).view(f"S{matrix.shape[1]}").ravel()
+
+
+def number_values(data, starts, ends, decimals=0):
+    """숫자 필드 ('-12.5', '300', '\\N') 를 소수점 decimals 자리로 스케일한 int64 배열로 (NULL 은 0, 남는 자리는 버림)"""
+    matrix = field_bytes(data, starts, ends)
+    width = matrix.shape[1]
+    positions = np.arange(width)
+    is_dot = matrix == ord('.')
+    dot = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), ends - starts)
+    # 정수부 자리 p 의 10 지수 = dot - p - 1 + decimals, 소수부 = dot - p + decimals
+    exponent = dot[:, None] - positions + decimals - (positions < dot[:, None])
+    digit = (matrix >= ord('0')) & (matrix <= ord('9')) & (exponent >= 0)
+    powers = 10 ** np.minimum(np.maximum(exponent, 0), 18)
+    values = np.where(digit, (matrix.astype(np.int64) - ord('0')) * powers, 0).sum(axis=1)
+    return np.where(matrix[:, 0] == ord('-'), -values, values)
+
+
+def read_columns(path, columns, wanted, block=BLOCK_BYTES):
+    """TSV 파일에서 wanted {컬럼명: 형식} 컬럼만 읽어 {컬럼명: 배열}
+
+    형식: 'text' (바이트 문자열 배열) 또는 정수 decimals (소수점 decimals 자리로 스케일한 int64)
+    """
+    missing = [name for name in wanted if name not in columns]
+    if missing:
+        raise ValueError(f"{path}: {', '.join(missing)} 컬럼이 없습니다 (컬럼: {', '.join(columns)})")
+    parts = {name: [] for name in wanted}
+    for data in read_blocks(path, block):
+        starts, ends = field_bounds(data, len(columns))
+        for name, kind in wanted.items():
+            at = columns.index(name)
+            if kind == 'text':
+                parts[name].append(text_values(data, starts[:, at], ends[:, at]))
+            else:
+                parts[name].append(number_values(data, starts[:, at], ends[:, at], kind))
+    result = {}
+    for name, kind in wanted.items():
+        if not parts[name]:
+            result[name] = np.zeros(0, dtype='S1' if kind == 'text' else np.int64)
+        elif kind == 'text':
+            # 블록마다 폭이 다를 수 있으므로 가장 넓은 폭으로 맞춰 이어 붙임
+            width = max(part.dtype.itemsize for part in parts[name])
+            result[name] = np.concatenate([part.astype(f"S{width}") for part in parts[name]])
+        else:
+            result[name] = np.concatenate(parts[name])
+    return result
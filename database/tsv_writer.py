@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LOAD DATA 용 TSV 작성기
+테이블마다 TSV 파일 하나를 기록하고, 참조 순서대로 적재하는 로더 SQL(load_data.sql)을 함께 생성
+SqlWriter 와 같은 인터페이스(begin_insert/row/end_insert/insert)로 사용 가능
+"""
+
+import os
+
+from sql_writer import SqlWriter, quote
+
+# LOAD DATA 기본 이스케이프 (FIELDS ESCAPED BY '\\')
+_ESCAPES = {
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+}
+
+NULL = '\\N'
+
+
+def format_field(value):
+    """파이썬 값을 TSV 필드로 변환 (None → \\N, 탭/개행/백슬래시 이스케이프)"""
+    if value is None:
+        return NULL
+    text = str(value)
+    if any(ch in _ESCAPES for ch in text):
+        text = ''.join(_ESCAPES.get(ch, ch) for ch in text)
+    return text
+
+
+def format_line(values):
+    """행 튜플을 TSV 한 줄(개행 제외)로 변환"""
+    return '\t'.join(format_field(value) for value in values)
+
+
+def load_statement(path, table, columns):
+    """TSV 파일 하나를 적재하는 LOAD DATA 구문"""
+    return (f"LOAD DATA LOCAL INFILE {quote(path)}\n"
+            f"INTO TABLE {table}\n"
+            f"CHARACTER SET utf8mb4\n"
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n"
+            f"LINES TERMINATED BY '\\n'\n"
+            f"({', '.join(columns)});\n\n")
+
+
+class TsvWriter:
+    """테이블별 TSV 파일과 로더 SQL 을 기록하는 작성기
+
+    사용 예:
+        with TsvWriter('dataset_tsv') as tsv:
+            tsv.write("USE kpsdb;\\n\\n")
+            tsv.insert('stock_current_price', ['stock_code', 'current_price'], rows)
+        # mysql --local-infile=1 kpsdb < dataset_tsv/load_data.sql
+    """
+
+    format_row = staticmethod(format_line)
+    format_value = staticmethod(format_field)
+
+    def __init__(self, directory, loader_name='load_data.sql'):
+        self.directory = directory
+        self.loader_path = os.path.join(directory, loader_name)
+        self.loader = None
+        self.file = None
+        self.row_counts = {}
+        self._table = None
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.loader = open(self.loader_path, 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._table is not None and exc_type is None:
+            self.end_insert()
+        if self.file is not None:
+            self.file.close()
+        self.loader.close()
+        return False
+
+    def write(self, text):
+        """로더 SQL 에 주석/구문 원문 기록"""
+        self.loader.write(text)
+
+    def begin_insert(self, table, columns, continued=False):
+        """테이블 TSV 파일을 열고 로더 SQL 에 LOAD DATA 구문 추가"""
+        if self._table is not None:
+            self.end_insert()
+        path = os.path.join(self.directory, f"{table}.tsv")
+        self.file = open(path, 'a' if continued else 'w', encoding='utf-8', newline='')
+        self._table = table
+        if not continued:
+            self.loader.write(load_statement(os.path.abspath(path), table, columns))
+
+    def comment(self, text):
+        """TSV 에는 주석을 넣을 수 없으므로 무시 (SqlWriter 호환용)"""
+
+    def row(self, values):
+        """진행 중인 테이블 파일에 한 행 기록"""
+        self.formatted_row(format_line(values))
+
+    def formatted_row(self, text):
+        """format_line() 으로 이미 변환된 행 문자열 기록 (병렬 생성 결과 병합용)"""
+        self.file.write(text)
+        self.file.write('\n')
+        self.row_counts[self._table] = self.row_counts.get(self._table, 0) + 1
+
+    def formatted_rows(self, lines, sizes=None):
+        """이미 변환된 행 문자열 여러 개를 한 번에 기록 (벡터화 생성 결과용, sizes 는 SqlWriter 호환용)"""
+        if not lines:
+            return
+        self.file.write('\n'.join(lines))
+        self.file.write('\n')
+        self.row_counts[self._table] = self.row_counts.get(self._table, 0) + len(lines)
+
+    def end_insert(self):
+        """진행 중인 테이블 파일 닫기"""
+        if self._table is None:
+            return
+        self.file.close()
+        self.file = None
+        self._table = None
+
+    def insert(self, table, columns, rows):
+        """rows 이터러블을 소비하면서 테이블 TSV 파일 하나를 기록하고 행 수 반환"""
+        before = self.row_counts.get(table, 0)
+        self.begin_insert(table, columns)
+        for values in rows:
+            self.row(values)
+        self.end_insert()
+        return self.row_counts.get(table, 0) - before
+
+
+# 출력 형식별 작성기 (sql: INSERT 구문 파일, tsv: 테이블별 TSV + LOAD DATA 로더 SQL 디렉터리)
+WRITERS = {
+    'sql': SqlWriter,
+    'tsv': TsvWriter,
+}
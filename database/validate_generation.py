@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+생성기 회귀 점검 스크립트
+작은 규모 (기본 계좌 70개) 로 생성기들을 직접 실행해 앞선 변경이 세운 불변 조건이 유지되는지 확인
+seed 가 고정이라 결과는 항상 같고, 전체가 20초 안팎이면 끝나므로 생성 코드를 고친 뒤마다 실행
+
+점검 항목:
+    - 영업일 달력: 존재하지 않는 YYYYMMDD 는 ValueError
+    - SqlWriter: 행 단위/일괄 기록 모두 INSERT 구문 하나가 max_bytes (구문 끝 ';' 포함) 를 넘지 않음
+    - trade_stream: 초과 매도 없음, 마지막 보유수량 = 잔고 수량
+    - 병렬 생성: --skew 스펙을 작업자 1개/3개로 만든 SQL 파일이 (생성일시 줄 외에) 같음
+    - python/numpy 백엔드: 난수 생성기가 달라 값은 다르므로 불변 조건으로 비교
+      (테이블별 행 수, 공용 테이블 행, 계좌별 행 수, PK/UNIQUE/FK 무결성,
+       cost_basis 재생 보유수량 = customer_balance 수량, 계좌별 리밸런싱 비중 합 = 100)
+    - order_matching: 주문마다 체결 수량 합 = 주문 수량, 같은 seed 면 같은 체결
+    - rebalancing_simulator: --chunk 값과 관계없이 같은 매매내역 파일
+
+실패가 하나라도 있으면 종료 코드 1
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from decimal import Decimal
+
+import numpy as np
+
+import cost_basis
+import order_matching
+import rebalancing_simulator
+import trade_stream
+from dataset_spec import DEFAULT_SPEC, DatasetGenerator, generate, skewed_spec
+from integrity_checker import check_dump
+from price_history import simulate
+from price_store import PriceStore, write_history_store
+from sql_reader import read_rows
+from sql_writer import SqlWriter, format_row
+from trading_calendar import to_days
+
+# numpy 백엔드 블록 경계 (BLOCK_ACCOUNTS) 를 넘는 계좌 수
+DEFAULT_SCALE = 70
+
+# 병렬 생성 점검 배율 (skew 스펙은 큰 계좌가 기본 건수의 수십 배라 작게)
+WORKERS_SCALE = 6
+
+# SqlWriter 크기 한도 점검에 쓰는 구문당 최대 바이트 수
+# (헤더 + 주석 + 가장 긴 행 (약 80바이트) 이 겨우 들어가는 값부터 여러 행이 들어가는 값까지)
+FUZZ_MAX_BYTES = (150, 200, 333, 1000)
+
+
+def quiet(function, *args, **kwargs):
+    """생성기 진행 출력 없이 실행"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def check_calendar():
+    """to_days 가 존재하지 않는 날짜를 다음 달로 넘기지 않고 거부하는지"""
+    failures = []
+    if str(to_days('20240229')) != '2024-02-29':
+        failures.append("20240229 를 2024-02-29 로 바꾸지 못함")
+    for value in ('20250231', '20230229', '20251301', '20250100'):
+        try:
+            to_days(value)
+        except ValueError:
+            continue
+        failures.append(f"{value} 가 ValueError 없이 통과")
+    return failures
+
+
+def check_sql_writer(seed):
+    """임의 길이 (한글 포함) 행을 formatted_row/formatted_rows 로 섞어 쓰고 구문별 바이트 수 확인"""
+    rng = random.Random(seed)
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='validate_sql_') as directory:
+        path = os.path.join(directory, 'fuzz.sql')
+        for max_bytes in FUZZ_MAX_BYTES:
+            rows = [format_row((rng.randrange(10 ** 6), ''.join(rng.choice('ab가나') for _ in range(rng.randrange(20)))))
+                    for _ in range(2000)]
+            with SqlWriter(path, max_bytes=max_bytes, commit_every=rng.choice([None, 3])) as sql:
+                sql.begin_insert('fuzz', ['id', 'name'])
+                start = 0
+                while start < len(rows):
+                    stop = start + rng.randrange(1, 50)
+                    if rng.random() < 0.1:
+                        sql.comment(f"구간 {start}")
+                    if rng.random() < 0.5:
+                        for line in rows[start:stop]:
+                            sql.formatted_row(line)
+                    else:
+                        sql.formatted_rows(rows[start:stop])
+                    start = stop
+                sql.end_insert()
+            with open(path, 'r', encoding='utf-8') as f:
+                statements = [text for text in f.read().split(';\n\n') if 'INSERT INTO' in text]
+            largest = max(len((text[text.index('INSERT INTO'):] + ';').encode('utf-8')) for text in statements)
+            if largest > max_bytes:
+                failures.append(f"max_bytes={max_bytes}: {largest}바이트 구문")
+            if sql.row_counts.get('fuzz') != len(rows):
+                failures.append(f"max_bytes={max_bytes}: {len(rows)}행 중 {sql.row_counts.get('fuzz')}행 기록")
+    return failures
+
+
+def check_trade_stream(seed):
+    """계좌별 매매 건수가 다른 (종목 수와 같은 최소 건수 포함) 매매 흐름을 재생해 보유수량 확인"""
+    rng = np.random.default_rng(seed)
+    accounts, slots = 300, 12
+    quantities = rng.integers(1, 500, (accounts, slots))
+    prices = rng.integers(1000, 900000, (accounts, slots))
+    trades = rng.integers(slots, 200, accounts)
+    trades[0] = slots
+    stream = trade_stream.simulate_trades(rng, quantities, prices, trades, 250)
+    final, lowest, _ = trade_stream.replay(stream, accounts, slots, trades)
+    failures = []
+    if (lowest < 0).any():
+        failures.append(f"초과 매도 (계좌, 종목) {int((lowest < 0).sum())}개")
+    if (final != quantities).any():
+        failures.append(f"최종 보유수량 ≠ 잔고 수량 (계좌, 종목) {int((final != quantities).sum())}개")
+    if (stream['quantity'] < 1).any():
+        failures.append("수량 0 이하 주문")
+    return failures
+
+
+def dump_rows(path, tables):
+    """덤프의 테이블별 행 목록"""
+    rows = {table: [] for table in tables}
+    for table, _, values in read_rows(path, tables):
+        rows[table].append(tuple(values))
+    return rows
+
+
+def account_counts(path, tables):
+    """덤프의 테이블별 계좌번호 → 행 수"""
+    counts = {table: Counter() for table in tables}
+    for table, columns, values in read_rows(path, tables):
+        counts[table][values[columns.index('account_number')]] += 1
+    return counts
+
+
+def check_dump_invariants(path):
+    """백엔드와 관계없이 생성 결과가 지켜야 하는 조건 (무결성, 보유수량 재생, 비중 합)"""
+    failures = []
+    checker = quiet(check_dump, path)
+    if not checker.is_valid:
+        failures.append(f"PK/UNIQUE/FK 위반 {sum(checker.violation_counts.values()):,}건")
+
+    trades, balances = cost_basis.load_dump(path)
+    result = cost_basis.replay(trades)
+    if result['oversold'].sum():
+        failures.append(f"보유수량을 넘는 매도 {int(result['oversold'].sum()):,}건")
+    differences = cost_basis.diff_balances(result, balances)
+    for name in ('수량 불일치', '기존 잔고에 없음', '매매내역에 없음'):
+        if differences[name]:
+            failures.append(f"cost_basis {name} {len(differences[name]):,}건")
+
+    weights = Counter()
+    for _, columns, values in read_rows(path, ['customer_balance']):
+        weight = values[columns.index('rebalancing_target_weight')]
+        weights[values[columns.index('account_number')]] += Decimal(str(weight))
+    wrong = [account for account, total in weights.items() if total != 100]
+    if wrong:
+        failures.append(f"리밸런싱 비중 합 ≠ 100 계좌 {len(wrong):,}개 (예: {wrong[0]})")
+    return failures
+
+
+def check_backends(directory, scale, seed):
+    """python/numpy 백엔드 덤프를 만들어 불변 조건 비교, numpy 덤프 경로 반환"""
+    generator = DatasetGenerator(DEFAULT_SPEC, scale, seed)
+    shared = [table for table in generator.order if not generator.is_account_table(table)]
+    per_account = [table for table in generator.order if generator.is_account_table(table)]
+
+    paths = {}
+    stats = {}
+    for backend in ('python', 'numpy'):
+        paths[backend] = os.path.join(directory, f"{backend}.sql")
+        stats[backend] = quiet(generate, paths[backend], DEFAULT_SPEC, scale, seed, backend=backend)
+
+    failures = []
+    for table in generator.order:
+        counts = [stats[backend][table][0] for backend in ('python', 'numpy')]
+        if counts[0] != counts[1]:
+            failures.append(f"{table} 행 수 python {counts[0]:,} / numpy {counts[1]:,}")
+    if dump_rows(paths['python'], shared) != dump_rows(paths['numpy'], shared):
+        failures.append(f"공용 테이블 ({', '.join(shared)}) 행이 백엔드마다 다름")
+    python_counts = account_counts(paths['python'], per_account)
+    numpy_counts = account_counts(paths['numpy'], per_account)
+    for table in per_account:
+        if python_counts[table] != numpy_counts[table]:
+            failures.append(f"{table} 계좌별 행 수가 백엔드마다 다름")
+    for backend, path in paths.items():
+        failures.extend(f"{backend}: {failure}" for failure in check_dump_invariants(path))
+    return failures, paths['numpy']
+
+
+def generated_bytes(path):
+    """생성 SQL 파일 내용 (실행 시각이 찍히는 생성일시 줄 제외)"""
+    with open(path, 'rb') as f:
+        return b''.join(line for line in f if not line.startswith('-- 생성일시'.encode('utf-8')))
+
+
+def check_workers(directory, seed):
+    """--skew 스펙 (계좌별 행 수가 다름) 을 백엔드마다 작업자 1개/3개로 생성해 같은 파일인지"""
+    spec = skewed_spec()
+    failures = []
+    for backend in ('python', 'numpy'):
+        outputs = []
+        for workers in (1, 3):
+            path = os.path.join(directory, f"skew_{backend}_{workers}.sql")
+            quiet(generate, path, spec, WORKERS_SCALE, seed, workers=workers, backend=backend)
+            outputs.append(generated_bytes(path))
+        if outputs[0] != outputs[1]:
+            lines = [output.count(b'\n') for output in outputs]
+            failures.append(f"{backend}: --skew --workers 1 / 3 파일이 다름 ({lines[0]:,}줄 / {lines[1]:,}줄)")
+    return failures
+
+
+def check_order_matching(path, seed):
+    """주문마다 체결 수량 합 = 주문 수량, 체결 수량은 양수, 같은 seed 면 같은 결과"""
+    orders = order_matching.load_orders(path)
+    executions = order_matching.match_orders(orders, seed)
+    failures = []
+    unmatched = [index for index, (quantity, fills) in enumerate(zip(orders['quantity'], executions))
+                 if sum(traded for _, traded in fills) != quantity or any(traded < 1 for _, traded in fills)]
+    if unmatched:
+        index = unmatched[0]
+        failures.append(f"체결 수량 합 ≠ 주문 수량 {len(unmatched):,}건 "
+                        f"(예: {orders['order'][index]} {orders['quantity'][index]}주 → {executions[index]})")
+    if order_matching.match_orders(orders, seed) != executions:
+        failures.append("같은 seed 로 다시 체결한 결과가 다름")
+    return failures
+
+
+def check_simulator(directory, seed):
+    """작은 시세 저장소와 합성 계좌로 --chunk 값을 바꿔 실행해 매매내역 파일이 같은지"""
+    store_directory = os.path.join(directory, 'price_store')
+    write_history_store(store_directory, simulate(stocks=60, years=1, seed=seed))
+    store = PriceStore(store_directory)
+    book = rebalancing_simulator.synthetic_book(200, store, seed)
+    outputs = []
+    for chunk in (200, 37):
+        path = os.path.join(directory, f"simulated_{chunk}.sql")
+        quiet(rebalancing_simulator.run, book, store, path, chunk=chunk)
+        with open(path, 'rb') as f:
+            outputs.append(f.read())
+    failures = []
+    if outputs[0].count(b'\n') < 10:
+        failures.append("매매내역이 거의 생성되지 않음")
+    if outputs[0] != outputs[1]:
+        failures.append("--chunk 200 / 37 매매내역 파일이 다름")
+    return failures
+
+
+def validate_generation(scale=DEFAULT_SCALE, seed=42):
+    """모든 점검을 실행하고 실패 건수 반환"""
+    print(f"🔍 생성기 회귀 점검 (scale={scale}, seed={seed})")
+    failed = 0
+
+    def run(name, check, *args):
+        nonlocal failed
+        started = time.perf_counter()
+        result = check(*args)
+        failures, value = result if isinstance(result, tuple) else (result, None)
+        elapsed = time.perf_counter() - started
+        if failures:
+            failed += 1
+            print(f"❌ {name} ({elapsed:.1f}초)")
+            for failure in failures:
+                print(f"   - {failure}")
+        else:
+            print(f"✅ {name} ({elapsed:.1f}초)")
+        return value
+
+    with tempfile.TemporaryDirectory(prefix='validate_generation_') as directory:
+        run("영업일 달력 날짜 검증", check_calendar)
+        run("SqlWriter 구문 크기 한도", check_sql_writer, seed)
+        run("trade_stream 보유수량 정합성", check_trade_stream, seed)
+        run("--skew 작업자 수 무관 출력", check_workers, directory, seed)
+        numpy_dump = run("python/numpy 백엔드 불변 조건", check_backends, directory, scale, seed)
+        if numpy_dump:
+            run("order_matching 체결 수량 합", check_order_matching, numpy_dump, seed)
+        run("rebalancing_simulator --chunk 무관 출력", check_simulator, directory, seed)
+
+    if failed:
+        print(f"\n❌ 점검 {failed}개 실패")
+    else:
+        print("\n✅ 모든 점검 통과")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='생성기 회귀 점검 (백엔드 불변 조건, 보유수량 재생, 체결 수량, 구문 크기)')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE, help='계좌 수 배율')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed')
+    args = parser.parse_args()
+
+    sys.exit(1 if validate_generation(args.scale, args.seed) else 0)
@@ -6,6 +6,14 @@
 """
 
 import re
+import sys
+
+from sql_reader import read_rows
+
+DEFAULT_PATH = '/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data_schema_compatible.sql'
+
+TABLES = ['stock_current_price', 'customer_balance', 'trading_history', 'rebalancing_master', 'rebalancing_analysis',
+          'customer_strategy']
 
 def extract_schema_columns():
     """create_tables.sql에서 테이블별 컬럼 정보 추출"""
@@ -46,34 +54,20 @@ def extract_schema_columns():
     return tables
 
 def extract_sql_columns(sql_file):
-    """SQL 파일에서 INSERT 문의 컬럼명 추출"""
-    
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-    
+    """SQL 파일에서 INSERT 문의 컬럼명 추출 (sql_reader 로 스트리밍, 테이블별 첫 INSERT 기준)"""
+
     insert_columns = {}
-    
-    # INSERT INTO 패턴들
-    patterns = [
-        ('stock_current_price', r'INSERT INTO stock_current_price \((.*?)\) VALUES'),
-        ('customer_balance', r'INSERT INTO customer_balance \((.*?)\) VALUES'),
-        ('trading_history', r'INSERT INTO trading_history \((.*?)\) VALUES'),
-        ('rebalancing_master', r'INSERT INTO rebalancing_master \((.*?)\) VALUES'),
-        ('rebalancing_analysis', r'INSERT INTO rebalancing_analysis \((.*?)\) VALUES'),
-        ('customer_strategy', r'INSERT INTO customer_strategy \((.*?)\) VALUES')
-    ]
-    
-    for table_name, pattern in patterns:
-        match = re.search(pattern, sql_content, re.DOTALL)
-        if match:
-            columns_str = match.group(1)
-            columns = [col.strip() for col in columns_str.split(',')]
-            insert_columns[table_name] = columns
-            print(f"📝 {table_name} INSERT: {columns}")
-    
+
+    for table_name, columns, _ in read_rows(sql_file, TABLES):
+        if table_name not in insert_columns and columns is not None:
+            insert_columns[table_name] = list(columns)
+            print(f"📝 {table_name} INSERT: {insert_columns[table_name]}")
+            if len(insert_columns) == len(TABLES):
+                break
+
     return insert_columns
 
-def validate_schema_compatibility():
+def validate_schema_compatibility(sql_file=DEFAULT_PATH):
     """스키마와 SQL 파일의 호환성 검증"""
     
     print("🔍 테이블 스키마 vs SQL 컬럼명 검증 시작...")
@@ -82,7 +76,7 @@ def validate_schema_compatibility():
     schema_columns = extract_schema_columns()
     print("\n" + "=" * 70)
     
-    sql_columns = extract_sql_columns('/Users/todd.rsp/kps_hacker/port-tune-up/database/insert_bulk_data_schema_compatible.sql')
+    sql_columns = extract_sql_columns(sql_file)
     print("\n" + "=" * 70)
     
     all_compatible = True
@@ -125,4 +119,4 @@ def validate_schema_compatibility():
     return all_compatible
 
 if __name__ == "__main__":
-    validate_schema_compatibility()
\ No newline at end of file
+    validate_schema_compatibility(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
\ No newline at end of file
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NumPy 벡터화 데이터 생성 백엔드
+계좌별 테이블의 행을 계좌 묶음(블록) 단위로 컬럼별 NumPy 배열로 한꺼번에 생성하고,
+값을 바이트 행렬로 조립해 VALUES 행(또는 TSV 줄) 문자열을 일괄 포맷
+행마다 random/datetime/format 을 호출하는 파이썬 루프가 없어 DatasetGenerator 기본 경로보다 수십 배 빠름
+
+난수는 (seed, 테이블, 블록 번호) 별 독립 스트림이므로 같은 seed 면 작업자 수와 관계없이 같은 결과가 나옴
+(파이썬 백엔드와는 난수 생성기가 달라 값 자체는 다름)
+"""
+
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from reference_data import BUY_SELL_CODES
+from trade_stream import HOLDING_DAYS, simulate_trades
+from trading_calendar import business_days
+
+# 블록 하나에 포함되는 계좌 수 (블록 경계는 계좌 순번 기준으로 고정)
+BLOCK_ACCOUNTS = 64
+
+# 행 조립 형식: (행 시작, 값 구분자, 행 끝)
+LAYOUTS = {
+    'sql': (b'(', b', ', b')'),
+    'tsv': (b'', b'\t', b''),
+}
+
+def byte_table(encoded):
+    """바이트 문자열 목록을 고정 길이 void 배열로 변환 (남는 칸은 0 바이트, 행 단위 복사로 빠르게 gather)"""
+    width = max(1, max(map(len, encoded), default=1))
+    return np.array(encoded, dtype=f"S{width}").view(f"V{width}")
+
+
+def gather(table, index):
+    """byte_table() 표 (또는 고정 폭 S 배열) 에서 index 순서대로 꺼낼 조각 (표, 인덱스)
+    실제 복사는 assemble() 이 행 버퍼의 컬럼 자리에 바로 해서 조각마다 중간 행렬을 만들지 않음
+    """
+    return table, np.asarray(index)
+
+
+# 정수를 세 자리씩 끊어 찍기 위한 조각 표: [000~999 (0 채움), 0~999 (맨 앞 조각), 빈 조각]
+_CHUNK_PADDED = 0
+_CHUNK_LEADING = 1000
+_CHUNK_EMPTY = 2000
+_CHUNKS = byte_table([f"{i:03d}".encode() for i in range(1000)] + [str(i).encode() for i in range(1000)] + [b''])
+
+# 부호 조각 표: [없음, '-']
+_SIGNS = byte_table([b'', b'-'])
+
+# 소수점 자리수별 소수부 표 ('.00' ~ '.99' 등)
+_FRACTIONS = {}
+
+MAX_DECIMALS = 6
+
+
+def _fractions(decimals):
+    if decimals not in _FRACTIONS:
+        _FRACTIONS[decimals] = byte_table([f".{i:0{decimals}d}".encode() for i in range(10 ** decimals)])
+    return _FRACTIONS[decimals]
+
+
+def number_parts(values, decimals=0):
+    """정수 배열(소수점 decimals 자리로 스케일된 값)을 ASCII 조각 (gather) 목록으로 변환 (남는 칸은 0 바이트)
+
+    자리마다 나눗셈을 하지 않고 세 자리 조각 표와 소수부 표에서 바로 가져옴
+    """
+    if decimals > MAX_DECIMALS:
+        raise ValueError(f"소수점 자리수는 {MAX_DECIMALS} 이하만 지원합니다: {decimals}")
+    values = np.asarray(values, dtype=np.int64)
+    negative = values < 0
+    whole, fraction = np.divmod(np.abs(values), 10 ** decimals)
+
+    chunks = []
+    rest = whole
+    while True:
+        rest, low = np.divmod(rest, 1000)
+        chunks.append(low + np.where(rest == 0, _CHUNK_LEADING, _CHUNK_PADDED))
+        if not rest.any():
+            break
+    for i in range(len(chunks) - 1):
+        # 더 높은 조각이 맨 앞인 행은 이 조각이 0 채움, 이미 맨 앞을 지난 행은 빈 조각
+        higher = chunks[i + 1]
+        chunks[i + 1] = np.where((higher == _CHUNK_LEADING) & (chunks[i] >= _CHUNK_LEADING), _CHUNK_EMPTY, higher)
+
+    parts = []
+    if negative.any():
+        parts.append(gather(_SIGNS, negative.astype(np.intp)))
+    parts.extend(gather(_CHUNKS, chunk) for chunk in reversed(chunks))
+    if decimals:
+        parts.append(gather(_fractions(decimals), fraction))
+    return parts
+
+
+def sample_positions(rng, accounts, available, rows):
+    """계좌(행)마다 0 ~ available-1 중 rows 개를 중복 없이 뽑은 위치 행렬 (accounts, rows)"""
+    if rows * rows > available:
+        # 뽑는 비율이 높으면 난수 정렬 방식
+        return np.argpartition(rng.random((accounts, available)), rows - 1, axis=1)[:, :rows]
+    # 뽑는 비율이 낮으면 일단 뽑고 중복이 생긴 계좌만 다시 뽑음 (재추첨 확률 약 rows² / 2·available)
+    positions = rng.integers(0, available, (accounts, rows))
+    while True:
+        ordered = np.sort(positions, axis=1)
+        duplicated = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if not duplicated.any():
+            return positions
+        positions[duplicated] = rng.integers(0, available, (int(duplicated.sum()), rows))
+
+
+def vocab_table(values, format_value):
+    """값 목록을 포맷한 UTF-8 바이트 표 (byte_table 형식)"""
+    return byte_table([format_value(value).encode('utf-8') for value in values])
+
+
+def assemble(columns, layout):
+    """컬럼별 조각 (gather / number_parts) 목록을 행 문자열 목록과 행별 바이트 수 목록으로 조립
+
+    구분자만 채운 행 틀을 행 버퍼 (행 수, 전체 폭) 에 한 번에 복사한 뒤 조각마다 표 값을 자기 자리 (고정 폭 void 칸) 에 넣고,
+    남는 칸의 0 바이트는 bytes.translate 로 한 번에 지움
+    """
+    begin, separator, end = layout
+    count = len(columns[0][0][1])
+
+    pieces = [begin] if begin else []
+    for i, parts in enumerate(columns):
+        if i:
+            pieces.append(separator)
+        pieces.extend(parts)
+    if end:
+        pieces.append(end)
+    pieces.append(b'\n')
+
+    widths = [len(piece) if isinstance(piece, bytes) else piece[0].dtype.itemsize for piece in pieces]
+    width = sum(widths)
+    template = b''.join(piece if isinstance(piece, bytes) else bytes(size) for piece, size in zip(pieces, widths))
+    block = np.empty((count, width), dtype=np.uint8)
+    block[...] = np.frombuffer(template, dtype=np.uint8)
+    at = 0
+    for piece, size in zip(pieces, widths):
+        if not isinstance(piece, bytes):
+            field = np.ndarray((count,), dtype=f"V{size}", buffer=block, offset=at, strides=(width,))
+            field[...] = np.take(piece[0], piece[1]).view(field.dtype)
+        at += size
+
+    text = block.tobytes().translate(None, b'\0').decode('utf-8')
+    lines = text.split('\n')
+    lines.pop()
+    if text.isascii():
+        return lines, list(map(len, lines))
+    return lines, (np.count_nonzero(block, axis=1) - 1).tolist()
+
+
+class VectorGenerator:
+    """DatasetGenerator 의 스펙/공용 테이블 값을 그대로 쓰면서 계좌별 테이블 행을 블록 단위로 생성하는 생성기
+
+    사용 예:
+        generator = DatasetGenerator(DEFAULT_SPEC, scale=100)
+        generator.prepare_shared()
+        vector = VectorGenerator(generator, SqlWriter.format_value, 'sql')
+        for lines, sizes in vector.lines('trading_history'):
+            sql.formatted_rows(lines, sizes)
+
+    컬럼 값은 내부적으로 두 가지 형태로 다룸
+        ('vocab', key, 값 목록, 인덱스 배열)  - 문자열/선택형 값 (값 목록은 한 번만 포맷해 재사용)
+        ('number', 스케일된 정수 배열, 소수점 자리수)
+    """
+
+    def __init__(self, generator, format_value, output_format='sql'):
+        self.generator = generator
+        self.spec = generator.spec
+        self.accounts = generator.accounts
+        self.format_value = format_value
+        self.layout = LAYOUTS[output_format]
+        self._blocks = {}
+        self._vocab = {}
+        self._tables = {}
+        self._ranks = {}
+
+    def rng(self, table, block):
+        """(seed, 테이블, 블록) 별 독립 난수 스트림"""
+        return np.random.default_rng([self.generator.seed % 2 ** 63, zlib.crc32(table.encode('utf-8')), block])
+
+    def lines(self, table, start=0, stop=None):
+        """계좌 구간 [start, stop) 의 행 문자열을 블록 단위 (행 목록, 바이트 수 목록) 으로 yield"""
+        if not self.generator.is_account_table(table):
+            raise ValueError(f"{table}: 벡터화 백엔드는 계좌별(per: account) 테이블만 지원합니다")
+        stop = len(self.accounts) if stop is None else stop
+        if start >= stop or not self.spec['tables'][table]['rows']:
+            return
+
+        for block in range(start // BLOCK_ACCOUNTS, (stop - 1) // BLOCK_ACCOUNTS + 1):
+            first = block * BLOCK_ACCOUNTS
+            offsets = np.cumsum(np.r_[0, self._account_sizes(table, block)])
+            lo = offsets[max(start, first) - first]
+            hi = offsets[min(stop, first + BLOCK_ACCOUNTS) - first]
+            yield assemble([self._parts(column, lo, hi) for column in self._block(table, block).values()], self.layout)
+
+    def _parts(self, column, lo, hi):
+        """컬럼 값 [lo, hi) 행을 바이트 행렬 조각 목록으로 변환"""
+        if column[0] == 'number':
+            return number_parts(column[1][lo:hi], column[2])
+        _, key, values, index = column
+        if key is None:
+            return [gather(vocab_table(values, self.format_value), index[lo:hi])]
+        if key not in self._tables:
+            self._tables[key] = vocab_table(values, self.format_value)
+        return [gather(self._tables[key], index[lo:hi])]
+
+    def _static_vocab(self, key, build):
+        """블록마다 같은 값 목록 (순번/날짜/선택지 등) 은 한 번만 만들어 재사용"""
+        if key not in self._vocab:
+            self._vocab[key] = build()
+        return self._vocab[key]
+
+    def _account_sizes(self, table, block):
+        """블록 안 계좌별 행 수 배열 (sizes 가 없으면 모두 rows)"""
+        accounts = len(self.accounts[block * BLOCK_ACCOUNTS:(block + 1) * BLOCK_ACCOUNTS])
+        sizes = self.generator.account_sizes(table)
+        if sizes is None:
+            return np.full(accounts, self.spec['tables'][table]['rows'], dtype=np.int64)
+        return sizes[block * BLOCK_ACCOUNTS:block * BLOCK_ACCOUNTS + accounts]
+
+    def _block(self, table, block):
+        """블록 하나의 컬럼별 값 (직전 블록 결과는 하위 테이블의 참조용으로 재사용)"""
+        cached = self._blocks.get(table)
+        if cached and cached[0] == block:
+            return cached[1]
+
+        table_spec = self.spec['tables'][table]
+        accounts = self.accounts[block * BLOCK_ACCOUNTS:(block + 1) * BLOCK_ACCOUNTS]
+        sizes = self._account_sizes(table, block)
+        rows = table_spec['sizes'][2] if 'sizes' in table_spec else table_spec['rows']
+        count = int(sizes.sum())
+        rng = self.rng(table, block)
+        owner = np.repeat(np.arange(len(accounts)), sizes)                  # 행마다 블록 안 계좌 위치
+        position = np.arange(count) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        trades = self._positions(table, block, len(accounts), sizes, owner, rng) if 'positions' in table_spec else None
+
+        columns = {}
+        for name, rule in table_spec['columns'].items():
+            kind = rule[0]
+            key = (table, name)
+            if kind == 'account':
+                first = block * BLOCK_ACCOUNTS
+                column = ('vocab', 'accounts', self.accounts, first + owner)
+            elif kind == 'sequence':
+                values = self._static_vocab(key, lambda: [rule[1].format(i + 1) for i in range(rows)])
+                column = ('vocab', key, values, position)
+            elif kind == 'randint':
+                column = ('number', rng.integers(rule[1], rule[2] + 1, count), 0)
+            elif kind == 'amount':
+                column = ('number', rng.integers(rule[1], rule[2] + 1, count) * 100, 2)
+            elif kind == 'uniform':
+                scaled = np.rint(rng.uniform(rule[1], rule[2], count) * 10 ** rule[3]).astype(np.int64)
+                column = ('number', scaled, rule[3])
+            elif kind == 'choice':
+                values = list(rule[1])
+                column = ('vocab', key, values, rng.integers(0, len(values), count))
+            elif kind == 'items':
+                values = list(rule[1])
+                column = ('vocab', key, values, position % len(values))
+            elif kind == 'const':
+                column = ('vocab', key, [rule[1]], np.zeros(count, dtype=np.int64))
+            elif kind == 'date':
+                values = self._static_vocab(key, lambda: self._dates(rule[1], rule[2]))
+                column = ('vocab', key, values, rng.integers(0, rule[2] + 1, count))
+            elif kind == 'business_day':
+                values = self._static_vocab(key, lambda: business_days(rule[1], rule[2]))
+                column = ('vocab', key, values, rng.integers(0, len(values), count))
+            elif kind == 'weight':
+                column = ('number', self._weights(rule, sizes, owner, rng), rule[2])
+            elif kind in ('ref', 'sample', 'cycle'):
+                column = self._reference(table, name, rule, block, len(accounts), owner, position, rng)
+            elif kind == 'stock_name':
+                column = self._stock_names(key, columns[rule[1]])
+            elif kind == 'position':
+                column = trades[rule[1]]
+            else:
+                raise ValueError(f"{table}.{name}: 벡터화 백엔드에서 지원하지 않는 컬럼 규칙입니다: {kind}")
+            columns[name] = column
+
+        self._blocks[table] = (block, columns)
+        return columns
+
+    @staticmethod
+    def _weights(rule, sizes, owner, rng):
+        """계좌마다 [0, total] 을 임의 위치에서 잘라 나눈 조각 (소수점 digits 자리 정수, 계좌 안 합계 = total)"""
+        units = round(rule[1] * 10 ** rule[2])
+        held = sizes[sizes > 0]
+        ends = np.cumsum(held)
+        starts = ends - held
+        cuts = rng.integers(0, units + 1, len(owner))
+        cuts[ends - 1] = units                          # 계좌 마지막 자름 위치는 항상 total
+        cuts = cuts[np.lexsort((cuts, owner))]
+        pieces = np.diff(cuts, prepend=0)
+        pieces[starts] = cuts[starts]
+        return pieces
+
+    @staticmethod
+    def _dates(base, days):
+        start = datetime.strptime(base, '%Y%m%d')
+        return [(start + timedelta(days=offset)).strftime('%Y%m%d') for offset in range(days + 1)]
+
+    def _rank(self, key, values):
+        """값 목록의 정렬 순위 (계좌 내 비복원 추출 결과를 값 순서로 정렬하는 데 사용)"""
+        if key is not None and key in self._ranks:
+            return self._ranks[key]
+        order = sorted(range(len(values)), key=values.__getitem__)
+        rank = np.empty(len(values), dtype=np.int64)
+        rank[order] = np.arange(len(values))
+        if key is not None:
+            self._ranks[key] = rank
+        return rank
+
+    def _reference(self, table, name, rule, block, accounts, owner, position, rng):
+        kind, target = rule[0], rule[1]
+        ref_table, ref_column = target.split('.')
+
+        if self.generator.is_account_table(ref_table):
+            # 같은 계좌의 계좌별 테이블 값 (같은 블록을 다시 생성해도 동일)
+            reference = self._block(ref_table, block)[ref_column]
+            if reference[0] != 'vocab':
+                raise ValueError(f"{table}.{name}: 숫자 컬럼은 참조 대상으로 쓸 수 없습니다: {target}")
+            _, key, values, ref_index = reference
+            per_account = ref_index.reshape(accounts, -1)
+        else:
+            key = target
+            values = self.generator._shared_values[(ref_table, ref_column)]
+            per_account = np.broadcast_to(np.arange(len(values)), (accounts, len(values)))
+
+        available = per_account.shape[1]
+        weights = self.generator.weight_table(rule[2], available) if len(rule) > 2 else None
+        if kind == 'ref':
+            slots = rng.integers(0, available, len(owner)) if weights is None else weights.sample(rng, len(owner))
+            return ('vocab', key, values, per_account[owner, slots])
+        if kind == 'cycle':
+            return ('vocab', key, values, per_account[owner, position % available])
+
+        # sample 은 sizes 없는 테이블만 (계좌마다 같은 행 수)
+        rows = len(owner) // accounts
+        if rows > available:
+            raise ValueError(f"{table}.{name}: 참조 값 {available}개에서 {rows}개를 중복 없이 뽑을 수 없습니다")
+        slots = (sample_positions(rng, accounts, available, rows) if weights is None
+                 else weights.sample_distinct(rng, accounts, rows))
+        picked = np.take_along_axis(per_account, slots, axis=1)
+        order = np.argsort(self._rank(key, values)[picked], axis=1)
+        picked = np.take_along_axis(picked, order, axis=1)
+        return ('vocab', key, values, picked.ravel())
+
+    def _positions(self, table, block, accounts, sizes, owner, rng):
+        """positions 매매 흐름 (trade_stream.simulate_trades) 의 필드별 컬럼 값"""
+        positions = self.spec['tables'][table]['positions']
+        holdings, code_column = positions['stock_code'].split('.')
+        stocks = self._block(holdings, block)[code_column]
+        quantity = self._block(holdings, block)[positions['quantity'].split('.')[1]]
+        if stocks[0] != 'vocab':
+            raise ValueError(f"{table}: positions.stock_code 는 종목코드 문자열 컬럼이어야 합니다")
+        _, stock_key, codes, stock_index = stocks
+        stock_index = stock_index.reshape(accounts, -1)
+        if quantity[0] == 'vocab':
+            quantities = np.asarray(quantity[2], dtype=np.int64)[quantity[3]]
+        else:
+            quantities = quantity[1] // 10 ** quantity[2]
+
+        price_table, price_column = positions['price'].split('.')
+
+        def price_of():
+            prices = dict(zip(self.generator._shared_values[(price_table, code_column)],
+                              self.generator._shared_values[(price_table, price_column)]))
+            return np.array([float(prices[code]) for code in codes])
+
+        prices = price_of() if stock_key is None else self._static_vocab(('positions', stock_key, positions['price']),
+                                                                         price_of)
+        dates = self._static_vocab((table, 'positions', 'date'),
+                                   lambda: business_days(positions['start'], positions['days']))
+        stream = simulate_trades(rng, quantities.reshape(accounts, -1), prices[stock_index], sizes, len(dates) - 1,
+                                 positions.get('holding_days', HOLDING_DAYS))
+
+        picked = stock_index[owner, stream['slot']]
+        return {
+            'date': ('vocab', (table, 'positions', 'date'), dates, stream['day']),
+            'stock_code': ('vocab', stock_key, codes, picked),
+            'buy_sell_code': ('vocab', (table, 'positions', 'buy_sell_code'), list(BUY_SELL_CODES),
+                              stream['sell'].astype(np.int64)),
+            'quantity': ('number', stream['quantity'], 0),
+            'amount': ('number', stream['won'] * 100, 2),
+        }
+
+    def _stock_names(self, key, code_column):
+        """종목코드 컬럼과 같은 인덱스를 쓰는 종목명 값 목록"""
+        if code_column[0] != 'vocab':
+            raise ValueError(f"{key[0]}.{key[1]}: 종목명은 종목코드 문자열 컬럼에서만 만들 수 있습니다")
+        _, code_key, codes, index = code_column
+        if code_key is None:
+            return ('vocab', None, [self.generator.stock_name(code) for code in codes], index)
+        values = self._static_vocab(key, lambda: [self.generator.stock_name(code) for code in codes])
+        return ('vocab', key, values, index)
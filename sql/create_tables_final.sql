@@ -22,6 +22,7 @@ CREATE TABLE `customer_balance` (
   `purchase_amount` decimal(15,2) NOT NULL DEFAULT '0.00' COMMENT '매수금액',
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP COMMENT '생성일시',
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '수정일시',
+  `rebalancing_target_weight` decimal(5,2) DEFAULT '0.00' COMMENT '리밸런싱전략비중(%)',
   PRIMARY KEY (`id`),
   UNIQUE KEY `uk_customer_balance_account_stock` (`account_number`,`stock_code`)
 ) ENGINE=InnoDB AUTO_INCREMENT=41 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='고객잔고';
@@ -116,6 +117,17 @@ CREATE TABLE `stock_current_price` (
   PRIMARY KEY (`stock_code`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='종목현재가';
 
+-- 종목일별시세
+CREATE TABLE `stock_price_history` (
+  `stock_code` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '종목코드',
+  `trading_date` char(8) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '거래일자 (YYYYMMDD)',
+  `close_price` decimal(15,2) NOT NULL DEFAULT '0.00' COMMENT '종가',
+  `change_rate` decimal(7,2) NOT NULL DEFAULT '0.00' COMMENT '등락률 (%)',
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP COMMENT '생성일시',
+  PRIMARY KEY (`stock_code`,`trading_date`),
+  KEY `idx_stock_price_history_date` (`trading_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='종목일별시세';
+
 -- 종목기본정보
 CREATE TABLE `stock_info` (
   `stock_code` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '종목코드',